@@ -0,0 +1,213 @@
+from eppy.modeleditor import IDF
+
+from energytool.base.idf_utils import get_idf_index
+from energytool.base.working_idf import CopyOnWriteIDF
+
+
+def _object_names(objs: list[list]) -> list[str] | None:
+    """Upper case names of raw idf objects, or None if they are not unique"""
+    names = [str(obj[1]).upper() if len(obj) > 1 else "" for obj in objs]
+    if len(set(names)) != len(names):
+        return None
+    return names
+
+
+def _object_changes(base_obj: list, new_obj: list):
+    """
+    Return (base length, new length, {field position: new value}) or None if
+    the object is unchanged.
+    """
+    changes = {
+        idx: value
+        for idx, value in enumerate(new_obj)
+        if idx >= len(base_obj) or value != base_obj[idx]
+    }
+    if not changes and len(base_obj) == len(new_obj):
+        return None
+    return len(base_obj), len(new_obj), changes
+
+
+class IdfDelta:
+    """
+    Field level difference between a base IDF and a CopyOnWriteIDF working copy
+    of it, that can be replayed on other IDFs derived from the same base.
+
+    Only the object types copied in the working IDF are compared. Objects are
+    matched by name when names are unique within their type, by position
+    otherwise. The delta records modified fields, added objects and removed
+    objects.
+
+    Use IdfDelta.from_working_idf to build a delta. It returns None if the
+    changes cannot be represented, e.g. objects removed from a type without
+    unique names.
+    """
+
+    def __init__(self):
+        # Object type -> dict(by_name, base_length, modified, added, removed)
+        self.types = {}
+
+    def __repr__(self):
+        return f"IdfDelta({list(self.types)})"
+
+    def __bool__(self):
+        return bool(self.types)
+
+    @classmethod
+    def from_working_idf(cls, base_idf: IDF, working_idf: CopyOnWriteIDF):
+        """
+        Compute the delta between base_idf and working_idf.
+
+        :param base_idf: The base IDF of working_idf.
+        :param working_idf: A CopyOnWriteIDF of base_idf.
+        :return: An IdfDelta, or None if the changes cannot be represented.
+        """
+        delta = cls()
+        for key in working_idf.copied_types:
+            base_objs = [bunch.obj for bunch in base_idf.idfobjects[key]]
+            # Modifiers may replace the objects sequence, so the raw objects
+            # are read from idfobjects rather than from the model
+            new_objs = [bunch.obj for bunch in working_idf.idfobjects[key]]
+            base_names = _object_names(base_objs)
+            new_names = _object_names(new_objs)
+
+            if base_names is not None and new_names is not None:
+                base_map = dict(zip(base_names, base_objs))
+                new_map = dict(zip(new_names, new_objs))
+                modified = {}
+                for name in base_names:
+                    if name in new_map:
+                        changes = _object_changes(base_map[name], new_map[name])
+                        if changes is not None:
+                            modified[name] = changes
+                type_delta = {
+                    "by_name": True,
+                    "base_length": len(base_objs),
+                    "modified": modified,
+                    "added": [
+                        list(obj)
+                        for name, obj in zip(new_names, new_objs)
+                        if name not in base_map
+                    ],
+                    "removed": [name for name in base_names if name not in new_map],
+                }
+            else:
+                # Objects without unique names can only be modified or appended
+                if len(new_objs) < len(base_objs):
+                    return None
+                modified = {}
+                for idx, base_obj in enumerate(base_objs):
+                    changes = _object_changes(base_obj, new_objs[idx])
+                    if changes is not None:
+                        modified[idx] = changes
+                type_delta = {
+                    "by_name": False,
+                    "base_length": len(base_objs),
+                    "modified": modified,
+                    "added": [list(obj) for obj in new_objs[len(base_objs) :]],
+                    "removed": [],
+                }
+
+            if type_delta["modified"] or type_delta["added"] or type_delta["removed"]:
+                delta.types[key] = type_delta
+
+        return delta
+
+    def touched_fields(self) -> set[tuple]:
+        """
+        Return the (object type, object key, field position) triples modified by
+        the delta. Object keys are upper case names, or positions for types
+        without unique names. The field position is None for removed and added
+        objects, that are entirely touched.
+        """
+        touched = set()
+        for key, type_delta in self.types.items():
+            for obj_key, (base_length, length, changes) in type_delta[
+                "modified"
+            ].items():
+                touched.update((key, obj_key, idx) for idx in changes)
+                touched.update(
+                    (key, obj_key, idx) for idx in range(length, base_length)
+                )
+            touched.update((key, obj_key, None) for obj_key in type_delta["removed"])
+            if type_delta["by_name"]:
+                touched.update(
+                    (key, str(obj[1]).upper(), None) for obj in type_delta["added"]
+                )
+        return touched
+
+    def overlaps(self, other: "IdfDelta") -> bool:
+        """
+        Return True if the delta and other modify the same field of the same
+        object, or if one of them adds or removes an object touched by the
+        other. Appended objects without unique names never overlap.
+        """
+        touched = self.touched_fields()
+        other_touched = other.touched_fields()
+        if touched & other_touched:
+            return True
+        objects = {(key, obj_key) for key, obj_key, idx in touched if idx is None}
+        other_objects = {
+            (key, obj_key) for key, obj_key, idx in other_touched if idx is None
+        }
+        return any(
+            (key, obj_key) in other_objects for key, obj_key, _ in touched
+        ) or any((key, obj_key) in objects for key, obj_key, _ in other_touched)
+
+    def can_apply(self, idf: IDF, applied: list["IdfDelta"] = None) -> bool:
+        """
+        Return True if all the objects targeted by the delta can be found in
+        idf, and if added objects do not already exist.
+
+        :param idf: The IDF to apply the delta on.
+        :param applied: (Optional) The deltas already applied on idf. The delta
+            cannot be applied if it overlaps one of them (see overlaps), as
+            replaying it would silently discard their changes.
+        """
+        if applied and any(self.overlaps(other) for other in applied):
+            return False
+        for key, type_delta in self.types.items():
+            objs = [bunch.obj for bunch in idf.idfobjects[key]]
+            if type_delta["by_name"]:
+                names = _object_names(objs)
+                if names is None:
+                    return False
+                names = set(names)
+                if any(name not in names for name in type_delta["modified"]):
+                    return False
+                if any(name not in names for name in type_delta["removed"]):
+                    return False
+                if any(str(obj[1]).upper() in names for obj in type_delta["added"]):
+                    return False
+            elif len(objs) < type_delta["base_length"]:
+                return False
+        return True
+
+    def apply(self, idf: IDF):
+        """Replay the delta on idf. Check can_apply first."""
+        for key, type_delta in self.types.items():
+            sequence = idf.idfobjects[key]
+            if type_delta["by_name"]:
+                targets = {str(bunch.obj[1]).upper(): bunch for bunch in sequence}
+            else:
+                targets = dict(enumerate(sequence))
+
+            for obj_key, (base_length, length, changes) in type_delta[
+                "modified"
+            ].items():
+                obj = targets[obj_key].obj
+                if len(obj) < length:
+                    obj.extend([""] * (length - len(obj)))
+                for idx, value in changes.items():
+                    obj[idx] = value
+                if length < base_length:
+                    del obj[length:]
+
+            for obj_key in type_delta["removed"]:
+                idf.removeidfobject(targets[obj_key])
+
+            for raw_obj in type_delta["added"]:
+                bunch = idf.newidfobject(key)
+                bunch.obj[:] = list(raw_obj)
+
+            # Raw values are not written through eppy
+            get_idf_index(idf).touch(key)
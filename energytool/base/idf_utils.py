@@ -1,14 +1,419 @@
-import eppy
+import itertools
+import weakref
+
+import numpy as np
+import pandas as pd
+from eppy.bunch_subclass import EpBunch
+from eppy.idf_msequence import Idf_MSequence
 from eppy.modeleditor import IDF
 import eppy.json_functions as json_functions
 
 from energytool.tools import is_items_in_list, to_list
 
 
-def getidfvalue(idf, param_key: str):
+class IdfObjectIndex:
+    """
+    Lookup table of the objects of an EnergyPlus IDF by object type and name.
+
+    The table of an object type maps object names to their positions in the
+    objects list of the type. It is built on first lookup, then kept in sync
+    with the IDF: objects appended to the list (e.g. by newidfobject) are added
+    to the table, while removed or renamed objects, or the reassignment of the
+    objects list of a type, are detected on lookup and the table of this type is
+    rebuilt. Field values are always read from the indexed objects, so field
+    modifications never make the index stale.
+
+    The index also tracks the modifications of the objects of the types passed to
+    version, for the caches derived from their field values (e.g. ZoneGeometry).
+    Objects added, removed or modified through eppy (newidfobject,
+    removeidfobject, field assignments) or through the helpers of this module
+    change the version of their type. Raw object values written directly must
+    be reported using touch.
+
+    As in eppy ``IDF.getobject``, names are matched case-insensitively on the first
+    field of the objects.
+
+    Use get_idf_index to share a single index per IDF.
+
+    :param idf: An EnergyPlus IDF object.
+    """
+
+    def __init__(self, idf: IDF):
+        self._idf_ref = weakref.ref(idf)
+        self._tables = {}
+        self._sequences = {}
+        self._versions = {}
+
+    def __reduce__(self):
+        return self.__class__, (self.idf,)
+
+    @property
+    def idf(self) -> IDF:
+        return self._idf_ref()
+
+    def invalidate(self, idf_object: str = None):
+        """
+        Drop the table of an object type, or the whole index if idf_object is None.
+        """
+        if idf_object is None:
+            self._tables.clear()
+            for key in self._versions:
+                self.touch(key)
+        else:
+            self._tables.pop(idf_object.upper(), None)
+            self.touch(idf_object)
+
+    def touch(self, idf_object: str):
+        """Report a modification of the objects of a type, changing its version"""
+        self._versions[idf_object.upper()] = next(_VERSIONS)
+
+    def version(self, idf_object: str):
+        """
+        Return the version of the objects of a type. It changes when objects of
+        the type are added, removed or modified, and is never reused, even by
+        other IDFs.
+
+        The objects sequence and the objects of the type are tracked from the
+        first call. Types whose objects list is a plain list (e.g. after
+        ``idf.idfobjects[key] = [...]``) cannot be tracked: a new version is
+        returned on each call.
+        """
+        key = idf_object.upper()
+        sequence = _peek_objects(self.idf, key)
+        owner = getattr(sequence, "theidf", None)
+        if owner is not None and owner is not self.idf:
+            # Objects read from the base IDF of a CopyOnWriteIDF
+            return get_idf_index(owner).version(key)
+        if not isinstance(sequence, _TrackedSequence) and (
+            type(sequence) is not Idf_MSequence
+        ):
+            return next(_VERSIONS)
+
+        sequence_ref = self._sequences.get(key)
+        if sequence_ref is None or sequence_ref() is not sequence:
+            sequence.__class__ = _TrackedSequence
+            sequence.tracked_key = key
+            for bunch in sequence:
+                _track_bunch(bunch)
+            self._sequences[key] = weakref.ref(sequence)
+            self.touch(key)
+        return self._versions[key]
+
+    def getobject(self, idf_object: str, name: str):
+        """
+        Return the object of type idf_object named name, or None if it is not
+        found in the IDF.
+        """
+        objs = self.getobjects(idf_object, name)
+        return objs[0] if objs else None
+
+    def getobjects(self, idf_object: str, name: str) -> list:
+        """
+        Return all the objects of type idf_object named name, in the IDF order.
+        """
+        key = idf_object.upper()
+        obj_list = self.idf.idfobjects[key]
+        upper_name = str(name).upper()
+
+        table = self._table(key, obj_list)
+        positions = table.get(upper_name)
+        if positions is None or not self._is_valid(obj_list, positions, upper_name):
+            # Objects may have been removed or renamed
+            table = self._build_table(key, obj_list)
+            positions = table.get(upper_name, [])
+
+        return [obj_list[pos] for pos in positions]
+
+    def _table(self, key: str, obj_list) -> dict[str, list[int]]:
+        try:
+            sequence, length, table = self._tables[key]
+        except KeyError:
+            return self._build_table(key, obj_list)
+
+        if not _is_sequence(sequence, obj_list) or length > len(obj_list):
+            return self._build_table(key, obj_list)
+
+        if length < len(obj_list):
+            # Objects were appended, e.g. using newidfobject
+            self._add_objects(table, obj_list, length)
+            self._tables[key] = (sequence, len(obj_list), table)
+        return table
+
+    @staticmethod
+    def _is_valid(obj_list, positions: list[int], upper_name: str) -> bool:
+        return all(
+            pos < len(obj_list) and _object_name(obj_list[pos]).upper() == upper_name
+            for pos in positions
+        )
+
+    @staticmethod
+    def _add_objects(table: dict[str, list[int]], obj_list, start: int):
+        for pos in range(start, len(obj_list)):
+            obj = obj_list[pos]
+            if len(obj.objls) > 1:
+                table.setdefault(_object_name(obj).upper(), []).append(pos)
+
+    def _build_table(self, key: str, obj_list) -> dict[str, list[int]]:
+        table = {}
+        self._add_objects(table, obj_list, 0)
+        self._tables[key] = (_sequence_ref(obj_list), len(obj_list), table)
+        return table
+
+
+def _sequence_ref(obj_list):
+    """
+    Reference to an objects sequence that does not keep its IDF alive: a weak
+    reference, or the id of plain lists that do not support weak references.
+    """
+    try:
+        return weakref.ref(obj_list)
+    except TypeError:
+        return id(obj_list)
+
+
+def _is_sequence(sequence_ref, obj_list) -> bool:
+    if isinstance(sequence_ref, weakref.ref):
+        return sequence_ref() is obj_list
+    return sequence_ref == id(obj_list)
+
+
+_VERSIONS = itertools.count()
+
+
+def _touch_objects(idf: IDF | None, idf_object: str):
+    """Report a modification of the objects of a type to the index of idf"""
+    index = _IDF_INDEXES.get(idf) if idf is not None else None
+    if index is not None and idf_object is not None:
+        index.touch(idf_object)
+
+
+def _track_bunch(bunch):
+    if type(bunch) is EpBunch:
+        object.__setattr__(bunch, "__class__", _TrackedEpBunch)
+
+
+class _TrackedEpBunch(EpBunch):
+    """EpBunch reporting its field modifications to the index of its IDF"""
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        self._touch()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._touch()
+
+    def _touch(self):
+        obj = dict.get(self, "obj")
+        if obj:
+            _touch_objects(dict.get(self, "theidf"), str(obj[0]))
+
+
+class _TrackedSequence(Idf_MSequence):
+    """Idf_MSequence reporting added and removed objects to the index of its IDF"""
+
+    tracked_key = None
+
+    def __setitem__(self, i, v):
+        super().__setitem__(i, v)
+        _track_bunch(v)
+        _touch_objects(self.theidf, self.tracked_key)
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        _touch_objects(self.theidf, self.tracked_key)
+
+    def insert(self, i, v):
+        super().insert(i, v)
+        _track_bunch(v)
+        _touch_objects(self.theidf, self.tracked_key)
+
+
+def _object_name(obj) -> str:
+    """First field of an idf object, its name for named objects"""
+    return str(obj.obj[1]) if len(obj.obj) > 1 else ""
+
+
+def _peek_objects(idf: IDF, idf_object: str):
+    """Objects of a type, without copying them if idf is a CopyOnWriteIDF"""
+    peek = getattr(idf.idfobjects, "peek", None)
+    return peek(idf_object) if peek is not None else idf.idfobjects[idf_object]
+
+
+_IDF_INDEXES = weakref.WeakKeyDictionary()
+
+
+def get_idf_index(idf: IDF) -> IdfObjectIndex:
+    """
+    Return the IdfObjectIndex of an IDF, created on first call and shared by
+    all the helpers of this module.
+    """
+    try:
+        return _IDF_INDEXES[idf]
+    except KeyError:
+        index = _IDF_INDEXES[idf] = IdfObjectIndex(idf)
+        return index
+
+
+def _field_position(obj, field_name: str) -> int | None:
+    """
+    Position of a field in the raw values list of an idf object, or None if the
+    field must be accessed through eppy (aliases, functions, extensible or
+    unknown fields).
+    """
+    if field_name in obj.get("__aliases", {}) or field_name in obj.get(
+        "__functions", {}
+    ):
+        return None
+    try:
+        return obj.objls.index(field_name)
+    except ValueError:
+        return None
+
+
+def _target_objects(idf: IDF, idf_object: str, names: str | list) -> list[list]:
+    """
+    For each name, the objects of a type named exactly name. If names is "*",
+    each object of the type, in the IDF order.
+    """
+    if isinstance(names, str) and names == "*":
+        return [[obj] for obj in idf.idfobjects[idf_object.upper()]]
+    index = get_idf_index(idf)
+    return [
+        [obj for obj in index.getobjects(idf_object, name) if obj.Name == name]
+        for name in to_list(names)
+    ]
+
+
+def get_field_array(
+    idf: IDF, idf_object: str, field_name: str, names: str | list = "*"
+) -> np.ndarray:
+    """
+    Get the values of a field for several objects of a type as an array.
+
+    The position of the field is resolved once, then values are read directly
+    from the raw objects values, instead of one eppy attribute lookup per object.
+
+    :param idf: An EnergyPlus IDF object.
+    :param idf_object: The name of the EnergyPlus object type.
+    :param field_name: The name of the field, e.g. "Watts_per_Zone_Floor_Area".
+    :param names: (Optional) The names of the objects. Default is "*" for all the
+        objects of the type, in the IDF order. The value of a name that is not
+        found in the IDF is None.
+    :return: A 1D object array of the field values.
+    """
+    objs = [
+        matches[0] if matches else None
+        for matches in _target_objects(idf, idf_object, names)
+    ]
+
+    values = np.empty(len(objs), dtype=object)
+    positions = {}
+    for i, obj in enumerate(objs):
+        if obj is None:
+            continue
+        objls_id = id(obj.objls)
+        if objls_id not in positions:
+            positions[objls_id] = _field_position(obj, field_name)
+        pos = positions[objls_id]
+        if pos is None:
+            values[i] = obj[field_name]
+        else:
+            raw = obj.obj
+            values[i] = raw[pos] if pos < len(raw) else ""
+    return values
+
+
+def set_field_array(
+    idf: IDF,
+    idf_object: str,
+    field_name: str,
+    values,
+    names: str | list = "*",
+):
+    """
+    Set the values of a field for several objects of a type.
+
+    The position of the field is resolved once, then values are written directly
+    in the raw objects values, instead of one eppy attribute assignment per
+    object.
+
+    :param idf: An EnergyPlus IDF object.
+    :param idf_object: The name of the EnergyPlus object type.
+    :param field_name: The name of the field, e.g. "Watts_per_Zone_Floor_Area".
+    :param values: A single value set to all the objects, or a list or array of
+        values, one per object or name.
+    :param names: (Optional) The names of the objects. Default is "*" for all the
+        objects of the type, in the IDF order. All the objects with the same name
+        are set. Names that are not found in the IDF are ignored.
+
+    :raises ValueError: If the length of values does not match the number of
+        objects or names.
+    """
+    targets = _target_objects(idf, idf_object, names)
+
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    if isinstance(values, (list, tuple)):
+        if len(values) != len(targets):
+            raise ValueError(
+                f"{len(values)} values given for {len(targets)} {idf_object} objects"
+            )
+    else:
+        values = [values] * len(targets)
+
+    positions = {}
+    for target, value in zip(targets, values):
+        for obj in target:
+            objls_id = id(obj.objls)
+            if objls_id not in positions:
+                positions[objls_id] = _field_position(obj, field_name)
+            pos = positions[objls_id]
+            if pos is None:
+                obj[field_name] = value
+            else:
+                raw = obj.obj
+                if pos >= len(raw):
+                    raw.extend([""] * (pos + 1 - len(raw)))
+                raw[pos] = value
+    get_idf_index(idf).touch(idf_object)
+
+
+def get_fields_table(
+    idf: IDF, idf_object: str, field_names: str | list, names: str | list = "*"
+) -> pd.DataFrame:
+    """
+    Columnar view of several fields of the objects of a type.
+
+    :param idf: An EnergyPlus IDF object.
+    :param idf_object: The name of the EnergyPlus object type.
+    :param field_names: The name or names of the fields.
+    :param names: (Optional) The names of the objects. Default is "*" for all the
+        objects of the type.
+    :return: A DataFrame indexed by object names, with one column per field.
+    """
+    if isinstance(names, str) and names == "*":
+        index = get_objects_name_list(idf, idf_object)
+    else:
+        index = to_list(names)
+    return pd.DataFrame(
+        {
+            field: get_field_array(idf, idf_object, field, names)
+            for field in to_list(field_names)
+        },
+        index=pd.Index(index, name="Name"),
+    )
+
+
+def getidfvalue(idf, param_key: str, index: IdfObjectIndex = None):
     """
     Get value from IDF object using a dotted key string, compatible with Eppy.
     Supports wildcard '*' for object name.
+
+    :param idf: An EnergyPlus IDF object.
+    :param param_key: Dotted key string, e.g. "idf.Material.SomeMat.Thickness".
+    :param index: (Optional) An IdfObjectIndex of idf, used to retrieve named
+        objects without scanning the objects list. Default is get_idf_index(idf).
     """
     idftag, obj_type, obj_name, field = json_functions.key2elements(param_key)
 
@@ -19,7 +424,9 @@ def getidfvalue(idf, param_key: str):
         idfobjs = idf.idfobjects[obj_type.upper()]
         return [obj[field] for obj in idfobjs if field in obj.fieldnames]
     else:
-        obj = idf.getobject(obj_type.upper(), obj_name)
+        if index is None:
+            index = get_idf_index(idf)
+        obj = index.getobject(obj_type, obj_name)
         if obj is None:
             raise KeyError(
                 f"Object '{obj_name}' of type '{obj_type}' not found in IDF."
@@ -62,33 +469,300 @@ def get_named_objects(idf: IDF, idf_object: str, names: str | list):
     returns a list of objects whose names match the names provided in the `names`
     parameter.
     """
-    names_list = to_list(names)
+    names_set = set(to_list(names))
     objects_list = idf.idfobjects[idf_object]
-    return [obj for obj in objects_list if obj.Name in names_list]
+    return [obj for obj in objects_list if obj.Name in names_set]
 
 
-def get_building_surface_area(idf: IDF, outside_boundary_condition: str):
+def _polygons_area(
+    vertices: np.ndarray, starts: np.ndarray, counts: np.ndarray
+) -> np.ndarray:
     """
-    Return specific outside_boundary_condition building surface area
+    Areas of polygons whose vertices are stored contiguously, computed as in
+    eppy.geometry.surface.area: the sum of the cross products of consecutive
+    vertices is projected on the unit normal of the plane of the first three
+    vertices.
+
+    :param vertices: (n, 3) array of the vertices of all the polygons.
+    :param starts: Index of the first vertex of each polygon, at least one vertex
+        per polygon.
+    :param counts: Number of vertices of each polygon.
     """
+    next_vertex = np.arange(len(vertices)) + 1
+    next_vertex[starts + counts - 1] = starts
+    cross = np.cross(vertices, vertices[next_vertex])
+
+    # Summed vertex by vertex, in the same order as eppy
+    total = np.zeros((len(counts), 3))
+    for k in range(counts.max()):
+        has_vertex = counts > k
+        total[has_vertex] += cross[starts[has_vertex] + k]
+
+    area = np.zeros(len(counts))
+    is_polygon = counts >= 3
+    if not is_polygon.any():
+        return area
+
+    first = starts[is_polygon]
+    points = np.stack(
+        [vertices[first], vertices[first + 1], vertices[first + 2]], axis=1
+    )
+    normal = []
+    for axis in range(3):
+        matrices = points.copy()
+        matrices[:, :, axis] = 1
+        normal.append(np.linalg.det(matrices))
+    magnitude = (normal[0] ** 2 + normal[1] ** 2 + normal[2] ** 2) ** 0.5
+
+    total = total[is_polygon]
+    degenerate = magnitude < 1e-8
+    with np.errstate(divide="ignore", invalid="ignore"):
+        projected = (
+            total[:, 0] * (normal[0] / magnitude)
+            + total[:, 1] * (normal[1] / magnitude)
+            + total[:, 2] * (normal[2] / magnitude)
+        )
+    # The first three vertices are aligned, the polygon is assumed planar
+    projected[degenerate] = np.linalg.norm(total[degenerate], axis=1)
+    area[is_polygon] = np.abs(projected / 2)
+    return area
+
 
-    return sum(
-        [
-            o.area
-            for o in idf.idfobjects["BuildingSurface:Detailed"]
-            if o.Outside_Boundary_Condition == outside_boundary_condition
-        ]
+def _surfaces_geometry(surfaces) -> pd.DataFrame:
+    """
+    Area and vertices height range of BuildingSurface:Detailed objects, computed
+    in one vectorized pass over all the vertices.
+    """
+    vertices = []
+    counts = []
+    first_vertex = {}
+    for surf in surfaces:
+        objls_id = id(surf.objls)
+        if objls_id not in first_vertex:
+            first_vertex[objls_id] = surf.objls.index("Number_of_Vertices") + 1
+        coords = surf.obj[first_vertex[objls_id] :]
+        while coords and coords[-1] == "":
+            coords = coords[:-1]
+        n_vertices = len(coords) // 3
+        vertices.extend(coords[: n_vertices * 3])
+        counts.append(n_vertices)
+
+    counts = np.array(counts, dtype=int)
+    vertices = np.array(vertices, dtype=float).reshape(-1, 3)
+    starts = np.cumsum(counts) - counts
+    has_vertices = counts > 0
+
+    area = np.zeros(len(counts))
+    z_min = np.full(len(counts), np.nan)
+    z_max = np.full(len(counts), np.nan)
+    if has_vertices.any():
+        seg_starts = starts[has_vertices]
+        area[has_vertices] = _polygons_area(vertices, seg_starts, counts[has_vertices])
+        z_min[has_vertices] = np.minimum.reduceat(vertices[:, 2], seg_starts)
+        z_max[has_vertices] = np.maximum.reduceat(vertices[:, 2], seg_starts)
+
+    return pd.DataFrame(
+        {
+            "zone": pd.Series([str(surf.Zone_Name) for surf in surfaces], dtype=object),
+            "surface_type": pd.Series(
+                [str(surf.Surface_Type).upper() for surf in surfaces], dtype=object
+            ),
+            "outside_boundary_condition": pd.Series(
+                [str(surf.Outside_Boundary_Condition) for surf in surfaces],
+                dtype=object,
+            ),
+            "area": area,
+            "z_min": z_min,
+            "z_max": z_max,
+        }
     )
 
 
+def _zones_geometry(surfaces: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per zone floor area, height, volume and exterior surface area, following
+    eppy.modeleditor zonearea, zoneheight and zonevolume.
+    """
+    is_floor = surfaces.surface_type == "FLOOR"
+    is_roof = surfaces.surface_type == "ROOF"
+    is_top = is_roof | (surfaces.surface_type == "CEILING")
+    is_exterior = surfaces.outside_boundary_condition.str.upper() == "OUTDOORS"
+
+    grouped = pd.DataFrame(
+        {
+            "zone_key": surfaces.zone.str.upper(),
+            "zone": surfaces.zone,
+            "floor": surfaces.area.where(is_floor, 0.0),
+            "top": surfaces.area.where(is_top, 0.0),
+            "n_floors": is_floor.astype(int),
+            "n_roofs": is_roof.astype(int),
+            "floor_z_min": surfaces.z_min.where(is_floor),
+            "top_z_max": surfaces.z_max.where(is_top),
+            "z_min": surfaces.z_min,
+            "z_max": surfaces.z_max,
+            "exterior": surfaces.area.where(is_exterior, 0.0),
+        }
+    ).groupby("zone_key", sort=False)
+    zones = grouped.agg(
+        zone=("zone", "first"),
+        floor=("floor", "sum"),
+        top=("top", "sum"),
+        n_floors=("n_floors", "sum"),
+        n_roofs=("n_roofs", "sum"),
+        floor_z_min=("floor_z_min", "min"),
+        top_z_max=("top_z_max", "max"),
+        z_min=("z_min", "min"),
+        z_max=("z_max", "max"),
+        exterior_surface_area=("exterior", "sum"),
+    )
+
+    has_floor = zones.n_floors > 0
+    floor_area = zones.floor.where(has_floor, zones.top)
+    height = (zones.top_z_max - zones.floor_z_min).where(
+        has_floor & (zones.n_roofs > 0), zones.z_max - zones.z_min
+    )
+    return pd.DataFrame(
+        {
+            "floor_area": floor_area,
+            "height": height.fillna(0.0),
+            "volume": (floor_area * height).fillna(0.0),
+            "exterior_surface_area": zones.exterior_surface_area,
+        }
+    ).set_index(pd.Index(zones.zone, name="zone"))
+
+
+class ZoneGeometry:
+    """
+    Geometry cache of an EnergyPlus IDF: per zone floor area, height, volume and
+    exterior (outdoors) surface area, and per surface area.
+
+    Values are computed in one vectorized pass over all the
+    BuildingSurface:Detailed vertices, instead of scanning every surface for
+    each zone as eppy.modeleditor zonearea and zonevolume do. They follow the
+    eppy definitions: the zone floor area is the area of its floors, or of its
+    roofs and ceilings if it has no floor, and the zone height is measured from
+    the floors to the roofs and ceilings, or over all its surfaces if it has no
+    floor or no roof. Zones are matched case-insensitively on the Zone_Name of
+    the surfaces.
+
+    The cache is recomputed only when BuildingSurface:Detailed objects are
+    added, removed or modified, as tracked by IdfObjectIndex.version.
+
+    Use get_zone_geometry to share a single cache per IDF.
+
+    :param idf: An EnergyPlus IDF object.
+    """
+
+    def __init__(self, idf: IDF):
+        self._idf_ref = weakref.ref(idf)
+        self._state = None
+
+    def __reduce__(self):
+        return self.__class__, (self.idf,)
+
+    @property
+    def idf(self) -> IDF:
+        return self._idf_ref()
+
+    def invalidate(self):
+        self._state = None
+
+    def _sync(self) -> tuple[pd.DataFrame, pd.DataFrame, dict[str, int]]:
+        version = get_idf_index(self.idf).version("BUILDINGSURFACE:DETAILED")
+        state = self._state
+        if state is None or state[0] != version:
+            surfaces = _peek_objects(self.idf, "BUILDINGSURFACE:DETAILED")
+            surfaces_geometry = _surfaces_geometry(surfaces)
+            zones_geometry = _zones_geometry(surfaces_geometry)
+            zone_rows = {
+                str(zone).upper(): row for row, zone in enumerate(zones_geometry.index)
+            }
+            state = self._state = (
+                version,
+                surfaces_geometry,
+                zones_geometry,
+                zone_rows,
+            )
+        return state[1], state[2], state[3]
+
+    def zones(self) -> pd.DataFrame:
+        """
+        Return a DataFrame indexed by zone names, with the floor_area [m²],
+        height [m], volume [m3] and exterior_surface_area [m²] of each zone.
+        """
+        return self._sync()[1].copy()
+
+    def _zone_values(self, zones: str | list, column: str) -> float | np.ndarray:
+        _, zones_geometry, zone_rows = self._sync()
+        values = zones_geometry[column].to_numpy()
+        zone_values = np.array(
+            [
+                values[zone_rows[key]] if key in zone_rows else 0.0
+                for key in (str(zone).upper() for zone in to_list(zones))
+            ]
+        )
+        return float(zone_values[0]) if isinstance(zones, str) else zone_values
+
+    def floor_area(self, zones: str | list) -> float | np.ndarray:
+        """
+        Floor area of a zone in m², or array of the floor areas of a list of
+        zones. The area of a zone without surface is 0.
+        """
+        return self._zone_values(zones, "floor_area")
+
+    def volume(self, zones: str | list) -> float | np.ndarray:
+        """
+        Volume of a zone in m3, or array of the volumes of a list of zones. The
+        volume of a zone without surface is 0.
+        """
+        return self._zone_values(zones, "volume")
+
+    def exterior_surface_area(self, zones: str | list) -> float | np.ndarray:
+        """
+        Area of the outdoors surfaces of a zone in m², or array of the areas of a
+        list of zones.
+        """
+        return self._zone_values(zones, "exterior_surface_area")
+
+    def surface_area(self, outside_boundary_condition: str) -> float:
+        """Total area of the surfaces with an outside boundary condition"""
+        surfaces = self._sync()[0]
+        return float(
+            surfaces.area[
+                surfaces.outside_boundary_condition == outside_boundary_condition
+            ].sum()
+        )
+
+
+_ZONE_GEOMETRIES = weakref.WeakKeyDictionary()
+
+
+def get_zone_geometry(idf: IDF) -> ZoneGeometry:
+    """
+    Return the ZoneGeometry of an IDF, created on first call. A CopyOnWriteIDF
+    shares the geometry of its base IDF, unless it modified its surfaces.
+    """
+    base_idf = getattr(idf, "base_idf", None)
+    if base_idf is not None and "BUILDINGSURFACE:DETAILED" not in idf.copied_types:
+        return get_zone_geometry(base_idf)
+    try:
+        return _ZONE_GEOMETRIES[idf]
+    except KeyError:
+        geometry = _ZONE_GEOMETRIES[idf] = ZoneGeometry(idf)
+        return geometry
+
+
+def get_building_surface_area(idf: IDF, outside_boundary_condition: str):
+    """
+    Return specific outside_boundary_condition building surface area
+    """
+    return get_zone_geometry(idf).surface_area(outside_boundary_condition)
+
+
 def get_building_volume(idf: IDF):
     """Return volume based on zones volumes"""
-    return sum(
-        [
-            eppy.modeleditor.zonevolume(idf, zname)
-            for zname in get_objects_name_list(idf, "Zone")
-        ]
-    )
+    zones = get_objects_name_list(idf, "Zone")
+    return float(get_zone_geometry(idf).volume(zones).sum())
 
 
 def is_value_in_objects_fieldname(
@@ -153,50 +827,23 @@ def set_named_objects_field_values(
         is not the same when updating multiple objects.
     """
     if idf_object_names == "*":
-        idf_object_names_list = get_objects_name_list(idf, idf_object)
+        n_objects = len(idf.idfobjects[idf_object])
     else:
-        idf_object_names_list = to_list(idf_object_names)
+        if not idf.idfobjects[idf_object]:
+            raise ValueError(f"{idf_object} not found in idf file")
+        idf_object_names = to_list(idf_object_names)
+        n_objects = len(idf_object_names)
 
     values_list = to_list(values)
     if len(values_list) == 1:
-        values_list = values_list * len(idf_object_names_list)
-
-    if len(idf_object_names_list) != len(values_list):
+        values_list = values_list[0]
+    elif n_objects != len(values_list):
         raise ValueError(
             "values and idf_object_names list must be of the "
             "same length. Or values must be a single object"
         )
 
-    for obj_name, value in zip(idf_object_names_list, values_list):
-        _set_named_object_field_value(idf, idf_object, obj_name, field_name, value)
-
-
-def _set_named_object_field_value(
-    idf, idf_object: IDF, name: str, field_name: str, value
-):
-    """
-    Set the value of a field for a specific object in an EnergyPlus IDF file.
-
-    This function allows you to set the value of a specific field for a particular
-    object in an EnergyPlus IDF file. You need to specify the IDF object type, the
-    object's name, the field name, and the value to set.
-
-    :param idf: An EnergyPlus IDF object.
-    :param idf_object: The name of the EnergyPlus object type to which the object belongs.
-    :param name: The name of the specific object you want to update.
-    :param field_name: The name of the field within the object to set.
-    :param value: The value to set for the specified field.
-    :return: None
-
-    :raises ValueError: If the specified IDF object type is not found in the IDF file.
-    """
-    obj_list = idf.idfobjects[idf_object]
-    if not obj_list:
-        raise ValueError(f"{idf_object} not found in idf file")
-
-    for obj in obj_list:
-        if obj["Name"] == name:
-            obj[field_name] = value
+    set_field_array(idf, idf_object, field_name, values_list, idf_object_names)
 
 
 def get_named_objects_field_values(
@@ -215,27 +862,10 @@ def get_named_objects_field_values(
 
     :raises ValueError: If the specified IDF object type is not found in the IDF file.
     """
-    if names == "*":
-        idf_object_names_list = get_objects_name_list(idf, idf_object)
-    else:
-        idf_object_names_list = to_list(names)
-
-    return [
-        _get_named_object_field_value(idf, idf_object, obj_name, field_name)
-        for obj_name in idf_object_names_list
-    ]
-
-
-def _get_named_object_field_value(
-    idf: IDF, idf_object: str, name: str, field_name: str
-):
-    obj_list = idf.idfobjects[idf_object]
-    if not obj_list:
+    if names != "*" and not idf.idfobjects[idf_object]:
         raise ValueError(f"{idf_object} not found in idf file")
 
-    for obj in obj_list:
-        if obj.Name == name:
-            return obj[field_name]
+    return get_field_array(idf, idf_object, field_name, names).tolist()
 
 
 def del_named_objects(idf: IDF, idf_object: str, names: str | list = "*"):
@@ -260,11 +890,13 @@ def del_named_objects(idf: IDF, idf_object: str, names: str | list = "*"):
     if names == "*":
         idf.idfobjects[idf_object] = []
     else:
-        name_list = to_list(names)
-        obj_to_remove = [idf.getobject(idf_object, name) for name in name_list]
+        index = get_idf_index(idf)
+        ids_to_remove = {
+            id(index.getobject(idf_object, name)) for name in to_list(names)
+        }
         obj_list = idf.idfobjects[idf_object]
 
-        idf.idfobjects[idf_object] = [o for o in obj_list if o not in obj_to_remove]
+        idf.idfobjects[idf_object] = [o for o in obj_list if id(o) not in ids_to_remove]
 
 
 def copy_named_object_from_idf(
@@ -288,10 +920,15 @@ def copy_named_object_from_idf(
     EnergyPlus object type.
     """
     # Get schedule in resources file
-    obj_to_copy = source_idf.getobject(idf_object, name)
+    obj_to_copy = get_idf_index(source_idf).getobject(idf_object, name)
 
     # Copy in building idf if not already present
     destination_obj_list = destination_idf.idfobjects[idf_object]
 
-    if obj_to_copy.Name not in get_objects_name_list(destination_idf, idf_object):
+    if not any(
+        obj.Name == obj_to_copy.Name
+        for obj in get_idf_index(destination_idf).getobjects(
+            idf_object, obj_to_copy.Name
+        )
+    ):
         destination_obj_list.append(obj_to_copy)
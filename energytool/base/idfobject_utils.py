@@ -2,6 +2,7 @@ import datetime
 import os
 import tempfile
 import uuid
+import weakref
 
 import eppy
 import numpy as np
@@ -9,6 +10,8 @@ import pandas as pd
 from eppy.modeleditor import IDF
 
 from energytool.base.idf_utils import (
+    _peek_objects,
+    get_idf_index,
     get_objects_name_list,
     is_value_in_objects_fieldname,
     get_building_surface_area,
@@ -103,6 +106,143 @@ def add_obj_from_obj_dict(idf: IDF, obj_dict: dict, idfobject: str, name: str):
         raise ValueError(f"{idfobject}, named {name} already exists")
 
 
+_ZONE_HVAC_TYPES = ("ZONEHVAC:EQUIPMENTCONNECTIONS", "ZONEHVAC:EQUIPMENTLIST")
+
+
+class ZoneEquipmentGraph:
+    """
+    Zone -> HVAC equipment graph of an EnergyPlus IDF, built from the
+    ZoneHVAC:EquipmentConnections and ZoneHVAC:EquipmentList objects.
+
+    The graph is built on first lookup and rebuilt when a ZoneHVAC connection or
+    equipment list is added, removed or modified, as tracked by
+    IdfObjectIndex.version. Equipment are stored by object
+    type and position, so the graph of an IDF also resolves the equipment of its
+    CopyOnWriteIDF working copies, as long as they did not modify their ZoneHVAC
+    connections and equipment lists.
+
+    Use get_zone_equipment_graph to share a single graph per IDF.
+
+    :param idf: An EnergyPlus IDF object.
+    """
+
+    def __init__(self, idf: IDF):
+        self._idf_ref = weakref.ref(idf)
+        self._version = None
+        self._edges = {}
+
+    def __reduce__(self):
+        return self.__class__, (self.idf,)
+
+    @property
+    def idf(self) -> IDF:
+        return self._idf_ref()
+
+    def invalidate(self):
+        self._version = None
+        self._edges = {}
+
+    def equipment(self, zones: str | list, idf: IDF = None) -> list[list | None]:
+        """
+        Return the HVAC equipment objects of zones.
+
+        :param zones: A zone name or a list of zone names.
+        :param idf: (Optional) The IDF the equipment objects are read from, a
+            CopyOnWriteIDF of the graph IDF. Default is the graph IDF.
+        :return: For each zone, the list of its equipment objects in the
+            equipment list order, or None if the zone has no
+            ZoneHVAC:EquipmentConnections.
+        """
+        if idf is None:
+            idf = self.idf
+        edges = self._sync()
+        zone_equipment = []
+        for zone in to_list(zones):
+            zone_edges = edges.get(str(zone).upper())
+            if zone_edges is None:
+                zone_equipment.append(None)
+                continue
+            equipment = []
+            for obj_type, name, pos in zone_edges:
+                objs = idf.idfobjects[obj_type]
+                if pos < len(objs) and str(objs[pos].obj[1]).upper() == name.upper():
+                    equipment.append(objs[pos])
+                else:
+                    # The equipment type was modified in idf
+                    obj = get_idf_index(idf).getobject(obj_type, name)
+                    if obj is not None:
+                        equipment.append(obj)
+            zone_equipment.append(equipment)
+        return zone_equipment
+
+    def _sync(self) -> dict[str, list[tuple[str, str, int]]]:
+        idf = self.idf
+        index = get_idf_index(idf)
+        version = tuple(index.version(key) for key in _ZONE_HVAC_TYPES)
+        if version != self._version:
+            self._edges = self._build(idf)
+            self._version = version
+        return self._edges
+
+    @staticmethod
+    def _build(idf: IDF) -> dict[str, list[tuple[str, str, int]]]:
+        positions = {}
+
+        def position(obj_type: str, name: str) -> int | None:
+            if obj_type not in positions:
+                type_positions = positions[obj_type] = {}
+                for pos, bunch in enumerate(_peek_objects(idf, obj_type)):
+                    if len(bunch.obj) > 1:
+                        type_positions.setdefault(str(bunch.obj[1]).upper(), pos)
+            return positions[obj_type].get(name.upper())
+
+        edges = {}
+        for connection in _peek_objects(idf, "ZONEHVAC:EQUIPMENTCONNECTIONS"):
+            zone = str(connection.Zone_Name).upper()
+            if zone in edges:
+                continue
+            zone_edges = edges[zone] = []
+            list_pos = position(
+                "ZONEHVAC:EQUIPMENTLIST",
+                str(connection.Zone_Conditioning_Equipment_List_Name),
+            )
+            if list_pos is None:
+                continue
+            equip_list = _peek_objects(idf, "ZONEHVAC:EQUIPMENTLIST")[list_pos]
+            i = 1
+            while f"Zone_Equipment_{i}_Name" in equip_list.objls:
+                obj_type = str(equip_list[f"Zone_Equipment_{i}_Object_Type"]).upper()
+                name = str(equip_list[f"Zone_Equipment_{i}_Name"])
+                i += 1
+                if not obj_type or not name or obj_type not in idf.idfobjects:
+                    continue
+                pos = position(obj_type, name)
+                if pos is not None:
+                    zone_edges.append((obj_type, name, pos))
+        return edges
+
+
+_ZONE_EQUIPMENT_GRAPHS = weakref.WeakKeyDictionary()
+
+
+def get_zone_equipment_graph(idf: IDF) -> ZoneEquipmentGraph:
+    """
+    Return the ZoneEquipmentGraph of an IDF, created on first call. A
+    CopyOnWriteIDF shares the graph of its base IDF, unless it modified its
+    ZoneHVAC connections or equipment lists.
+    """
+    base_idf = getattr(idf, "base_idf", None)
+    if base_idf is not None and not any(
+        key in idf.copied_types for key in _ZONE_HVAC_TYPES
+    ):
+        return get_zone_equipment_graph(base_idf)
+    try:
+        return _ZONE_EQUIPMENT_GRAPHS[idf]
+    except KeyError:
+        graph = _ZONE_EQUIPMENT_GRAPHS[idf] = ZoneEquipmentGraph(idf)
+        return graph
+
+
 def get_zones_idealloadsairsystem(idf: IDF, zones: str | list = "*"):
     """
     Get a list of IdealLoadsAirSystem objects for specified zones in an EnergyPlus
@@ -115,29 +255,25 @@ def get_zones_idealloadsairsystem(idf: IDF, zones: str | list = "*"):
     :return: A list of IdealLoadsAirSystem objects associated with the specified zones.
 
     The function first checks if the zones have HVAC equipment connections and then
-    searches for IdealLoadsAirSystem objects associated with those zones.
+    searches for IdealLoadsAirSystem objects associated with those zones, using the
+    cached ZoneEquipmentGraph of the IDF.
     """
     if zones == "*":
         zones = get_objects_name_list(idf, "ZONE")
     else:
         zones = to_list(zones)
 
+    graph = get_zone_equipment_graph(idf)
     ilas_list = []
-    for zone in zones:
-        equip_con = idf.getobject("ZONEHVAC:EQUIPMENTCONNECTIONS", zone)
+    for zone, equipment in zip(zones, graph.equipment(zones, idf)):
         # If zone has hvac equipments
-        if not equip_con:
+        if equipment is None:
             raise ValueError(f"{zone} doesn't have an IdealLoadAirSystem")
-
-        equip_list = equip_con.get_referenced_object(
-            "Zone_Conditioning_Equipment_List_Name"
+        ilas_list.extend(
+            obj
+            for obj in equipment
+            if obj.key.upper() == "ZONEHVAC:IDEALLOADSAIRSYSTEM"
         )
-        for i in range(18):
-            # 18 seem to be the max allowed (eppy)
-            hvac_obj = equip_list.get_referenced_object(f"Zone_Equipment_{i + 1}_Name")
-            if hvac_obj:
-                if hvac_obj.key == "ZoneHVAC:IdealLoadsAirSystem":
-                    ilas_list.append(hvac_obj)
     return ilas_list
 
 
@@ -230,16 +366,135 @@ def del_output_zone_variable(idf, zones, variables):
 
 
 def del_output_variable(idf, variables):
+    variables_set = set(to_list(variables))
     output_list = idf.idfobjects["OUTPUT:VARIABLE"]
-    to_delete = is_value_in_objects_fieldname(
-        idf, "Output:Variable", "Variable_Name", variables
-    )
+    indices_to_remove = [
+        i for i, obj in enumerate(output_list) if obj.Variable_Name in variables_set
+    ]
 
-    if np.any(to_delete):
-        indices_to_remove = [i for i, trig in enumerate(to_delete) if trig]
+    for idx in reversed(indices_to_remove):
+        del output_list[idx]
 
-        for idx in sorted(indices_to_remove, reverse=True):
-            del output_list[idx]
+
+class OutputVariableIndex:
+    """
+    Set of the (Key_Value, Variable_Name) pairs of the Output:Variable objects of
+    an EnergyPlus IDF.
+
+    The set is built on first lookup, and rebuilt when Output:Variable objects
+    are added, removed or modified, as tracked by IdfObjectIndex.version.
+    Objects added with add_object are added to the set without rebuilding it.
+
+    Use get_output_variable_index to share a single index per IDF.
+
+    :param idf: An EnergyPlus IDF object.
+    """
+
+    def __init__(self, idf: IDF):
+        self._idf_ref = weakref.ref(idf)
+        self._version = None
+        self._pairs = set()
+
+    def __reduce__(self):
+        return self.__class__, (self.idf,)
+
+    @property
+    def idf(self) -> IDF:
+        return self._idf_ref()
+
+    def invalidate(self):
+        self._version = None
+        self._pairs = set()
+
+    def pairs(self) -> set[tuple[str, str]]:
+        """The (Key_Value, Variable_Name) pairs of the IDF Output:Variable objects"""
+        version = get_idf_index(self.idf).version("OUTPUT:VARIABLE")
+        if version != self._version:
+            self._pairs = {
+                (obj.Key_Value, obj.Variable_Name)
+                for obj in _peek_objects(self.idf, "OUTPUT:VARIABLE")
+            }
+            self._version = version
+        return self._pairs
+
+    def has_output(self, key_value: str, variable: str) -> bool:
+        """
+        Return True if variable is already reported for key_value, or for all the
+        keys ("*").
+        """
+        pairs = self.pairs()
+        return (key_value, variable) in pairs or ("*", variable) in pairs
+
+    def add_object(self, key_value: str, variable: str, reporting_frequency: str):
+        """
+        Add an Output:Variable object to the IDF, and its pair to the set.
+
+        :param key_value: The Key_Value of the object.
+        :param variable: The Variable_Name of the object.
+        :param reporting_frequency: The Reporting_Frequency of the object.
+        """
+        pairs = self.pairs()
+        self.idf.newidfobject(
+            "OUTPUT:VARIABLE",
+            Key_Value=key_value,
+            Variable_Name=variable,
+            Reporting_Frequency=reporting_frequency,
+        )
+        pairs.add((key_value, variable))
+        self._version = get_idf_index(self.idf).version("OUTPUT:VARIABLE")
+
+
+_OUTPUT_VARIABLE_INDEXES = weakref.WeakKeyDictionary()
+
+
+def get_output_variable_index(idf: IDF) -> OutputVariableIndex:
+    """
+    Return the OutputVariableIndex of an IDF, created on first call and shared by
+    the output variable helpers of this module.
+    """
+    try:
+        return _OUTPUT_VARIABLE_INDEXES[idf]
+    except KeyError:
+        index = _OUTPUT_VARIABLE_INDEXES[idf] = OutputVariableIndex(idf)
+        return index
+
+
+def add_output_variables(
+    idf: IDF,
+    pairs: list[tuple[str, str]],
+    reporting_frequency: str = "Timestep",
+):
+    """
+    Add several Output:Variable objects to an EnergyPlus IDF file in one pass.
+
+    Pairs already reported, for the same key or for all the keys ("*"), are
+    skipped. A "*" key value replaces the existing output variables with the same
+    variable name.
+
+    :param idf: An EnergyPlus IDF object.
+    :param pairs: (Key_Value, Variable_Name) pairs, e.g.
+        [("Zone1", "Zone Air Temperature"), ("*", "Zone Mean Radiant Temperature")].
+    :param reporting_frequency: The reporting frequency for the output
+        variables (e.g., "Hourly", "Daily", etc.). Default is "Timestep" of the
+        simulation. Overridden by idf.output_frequency if it is set.
+    :return: None
+    """
+    index = get_output_variable_index(idf)
+    pairs = list(pairs)
+
+    wildcard_variables = {
+        var for key, var in pairs if key == "*" and not index.has_output(key, var)
+    }
+    if wildcard_variables:
+        del_output_variable(idf, list(wildcard_variables))
+
+    freq = getattr(idf, "output_frequency", reporting_frequency)
+    for key, var in pairs:
+        if key != "*" and var in wildcard_variables:
+            # Will be reported for all the keys
+            continue
+        if not index.has_output(key, var):
+            index.add_object(key, var, freq)
 
 
 def add_output_variable(
@@ -283,20 +538,11 @@ def add_output_variable(
     key_values_list = to_list(key_values)
     variables_list = to_list(variables)
 
-    for key in key_values_list:
-        for var in variables_list:
-            if not np.any(is_output_zone_variable(idf, key, var)):
-                if key == "*":
-                    del_output_variable(idf, var)
-
-                freq = getattr(idf, "output_frequency", reporting_frequency)
-
-                idf.newidfobject(
-                    "OUTPUT:VARIABLE",
-                    Key_Value=key,
-                    Variable_Name=var,
-                    Reporting_Frequency=freq,
-                )
+    add_output_variables(
+        idf,
+        [(key, var) for key in key_values_list for var in variables_list],
+        reporting_frequency,
+    )
 
 
 def get_number_of_people(idf, zones="*"):
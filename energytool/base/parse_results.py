@@ -1,5 +1,6 @@
 import datetime as dt
 import re
+import weakref
 from pathlib import Path
 
 import numpy as np
@@ -70,6 +71,172 @@ def variable_contains_regex(elmt_list):
     return "".join(tempo)[:-1]
 
 
+class ColumnIndex:
+    """
+    Parsed result columns, to select output variables by dictionary lookups
+    instead of regex scans over all the column names.
+
+    Column names are parsed following the energytool convention
+    "KEY VALUE:Variable Name [Unit](Frequency)". Key values and variable names
+    are then mapped to the positions of their columns.
+
+    A key value or a variable name is resolved with the index if it is an exact
+    name that cannot partially match another column. Otherwise the columns are
+    scanned for the name. In both cases names are matched literally, regex
+    metacharacters such as "(" or "." in EnergyPlus names are escaped.
+
+    The ColumnIndex only keeps a weak reference to a pandas Index passed as
+    columns, so it does not keep the results it was built for alive.
+
+    :param columns: Result columns names.
+    """
+
+    _column_regex = re.compile(r"^(.*):([^:]+) \[(.*)\]\((.*)\)\s*$")
+
+    def __init__(self, columns: pd.Index | list[str]):
+        if isinstance(columns, pd.Index):
+            self._columns_ref = weakref.ref(columns)
+        else:
+            columns = pd.Index(columns, dtype=object)
+            self._columns_ref = lambda: None
+        # Shallow copy sharing the names of columns, for the scan fallback
+        self._names = columns.copy()
+        self.key_values = []
+        self.variables = []
+        self.units = []
+        self.frequencies = []
+        self._key_positions = {}
+        self._variable_positions = {}
+        unparsed = []
+        for pos, col in enumerate(self._names):
+            match = self._column_regex.match(col) if isinstance(col, str) else None
+            key, variable, unit, frequency = (
+                match.groups() if match else (None, None, None, None)
+            )
+            self.key_values.append(key)
+            self.variables.append(variable)
+            self.units.append(unit)
+            self.frequencies.append(frequency)
+            if match:
+                self._key_positions.setdefault(key, []).append(pos)
+                self._variable_positions.setdefault(variable, []).append(pos)
+            else:
+                unparsed.append(str(col))
+
+        # Used to check that a name cannot partially match another column
+        self._key_blob = "\n".join(
+            [f"{key}:" for key in self._key_positions] + unparsed
+        )
+        self._variable_blob = "\n".join(
+            list(self._variable_positions) + list(self._key_positions) + unparsed
+        )
+        self._key_masks = {}
+        self._variable_masks = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def columns(self) -> pd.Index | None:
+        """The pandas Index the ColumnIndex was built for, None if it is gone"""
+        return self._columns_ref()
+
+    def mask(self, variables: str | list, key_values: str | list = "*") -> np.ndarray:
+        """
+        Return a boolean mask of the columns matching the output variables and
+        key values. See output_variable_mask.
+        """
+        if key_values == "*":
+            key_mask = np.full(len(self), True)
+        else:
+            key_mask = self._union(
+                [elmt.upper() for elmt in to_list(key_values)],
+                self._key_masks,
+                self._key_mask,
+            )
+        variable_mask = self._union(
+            to_list(variables), self._variable_masks, self._variable_mask
+        )
+        return np.logical_and(key_mask, variable_mask)
+
+    def _union(self, names, cache, mask_function):
+        mask = np.full(len(self), False)
+        for name in names:
+            if name not in cache:
+                cache[name] = mask_function(name)
+            mask |= cache[name]
+        return mask
+
+    def _key_mask(self, key):
+        if key in self._key_positions and self._key_blob.count(f"{key}:") == 1:
+            return self._positions_mask(self._key_positions[key])
+        regex = zone_contains_regex([re.escape(key)])
+        return np.asarray(self._names.str.contains(regex), dtype=bool)
+
+    def _variable_mask(self, variable):
+        if (
+            variable in self._variable_positions
+            and self._variable_blob.count(variable) == 1
+        ):
+            return self._positions_mask(self._variable_positions[variable])
+        regex = variable_contains_regex([re.escape(variable)])
+        return np.asarray(self._names.str.contains(regex), dtype=bool)
+
+    def _positions_mask(self, positions):
+        mask = np.full(len(self), False)
+        mask[positions] = True
+        return mask
+
+
+_COLUMN_INDEXES = {}
+
+
+def get_column_index(columns: pd.Index) -> ColumnIndex:
+    """
+    Return the ColumnIndex of a columns Index. It is built on the first call
+    and reused as long as the Index object is alive, so all the lookups on a
+    result DataFrame share the same index. The entry is dropped when the Index
+    is garbage collected.
+    """
+    key = id(columns)
+    column_index = _COLUMN_INDEXES.get(key)
+    if column_index is None or column_index.columns is not columns:
+        # No entry, or a stale entry of a collected Index with the same id
+        column_index = ColumnIndex(columns)
+        _COLUMN_INDEXES[key] = column_index
+        weakref.finalize(columns, _drop_column_index, key, column_index)
+    return column_index
+
+
+def _drop_column_index(key: int, column_index: ColumnIndex):
+    if _COLUMN_INDEXES.get(key) is column_index:
+        del _COLUMN_INDEXES[key]
+
+
+def output_variable_mask(
+    columns: pd.Index | list[str],
+    variables: str | list,
+    key_values: str | list = "*",
+) -> np.ndarray:
+    """
+    Return a boolean mask of the columns matching the output variables and key
+    values. Column names must follow the energytool convention
+    "KEY VALUE:Variable Name [Unit](Frequency)". See get_output_variable.
+
+    :param columns: Result columns names. If it is a pandas Index, its
+        ColumnIndex is cached and reused by subsequent calls.
+    :param variables: The names of the output variables to select.
+    :param key_values: The key values of the output variables to select. Default
+        is "*" for all key values.
+    :return: A boolean array of the same length as columns.
+    """
+    if isinstance(columns, pd.Index):
+        column_index = get_column_index(columns)
+    else:
+        column_index = ColumnIndex(columns)
+    return column_index.mask(variables, key_values)
+
+
 def get_output_variable(
     eplus_res: pd.DataFrame,
     variables: str | list,
@@ -124,19 +291,7 @@ def get_output_variable(
     ```
 
     """
-    if key_values == "*":
-        key_mask = np.full((1, eplus_res.shape[1]), True).flatten()
-    else:
-        key_list = to_list(key_values)
-        key_list_upper = [elmt.upper() for elmt in key_list]
-        reg_key = zone_contains_regex(key_list_upper)
-        key_mask = eplus_res.columns.str.contains(reg_key)
-
-    variable_names_list = to_list(variables)
-    reg_var = variable_contains_regex(variable_names_list)
-    variable_mask = eplus_res.columns.str.contains(reg_var)
-
-    mask = np.logical_and(key_mask, variable_mask)
+    mask = output_variable_mask(eplus_res.columns, variables, key_values)
 
     results = eplus_res.loc[:, mask]
 
@@ -0,0 +1,541 @@
+import copy
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from energytool.base.parse_results import ColumnIndex
+
+# IntervalType of the Time table rows of each ReportingFrequency
+_SQL_INTERVAL_TYPES = {
+    "HVAC System Timestep": -1,
+    "Zone Timestep": 0,
+    "Hourly": 1,
+    "Daily": 2,
+    "Monthly": 3,
+    "Run Period": 4,
+    "Annual": 5,
+}
+
+
+def _sql_variable_name(key_value, name, units, frequency):
+    return f"{key_value}:{name} [{units}]({frequency})"
+
+
+def _select_sql_dictionary(dictionary, variables):
+    """
+    Return the ReportDataDictionaryIndex of the dictionary rows matching the
+    (key_values, variable_name) tuples.
+    """
+    rdd_indexes = [row[0] for row in dictionary]
+    column_index = ColumnIndex([_sql_variable_name(*row[1:]) for row in dictionary])
+    mask = np.full(len(column_index), False)
+    for key_values, variable in variables:
+        mask |= column_index.mask(variable, key_values)
+
+    return [int(idx) for idx, keep in zip(rdd_indexes, mask) if keep]
+
+
+def _read_sql_dictionary(conn):
+    return conn.execute("""
+        SELECT ReportDataDictionaryIndex, KeyValue, Name, Units, ReportingFrequency
+        FROM ReportDataDictionary
+        """).fetchall()
+
+
+def _read_sql_report_times(conn, dictionary):
+    """
+    TimeIndex of the reported time steps, read from the Time table rows of the
+    reporting frequencies of the dictionary rather than by scanning ReportData.
+    All the Time rows are returned if their IntervalType is unknown.
+    """
+    time_columns = {row[1] for row in conn.execute("PRAGMA table_info(Time)")}
+    interval_types = {_SQL_INTERVAL_TYPES.get(row[4]) for row in dictionary}
+    query = "SELECT TimeIndex FROM Time"
+    if "IntervalType" in time_columns and None not in interval_types:
+        selected = ", ".join(str(it) for it in sorted(interval_types))
+        query += f" WHERE IntervalType IN ({selected})"
+    return np.array(conn.execute(query).fetchall(), dtype=np.int64).reshape(-1)
+
+
+def _read_sql_time_table(conn, ref_year, report_times):
+    """
+    Return the Time table rows of report_times indexed by TimeIndex, and their
+    DatetimeIndex in ref_year.
+    """
+    time_table = pd.read_sql_query(
+        "SELECT TimeIndex, Month, Day, Hour, Minute FROM Time", conn
+    )
+    time_table = time_table.set_index("TimeIndex").loc[np.unique(report_times)]
+    datetimes = pd.to_datetime(
+        dict(
+            year=ref_year,
+            month=time_table.Month,
+            day=time_table.Day,
+            hour=time_table.Hour,
+            minute=time_table.Minute,
+        )
+    )
+    return time_table, pd.DatetimeIndex(datetimes)
+
+
+def _fetch_sql_report_data(cursor):
+    """
+    Fetch (ReportDataDictionaryIndex, TimeIndex, Value) rows in chunks as NumPy
+    arrays.
+    """
+    dict_idx_chunks, time_idx_chunks, value_chunks = [], [], []
+    while True:
+        rows = cursor.fetchmany(1_000_000)
+        if not rows:
+            break
+        chunk = np.array(rows, dtype=np.float64)
+        del rows
+        dict_idx_chunks.append(chunk[:, 0].astype(np.int64))
+        time_idx_chunks.append(chunk[:, 1].astype(np.int64))
+        value_chunks.append(chunk[:, 2].copy())
+        del chunk
+
+    if not value_chunks:
+        return (
+            np.array([], dtype=np.int64),
+            np.array([], dtype=np.int64),
+            np.array([]),
+        )
+    return (
+        np.concatenate(dict_idx_chunks),
+        np.concatenate(time_idx_chunks),
+        np.concatenate(value_chunks),
+    )
+
+
+def _sql_wide_frame(dict_idx, time_idx, values, names, columns, time_table, datetimes):
+    """
+    Write the ReportData values at their (time, variable) position in a wide
+    DataFrame indexed by the unique datetimes.
+    """
+    column_pos = {name: pos for pos, name in enumerate(columns)}
+    used_dict_idx = np.unique(dict_idx)
+    dict_to_col = np.array(
+        [column_pos[names[idx]] for idx in used_dict_idx.tolist()], dtype=np.int64
+    )
+
+    index = pd.DatetimeIndex(np.unique(datetimes.to_numpy()), name="datetime")
+    time_to_row = index.get_indexer(datetimes)
+
+    wide = np.full((len(index), len(columns)), np.nan)
+    rows = time_to_row[np.searchsorted(time_table.index.to_numpy(), time_idx)]
+    cols = dict_to_col[np.searchsorted(used_dict_idx, dict_idx)]
+    wide[rows, cols] = values
+    del rows, cols
+
+    return pd.DataFrame(
+        wide, index=index, columns=pd.Index(columns, name="variable"), copy=False
+    )
+
+
+def _sql_frequency(datetimes):
+    """Most frequent time step of the results"""
+    return pd.Series(np.unique(datetimes.to_numpy())).diff().dropna().mode()[0]
+
+
+def _sql_selection_query(dictionary, variables):
+    query = "SELECT ReportDataDictionaryIndex, TimeIndex, Value FROM ReportData"
+    if variables is not None:
+        selected = ", ".join(
+            str(idx) for idx in _select_sql_dictionary(dictionary, variables)
+        )
+        query += f" WHERE ReportDataDictionaryIndex IN ({selected})"
+    return query
+
+
+def read_sql_timeseries(sql_path, ref_year=None, unify_frequency=True, variables=None):
+    """
+    Read the time series of an EnergyPlus eplusout.sql file into a wide DataFrame.
+
+    The dictionary and the Time tables are read once. ReportData values are
+    fetched in chunks as NumPy arrays and written directly at their
+    (time, variable) position in the wide array, without building a long
+    format DataFrame.
+
+    :param sql_path: Path to the eplusout.sql file.
+    :param ref_year: Year of the DatetimeIndex. Default is 2000.
+    :param unify_frequency: If True, reindex the results on a regular
+        DatetimeIndex using the most frequent time step. Missing values are
+        forward filled.
+    :param variables: The output variables to read, as a list of
+        (key_values, variable_name) tuples. key_values can be a name, a list of
+        names or "*". Only the matching ReportData rows are fetched. The
+        DatetimeIndex is the same as when all the variables are read. Default
+        is None for all the variables.
+    :return: A DataFrame with one column per variable, named
+        "KeyValue:Name [Units](ReportingFrequency)", sorted in alphabetical order.
+    """
+    if ref_year is None:
+        ref_year = 2000
+
+    with sqlite3.connect(sql_path) as conn:
+        dictionary = _read_sql_dictionary(conn)
+        cursor = conn.execute(_sql_selection_query(dictionary, variables))
+        dict_idx, time_idx, values = _fetch_sql_report_data(cursor)
+
+        if variables is None:
+            report_times = time_idx
+        else:
+            report_times = _read_sql_report_times(conn, dictionary)
+        time_table, datetimes = _read_sql_time_table(conn, ref_year, report_times)
+
+    # Columns, one per variable name, in alphabetical order
+    names = {
+        rdd_index: _sql_variable_name(*name_parts)
+        for rdd_index, *name_parts in dictionary
+    }
+    columns = sorted({names[idx] for idx in np.unique(dict_idx).tolist()})
+
+    df = _sql_wide_frame(
+        dict_idx, time_idx, values, names, columns, time_table, datetimes
+    )
+    del dict_idx, time_idx, values
+
+    if unify_frequency and not df.index.empty:
+        step = _sql_frequency(datetimes)
+        full_index = pd.date_range(df.index.min(), df.index.max(), freq=step)
+        df = df.reindex(full_index)
+        df = df.ffill()
+
+    return df
+
+
+def iter_sql_timeseries(
+    sql_path,
+    ref_year=None,
+    unify_frequency=True,
+    variables=None,
+    chunk_freq="M",
+) -> Iterator[pd.DataFrame]:
+    """
+    Read the time series of an EnergyPlus eplusout.sql file in time chunks.
+
+    Each chunk is read using a TimeIndex range query, so only one chunk of
+    results is held in memory at a time. The chunks have the same columns and
+    their concatenation is equal to the DataFrame returned by
+    read_sql_timeseries with the same arguments.
+
+    :param sql_path: Path to the eplusout.sql file.
+    :param ref_year: Year of the DatetimeIndex. Default is 2000.
+    :param unify_frequency: If True, reindex the results on a regular
+        DatetimeIndex using the most frequent time step of the whole results.
+        Missing values are forward filled, across chunks.
+    :param variables: The output variables to read, as a list of
+        (key_values, variable_name) tuples. Default is None for all the
+        variables. See read_sql_timeseries.
+    :param chunk_freq: Length of the chunks, as a pandas period alias.
+        Default is "M" for monthly chunks.
+    :return: A generator of DataFrames, in chronological order. A single empty
+        DataFrame is generated if no time step was reported.
+    """
+    if ref_year is None:
+        ref_year = 2000
+
+    with sqlite3.connect(sql_path) as conn:
+        dictionary = _read_sql_dictionary(conn)
+        query = _sql_selection_query(dictionary, variables)
+        report_times = _read_sql_report_times(conn, dictionary)
+        time_table, datetimes = _read_sql_time_table(conn, ref_year, report_times)
+
+        names = {
+            rdd_index: _sql_variable_name(*name_parts)
+            for rdd_index, *name_parts in dictionary
+        }
+        if variables is None:
+            used_dict_idx = list(names)
+        else:
+            used_dict_idx = _select_sql_dictionary(dictionary, variables)
+        columns = sorted({names[idx] for idx in used_dict_idx})
+        if datetimes.empty:
+            # Nothing was reported, a single empty chunk as read_sql_timeseries
+            empty = np.array([], dtype=np.int64)
+            yield _sql_wide_frame(empty, empty, empty, names, [], time_table, datetimes)
+            return
+        step = _sql_frequency(datetimes) if unify_frequency else None
+
+        # Chunks are contiguous TimeIndex ranges of the same period
+        periods = datetimes.to_period(chunk_freq)
+        chunk_bounds = np.flatnonzero(periods[1:] != periods[:-1]) + 1
+        chunk_bounds = np.concatenate([[0], chunk_bounds, [len(periods)]])
+
+        query += " AND" if variables is not None else " WHERE"
+        query += " TimeIndex BETWEEN ? AND ?"
+        previous_end, last_row = None, None
+        for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+            chunk_time_table = time_table.iloc[start:end]
+            cursor = conn.execute(
+                query,
+                (int(chunk_time_table.index[0]), int(chunk_time_table.index[-1])),
+            )
+            dict_idx, time_idx, values = _fetch_sql_report_data(cursor)
+            df = _sql_wide_frame(
+                dict_idx,
+                time_idx,
+                values,
+                names,
+                columns,
+                chunk_time_table,
+                datetimes[start:end],
+            )
+            del dict_idx, time_idx, values
+
+            if unify_frequency:
+                index_start = df.index.min()
+                if previous_end is not None and previous_end < index_start:
+                    # Fill the gap with the previous chunk
+                    index_start = previous_end + step
+                previous_end = df.index.max()
+                df = df.reindex(pd.date_range(index_start, previous_end, freq=step))
+                if last_row is not None:
+                    df.iloc[0] = df.iloc[0].fillna(last_row)
+                df = df.ffill()
+                last_row = df.iloc[-1]
+
+            yield df
+
+
+class SqlResults:
+    """
+    Lazy handle over the time series of an EnergyPlus eplusout.sql file.
+
+    select, between and resample return new handles and do not read any data.
+    They are pushed down into the SQL queries run by to_pandas: only the rows
+    of the selected variables and period are fetched, and resampling is
+    aggregated by SQLite.
+
+    :param sql_path: Path to the eplusout.sql file.
+    :param ref_year: Year of the DatetimeIndex. Default is 2000.
+    :param unify_frequency: If True, and if the results are not resampled,
+        reindex the results on a regular DatetimeIndex using the most frequent
+        time step. Missing values are forward filled within the selected period.
+    :param variables: The output variables to read, as a list of
+        (key_values, variable_name) tuples. Default is None for all the
+        variables. See read_sql_timeseries.
+
+    Example:
+    ```
+    results = SqlResults("eplusout.sql", ref_year=2009)
+    daily_temperatures = (
+        results.select("Zone Mean Air Temperature", key_values="BLOCK1:APPTX1W")
+        .between("2009-01-01", "2009-01-31")
+        .resample("D", how="max")
+        .to_pandas()
+    )
+    ```
+    """
+
+    aggregates = {"mean": "AVG", "sum": "SUM", "min": "MIN", "max": "MAX"}
+
+    def __init__(
+        self, sql_path, ref_year: int = None, unify_frequency=True, variables=None
+    ):
+        self.sql_path = Path(sql_path)
+        self.ref_year = 2000 if ref_year is None else ref_year
+        self.unify_frequency = unify_frequency
+        self.selections = [] if variables is None else [list(variables)]
+        self.start = None
+        self.end = None
+        self.rule = None
+        self.how = None
+
+    def __repr__(self):
+        return (
+            f"SqlResults({self.sql_path}, selections={self.selections}, "
+            f"start={self.start}, end={self.end}, rule={self.rule}, how={self.how})"
+        )
+
+    @property
+    def columns(self) -> list[str]:
+        """Names of the selected columns, in alphabetical order"""
+        with sqlite3.connect(self.sql_path) as conn:
+            dictionary = _read_sql_dictionary(conn)
+            return self._columns(dictionary)[1]
+
+    def select(self, variables: str | list, key_values: str | list = "*"):
+        """
+        Keep the output variables matching variables and key_values. Successive
+        selections are intersected. See get_output_variable.
+
+        :param variables: The names of the output variables to select.
+        :param key_values: The key values of the output variables to select.
+            Default is "*" for all key values.
+        :return: A new SqlResults.
+        """
+        return self._replace(selections=self.selections + [[(key_values, variables)]])
+
+    def between(self, start=None, end=None):
+        """
+        Keep the time steps between start and end, both included.
+
+        :param start: Start of the period. Default is None for no lower bound.
+        :param end: End of the period. Default is None for no upper bound.
+        :return: A new SqlResults.
+        """
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+        if self.start is not None and (start is None or self.start > start):
+            start = self.start
+        if self.end is not None and (end is None or self.end < end):
+            end = self.end
+        return self._replace(start=start, end=end)
+
+    def resample(self, rule: str, how: str = "mean"):
+        """
+        Aggregate the reported values in time bins. The bins are the ones of
+        pandas resample. Values are aggregated as reported by EnergyPlus, before
+        frequency unification.
+
+        :param rule: A pandas offset alias, e.g. "h", "D" or "ME".
+        :param how: The aggregation, one of "mean", "sum", "min" or "max".
+        :return: A new SqlResults.
+        """
+        if self.rule is not None:
+            raise ValueError("Results are already resampled")
+        if how not in self.aggregates:
+            raise ValueError(
+                f"{how} is not a valid aggregation, choose one of "
+                f"{list(self.aggregates)}"
+            )
+        return self._replace(rule=rule, how=how)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Run the queries and return the results as a wide DataFrame, with one
+        column per variable named "KeyValue:Name [Units](ReportingFrequency)".
+        """
+        with sqlite3.connect(self.sql_path) as conn:
+            dictionary = _read_sql_dictionary(conn)
+            used_dict_idx, columns = self._columns(dictionary)
+            names = {
+                rdd_index: _sql_variable_name(*name_parts)
+                for rdd_index, *name_parts in dictionary
+            }
+            report_times = _read_sql_report_times(conn, dictionary)
+            time_table, datetimes = _read_sql_time_table(
+                conn, self.ref_year, report_times
+            )
+            in_period = np.full(len(datetimes), True)
+            if self.start is not None:
+                in_period &= datetimes >= self.start
+            if self.end is not None:
+                in_period &= datetimes <= self.end
+            time_table, datetimes = time_table[in_period], datetimes[in_period]
+
+            conditions = []
+            if self.selections:
+                selected = ", ".join(str(idx) for idx in used_dict_idx)
+                conditions.append(f"ReportDataDictionaryIndex IN ({selected})")
+
+            if self.rule is None:
+                return self._read_period(
+                    conn, conditions, names, columns, time_table, datetimes
+                )
+            return self._read_resampled(
+                conn, conditions, names, columns, time_table, datetimes
+            )
+
+    def _replace(self, **kwargs):
+        new = copy.copy(self)
+        new.__dict__.update(kwargs)
+        return new
+
+    def _columns(self, dictionary):
+        # Columns are read from the dictionary, without scanning ReportData
+        used_dict_idx = {row[0] for row in dictionary}
+        for selection in self.selections:
+            used_dict_idx &= set(_select_sql_dictionary(dictionary, selection))
+        used_dict_idx = sorted(used_dict_idx)
+        names = {
+            rdd_index: _sql_variable_name(*name_parts)
+            for rdd_index, *name_parts in dictionary
+        }
+        return used_dict_idx, sorted({names[idx] for idx in used_dict_idx})
+
+    def _read_period(self, conn, conditions, names, columns, time_table, datetimes):
+        if time_table.empty:
+            return pd.DataFrame(
+                columns=pd.Index(columns, name="variable"),
+                index=pd.DatetimeIndex([], name="datetime"),
+                dtype=float,
+            )
+
+        conditions = conditions + ["TimeIndex BETWEEN ? AND ?"]
+        cursor = conn.execute(
+            "SELECT ReportDataDictionaryIndex, TimeIndex, Value FROM ReportData "
+            f"WHERE {' AND '.join(conditions)}",
+            (int(time_table.index.min()), int(time_table.index.max())),
+        )
+        dict_idx, time_idx, values = _fetch_sql_report_data(cursor)
+        in_period = np.isin(time_idx, time_table.index.to_numpy())
+        df = _sql_wide_frame(
+            dict_idx[in_period],
+            time_idx[in_period],
+            values[in_period],
+            names,
+            columns,
+            time_table,
+            datetimes,
+        )
+
+        if self.unify_frequency:
+            step = _sql_frequency(datetimes)
+            full_index = pd.date_range(df.index.min(), df.index.max(), freq=step)
+            df = df.reindex(full_index)
+            df = df.ffill()
+
+        return df
+
+    def _read_resampled(self, conn, conditions, names, columns, time_table, datetimes):
+        # Bins are computed by pandas, so they are the ones of DataFrame.resample
+        order = np.argsort(datetimes.to_numpy(), kind="stable")
+        sorted_datetimes = datetimes[order]
+        positions = pd.Series(np.arange(len(order)), index=sorted_datetimes)
+        bins = positions.resample(self.rule).size().index
+        sorted_bins = np.empty(len(order), dtype=np.int64)
+        for label, label_positions in positions.resample(self.rule).indices.items():
+            sorted_bins[label_positions] = bins.get_loc(label)
+        time_bins = np.empty(len(order), dtype=np.int64)
+        time_bins[order] = sorted_bins
+
+        conn.execute(
+            "CREATE TEMP TABLE SelectedTime "
+            "(TimeIndex INTEGER PRIMARY KEY, Bin INTEGER)"
+        )
+        try:
+            conn.executemany(
+                "INSERT INTO SelectedTime VALUES (?, ?)",
+                zip(time_table.index.tolist(), time_bins.tolist()),
+            )
+            query = (
+                f"SELECT ReportDataDictionaryIndex, Bin, "
+                f"{self.aggregates[self.how]}(Value) "
+                "FROM ReportData JOIN SelectedTime USING (TimeIndex)"
+            )
+            if conditions:
+                query += f" WHERE {' AND '.join(conditions)}"
+            cursor = conn.execute(query + " GROUP BY ReportDataDictionaryIndex, Bin")
+            dict_idx, bin_idx, values = _fetch_sql_report_data(cursor)
+        finally:
+            conn.execute("DROP TABLE temp.SelectedTime")
+
+        column_pos = {name: pos for pos, name in enumerate(columns)}
+        wide = np.full((len(bins), len(columns)), np.nan)
+        cols = np.array(
+            [column_pos[names[idx]] for idx in dict_idx.tolist()], dtype=np.int64
+        )
+        wide[bin_idx, cols] = values
+
+        return pd.DataFrame(
+            wide,
+            index=pd.DatetimeIndex(bins, name="datetime"),
+            columns=pd.Index(columns, name="variable"),
+            copy=False,
+        )
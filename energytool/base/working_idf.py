@@ -0,0 +1,122 @@
+import copy
+from collections.abc import MutableMapping
+
+from eppy.EPlusInterfaceFunctions.eplusdata import Eplusdata
+from eppy.bunch_subclass import EpBunch
+from eppy.idf_msequence import Idf_MSequence
+from eppy.modeleditor import IDF
+
+
+class _CopyOnWriteModel(Eplusdata):
+    """
+    eppy ``Eplusdata`` sharing the ordered list of object types (``dtls``) with
+    the base model. ``dt`` only holds the raw object lists of the object types
+    that have been copied in the working IDF.
+    """
+
+    def __init__(self, base_model: Eplusdata):
+        super().__init__()
+        self.dtls = base_model.dtls
+
+
+class _CopyOnWriteObjects(MutableMapping):
+    """
+    Case-insensitive mapping of object types to idf objects sequences.
+    An object type is read from the base IDF until it is first accessed, it is
+    then copied in the working IDF and all subsequent modifications are local.
+    """
+
+    def __init__(self, working_idf, base_idf: IDF):
+        self._working_idf = working_idf
+        self._base_objects = base_idf.idfobjects
+        self._copied = {}
+
+    def __getitem__(self, key):
+        key = key.upper()
+        try:
+            return self._copied[key]
+        except KeyError:
+            pass
+
+        base_sequence = self._base_objects[key]
+        objs = [copy.copy(bunch.obj) for bunch in base_sequence]
+        bunches = [
+            EpBunch(obj, bunch.objls, bunch.objidd)
+            for obj, bunch in zip(objs, base_sequence)
+        ]
+        self._working_idf.model.dt[key] = objs
+        self._copied[key] = Idf_MSequence(bunches, objs, self._working_idf)
+        return self._copied[key]
+
+    def __setitem__(self, key, value):
+        self._copied[key.upper()] = value
+
+    def __delitem__(self, key):
+        raise TypeError("Object types cannot be removed from an IDF")
+
+    def __contains__(self, key):
+        return isinstance(key, str) and key.upper() in self._base_objects
+
+    def __iter__(self):
+        return iter(self._base_objects)
+
+    def __len__(self):
+        return len(self._base_objects)
+
+    @property
+    def copied_types(self):
+        return list(self._copied.keys())
+
+    def peek(self, key):
+        """Return the objects of a type without copying them from the base IDF"""
+        key = key.upper()
+        try:
+            return self._copied[key]
+        except KeyError:
+            return self._base_objects[key]
+
+
+class CopyOnWriteIDF(IDF):
+    """
+    A working copy of an eppy IDF that does not duplicate the base model.
+
+    Object types are shared with the base IDF until they are first accessed
+    through ``idfobjects`` (directly or using eppy methods such as ``getobject``
+    or ``newidfobject``). Only then are the objects of this type copied, so
+    modifications never reach the base IDF. Untouched object types are read
+    from the base IDF when the working IDF is written (``idfstr``, ``save``,
+    ``saveas``).
+
+    The base IDF must not be modified while a working copy is in use.
+
+    :param base_idf: The eppy IDF object to work on.
+    """
+
+    def __init__(self, base_idf: IDF):
+        super().__init__()
+        self.base_idf = base_idf
+        self.idfname = base_idf.idfname
+        self.idfabsname = getattr(base_idf, "idfabsname", None)
+        self.outputtype = base_idf.outputtype
+        if hasattr(base_idf, "epw"):
+            self.epw = base_idf.epw
+        self.model = _CopyOnWriteModel(base_idf.model)
+        self.idfobjects = _CopyOnWriteObjects(self, base_idf)
+
+    @property
+    def copied_types(self) -> list[str]:
+        """Object types that were copied from the base IDF"""
+        return self.idfobjects.copied_types
+
+    def idfstr(self):
+        if self.outputtype != "standard":
+            # Non-standard outputs are rendered from the full model
+            for key in self.model.dtls:
+                self.idfobjects[key]
+            return super().idfstr()
+
+        return "".join(
+            obj.__repr__()
+            for objname in self.model.dtls
+            for obj in self.idfobjects.peek(objname)
+        )
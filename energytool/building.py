@@ -1,3 +1,4 @@
+import asyncio
 import eppy
 import enum
 import platform
@@ -6,22 +7,31 @@ import tempfile
 import shutil
 import time
 
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
 from contextlib import contextmanager, nullcontext
+from multiprocessing import cpu_count
 from copy import deepcopy
 from pathlib import Path
 
 import pandas as pd
 from corrai.base.model import Model
 from eppy.modeleditor import IDF
-from eppy.runner.run_functions import run
 import eppy.json_functions as json_functions
 
-import sqlite3
-import pandas as pd
-
 import energytool.base.idf_utils
 from energytool.base.parse_results import read_eplus_res
-from energytool.outputs import get_results
+from energytool.base.sql_results import (
+    SqlResults,
+    iter_sql_timeseries,
+    read_sql_timeseries,
+)
+from energytool.base.working_idf import CopyOnWriteIDF
+from energytool.cache import SimulationCache
+from energytool.memory import MemoryPolicy
+from energytool.results_store import ResultsStore
+from energytool.runner import RunDirectoryPool, run, run_async
+from energytool.outputs import get_results, OutputCategories
 from energytool.system import System, SystemCategories
 from energytool.base.idfobject_utils import (
     get_number_of_people,
@@ -44,6 +54,9 @@ class SimuOpt(enum.Enum):
     EPW_FILE = "epw_file"
     VERBOSE = "verbose"
     OUTPUT_FREQUENCY = "OUTPUT_FREQUENCY"
+    RAW_VARIABLES = "raw_variables"
+    RESULTS_CHUNK = "results_chunk"
+    TIMEOUT = "timeout"
 
 
 @contextmanager
@@ -72,51 +85,59 @@ def ensure_sql_output(idf):
         idf.newidfobject("OUTPUT:SQLITE", Option_Type="SimpleAndTabular")
 
 
-def read_sql_timeseries(sql_path, ref_year=None, unify_frequency=True):
-
-    query = """
-    SELECT
-        t.Month,
-        t.Day,
-        t.Hour,
-        t.Minute,
-        rdd.KeyValue || ':' || rdd.Name || ' [' || rdd.Units || '](' || rdd.ReportingFrequency || ')' AS variable,
-        rd.Value
-    FROM ReportData rd
-    JOIN ReportDataDictionary rdd
-        ON rd.ReportDataDictionaryIndex = rdd.ReportDataDictionaryIndex
-    JOIN Time t
-        ON rd.TimeIndex = t.TimeIndex
+def _required_variables(systems: list[System], simulation_options: dict):
+    """
+    Return the (key_values, variable_name) tuples to read from the simulation
+    results, or None if all the variables must be read.
+    RAW outputs require all the variables, unless they are restricted using the
+    RAW_VARIABLES simulation option.
     """
+    outputs = simulation_options[SimuOpt.OUTPUTS.value].split("|")
+    raw_variables = simulation_options.get(SimuOpt.RAW_VARIABLES.value)
+    if OutputCategories.RAW.value in outputs and raw_variables is None:
+        return None
 
-    with sqlite3.connect(sql_path) as conn:
-        df = pd.read_sql_query(query, conn)
+    variables = [] if raw_variables is None else list(raw_variables)
+    for system in systems:
+        system_variables = system.get_required_variables()
+        if system_variables is None:
+            return None
+        variables += system_variables
 
-    if ref_year is None:
-        ref_year = 2000
+    return variables
+
+
+def _advance_steps(steps):
+    """
+    Resume a Building._simulate_steps generator. Return (True, results) if it
+    is finished, else (False, EnergyPlus run keyword arguments).
+    """
+    try:
+        return False, next(steps)
+    except StopIteration as stop:
+        return True, stop.value
 
-    dt = pd.to_datetime(
-        dict(
-            year=ref_year,
-            month=df.Month,
-            day=df.Day,
-            hour=df.Hour,
-            minute=df.Minute,
-        )
-    )
 
-    df["datetime"] = dt
+_WORKER_BUILDING = None
 
-    df = df.pivot(index="datetime", columns="variable", values="Value")
-    df = df.sort_index()
 
-    if unify_frequency:
-        step = df.index.to_series().diff().dropna().mode()[0]
-        full_index = pd.date_range(df.index.min(), df.index.max(), freq=step)
-        df = df.reindex(full_index)
-        df = df.ffill()
+def _init_batch_worker(building, idd_name):
+    """Store the base Building once per worker process"""
+    global _WORKER_BUILDING
+    if idd_name is not None:
+        try:
+            IDF.setiddname(idd_name)
+        except eppy.modeleditor.IDDAlreadySetError:
+            pass
+    _WORKER_BUILDING = building
+
 
-    return df
+def _simulate_batch_sample(property_dict, simulation_options, simulation_kwargs):
+    return _WORKER_BUILDING.simulate(
+        property_dict=property_dict,
+        simulation_options=simulation_options,
+        **simulation_kwargs,
+    )
 
 
 class Building(Model):
@@ -125,11 +146,26 @@ class Building(Model):
     simulation file.
 
     :param idf_path: The path to the EnergyPlus IDF file that defines the building model.
+    :param result_cache: (Optional) A SimulationCache. If provided, simulate
+        reuses the EnergyPlus results of identical simulations instead of running
+        EnergyPlus again.
+    :param results_store: (Optional) A ResultsStore. If provided, simulate
+        writes the raw results of each run, with its parameters, in the store.
+    :param memory_policy: (Optional) A MemoryPolicy deciding when the garbage
+        collector is forced after a simulation, and recording memory statistics
+        of each simulation. Default is a MemoryPolicy that never forces it.
+    :param run_directories: (Optional) A RunDirectoryPool providing recycled
+        run directories to simulations without working_directory. Default is
+        None, a temporary directory is created and removed for each simulation.
 
     Attributes:
         idf: An EnergyPlus IDF object representing the building's configuration.
         systems: A dictionary that stores various categories of
         energytool HVAC systems associated with the building.
+        result_cache: The SimulationCache used by simulate, or None.
+        results_store: The ResultsStore used by simulate, or None.
+        memory_policy: The MemoryPolicy used by simulate.
+        run_directories: The RunDirectoryPool used by simulate, or None.
 
     Methods:
         set_idd(root_eplus): Sets the EnergyPlus IDD file used for parsing the IDF file.
@@ -143,11 +179,22 @@ class Building(Model):
         as a pandas DataFrame.
     """
 
-    def __init__(self, idf_path):
+    def __init__(
+        self,
+        idf_path,
+        result_cache: SimulationCache = None,
+        results_store: ResultsStore = None,
+        memory_policy: MemoryPolicy = None,
+        run_directories: RunDirectoryPool = None,
+    ):
         super().__init__(is_dynamic=True)
         self.idf = IDF(str(idf_path))
         self._idf_path = str(idf_path)
         self.systems = {category: [] for category in SystemCategories}
+        self.result_cache = result_cache
+        self.results_store = results_store
+        self.memory_policy = MemoryPolicy() if memory_policy is None else memory_policy
+        self.run_directories = run_directories
 
     def get_property_values(self, property_list: list[str]) -> list[str | int | float]:
         return self.get_param_init_value(property_list)
@@ -159,23 +206,24 @@ class Building(Model):
         except eppy.modeleditor.IDDAlreadySetError:
             pass
 
+    @property
+    def idf_index(self) -> energytool.base.idf_utils.IdfObjectIndex:
+        """Lookup table of self.idf objects, shared with the idf_utils helpers"""
+        return energytool.base.idf_utils.get_idf_index(self.idf)
+
     @property
     def zone_name_list(self):
         return energytool.base.idf_utils.get_objects_name_list(self.idf, "Zone")
 
     @property
     def surface(self):
-        return sum(
-            eppy.modeleditor.zonearea(self.idf, z.Name)
-            for z in self.idf.idfobjects["Zone"]
-        )
+        geometry = energytool.base.idf_utils.get_zone_geometry(self.idf)
+        return float(geometry.floor_area(self.zone_name_list).sum())
 
     @property
     def volume(self):
-        return sum(
-            eppy.modeleditor.zonevolume(self.idf, z.Name)
-            for z in self.idf.idfobjects["Zone"]
-        )
+        geometry = energytool.base.idf_utils.get_zone_geometry(self.idf)
+        return float(geometry.volume(self.zone_name_list).sum())
 
     def __repr__(self):
         return f"""==Building==
@@ -211,6 +259,8 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
     ):
         """
         Returns the initial value(s) of one or more parameters of the model.
+        Values are read from the model without copying it. Named IDF objects are
+        retrieved using the Building idf_index.
 
         :param parameter_name_list: A string or list of parameter names (str), like
             "idf.Material.SomeMat.Thickness" or "system.heating.Heater.cop"
@@ -222,7 +272,6 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
         else:
             is_single = False
 
-        working_idf = deepcopy(self.idf)
         values = []
 
         for full_key in parameter_name_list:
@@ -235,11 +284,15 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
                     object_type = split_key[1]
                     field_name = split_key[-1]
 
-                    objs = working_idf.idfobjects[object_type.upper()]
-                    for obj in objs:
-                        values.append(getattr(obj, field_name))
+                    values.extend(
+                        energytool.base.idf_utils.get_field_array(
+                            self.idf, object_type, field_name
+                        ).tolist()
+                    )
                 else:
-                    value = energytool.base.idf_utils.getidfvalue(working_idf, full_key)
+                    value = energytool.base.idf_utils.getidfvalue(
+                        self.idf, full_key, index=self.idf_index
+                    )
                     values.append(value)
 
             elif split_key[0] == ParamCategories.SYSTEM.value:
@@ -265,8 +318,10 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
         simulation_options=None,
         working_directory=None,
         idf_save_path=None,
+        lazy_results=False,
+        run_id=None,
         **simulation_kwargs,
-    ) -> pd.DataFrame:
+    ) -> pd.DataFrame | SqlResults:
         """
         Simulate the building model with specified parameters and simulation options.
 
@@ -284,13 +339,28 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
             the behavior of the EnergyPlus simulation.
             These options can include the choice of weather file, run period,
             time step, and desired outputs.
-            See SimuOpt enum for allowed simulation options
+            See SimuOpt enum for allowed simulation options.
+            With RESULTS_CHUNK, a pandas period alias such as "M", the results
+            are read and post-processed by time chunks to bound memory use. The
+            result cache is not used in this case.
+            With TIMEOUT, a duration in seconds, EnergyPlus is killed if it does
+            not finish in time and an EnergyPlusTimeoutError is raised.
 
         :param idf_save_path: (Optional) A Path where the modified
         IDF (Input Data File) will be saved after applying the specified
         parameter changes.
         If not provided, the modified IDF will not be saved separately.
 
+        :param lazy_results: (Optional) If True, return a SqlResults handle over
+            the eplusout.sql file instead of a DataFrame. Data is read only when
+            SqlResults.to_pandas is called. Only available for RAW outputs, and a
+            working_directory must be given as the results are kept there.
+            Default is False.
+
+        :param run_id: (Optional) Identifier of the run in the Building
+            results_store. Default is None for a random identifier. Results are
+            not stored with lazy_results or RESULTS_CHUNK.
+
         :return: A pandas DataFrame containing the simulation results, which may
             include energy consumption, indoor conditions, and other relevant data
             based on the specified outputs.
@@ -315,10 +385,122 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
         results = building.simulate(property_dict=parameter_changes,
         simulation_options=simulation_options)
 
+        """
+        with self.memory_policy.track(label=run_id):
+            return self._simulate(
+                property_dict=property_dict,
+                simulation_options=simulation_options,
+                working_directory=working_directory,
+                idf_save_path=idf_save_path,
+                lazy_results=lazy_results,
+                run_id=run_id,
+                **simulation_kwargs,
+            )
+
+    async def simulate_async(
+        self,
+        property_dict=None,
+        simulation_options=None,
+        working_directory=None,
+        idf_save_path=None,
+        lazy_results=False,
+        run_id=None,
+        semaphore: asyncio.Semaphore = None,
+        executor: Executor = None,
+        **simulation_kwargs,
+    ) -> pd.DataFrame | SqlResults:
+        """
+        Asynchronous version of simulate, for asyncio applications.
+
+        EnergyPlus is launched with asyncio.create_subprocess_exec, so no thread
+        is blocked while it runs. The IDF preparation and the results parsing
+        run in an executor, off the event loop.
+
+        :param semaphore: (Optional) An asyncio.Semaphore shared by concurrent
+            calls to bound the number of EnergyPlus processes running at the
+            same time. Default is None, no bound.
+        :param executor: (Optional) The concurrent.futures.Executor used for the
+            IDF preparation and the results parsing. Default is None for the
+            event loop default executor.
+        See simulate for the other parameters.
+
+        Usage:
+        semaphore = asyncio.Semaphore(4)
+        results = await asyncio.gather(
+            *(
+                building.simulate_async(
+                    property_dict, simulation_options, semaphore=semaphore
+                )
+                for property_dict in property_dicts
+            )
+        )
+        """
+        with self.memory_policy.track(label=run_id):
+            return await self._simulate_async(
+                semaphore=semaphore,
+                executor=executor,
+                property_dict=property_dict,
+                simulation_options=simulation_options,
+                working_directory=working_directory,
+                idf_save_path=idf_save_path,
+                lazy_results=lazy_results,
+                run_id=run_id,
+                **simulation_kwargs,
+            )
+
+    def _simulate(self, **simulate_kwargs) -> pd.DataFrame | SqlResults:
+        steps = self._simulate_steps(**simulate_kwargs)
+        try:
+            done, value = _advance_steps(steps)
+            while not done:
+                run(**value)
+                done, value = _advance_steps(steps)
+        finally:
+            # Clean up the temporary directory if EnergyPlus failed
+            steps.close()
+        return value
+
+    async def _simulate_async(
+        self,
+        semaphore: asyncio.Semaphore = None,
+        executor: Executor = None,
+        **simulate_kwargs,
+    ) -> pd.DataFrame | SqlResults:
+        loop = asyncio.get_running_loop()
+        steps = self._simulate_steps(**simulate_kwargs)
+        try:
+            # The IDF preparation and the results parsing run in the executor
+            done, value = await loop.run_in_executor(executor, _advance_steps, steps)
+            while not done:
+                async with semaphore or nullcontext():
+                    await run_async(**value)
+                done, value = await loop.run_in_executor(
+                    executor, _advance_steps, steps
+                )
+        finally:
+            steps.close()
+        return value
+
+    def _simulate_steps(
+        self,
+        property_dict=None,
+        simulation_options=None,
+        working_directory=None,
+        idf_save_path=None,
+        lazy_results=False,
+        run_id=None,
+        **simulation_kwargs,
+    ):
+        """
+        Generator holding the simulation steps. It yields the keyword arguments
+        of the EnergyPlus run, and resumes once the caller has run it. The
+        simulation results are the generator return value.
         """
         self.idf_save_path = idf_save_path
 
-        working_idf = deepcopy(self.idf)
+        # Only the object types touched by property_dict and pre_process
+        # are copied from self.idf
+        working_idf = CopyOnWriteIDF(self.idf)
         working_syst = deepcopy(self.systems)
 
         epw_path = None
@@ -335,9 +517,9 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
                     field_name = split_key[-1]
                     value = property_dict[key]
 
-                    objs = working_idf.idfobjects[object_type.upper()]
-                    for obj in objs:
-                        setattr(obj, field_name, value)
+                    energytool.base.idf_utils.set_field_array(
+                        working_idf, object_type, field_name, value
+                    )
                 else:
                     json_functions.updateidf(working_idf, {key: property_dict[key]})
 
@@ -414,47 +596,173 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
 
         ensure_sql_output(working_idf)
 
-        import gc
+        # Only the variables used by RAW outputs and post-process are read
+        variables = _required_variables(system_list, simulation_options)
+
+        # Results are read and post-processed by time chunks if requested
+        results_chunk = simulation_options.get(SimuOpt.RESULTS_CHUNK.value)
 
-        gc.collect()
+        if lazy_results:
+            if simulation_options[SimuOpt.OUTPUTS.value] != OutputCategories.RAW.value:
+                raise ValueError("lazy_results is only available for RAW outputs")
+            if working_directory is None:
+                raise ValueError(
+                    "lazy_results requires a working_directory to keep eplusout.sql"
+                )
+
+        # Look for identical simulation results in cache
+        cache_key = None
+        eplus_res = None
+        if self.result_cache is not None and results_chunk is None and not lazy_results:
+            cache_key = self.result_cache.key(
+                idf_str=working_idf.idfstr(),
+                epw_path=epw_path,
+                eplus_version=working_idf.idd_version,
+                outputs=simulation_options[SimuOpt.OUTPUTS.value],
+                ref_year=ref_year,
+                variables=variables,
+            )
+            eplus_res = self.result_cache.get(cache_key)
 
         # SIMULATE
-        if working_directory is None:
-            context = temporary_directory()
-        else:
-            working_directory = Path(working_directory)
-            working_directory.mkdir(parents=True, exist_ok=True)
-            context = nullcontext(working_directory)
-
-        with context as temp_dir:
-
-            working_idf.saveas((Path(temp_dir) / "in.idf").as_posix(), encoding="utf-8")
-            idd_ref = working_idf.idd_version
-            run(
-                idf=working_idf,
-                weather=epw_path,
-                output_directory=Path(temp_dir).as_posix(),
-                annual=False,
-                design_day=False,
-                readvars=False,
-                verbose=simulation_options[SimuOpt.VERBOSE.value],
-                ep_version=f"{idd_ref[0]}-{idd_ref[1]}-{idd_ref[2]}",
+        chunk_results = None
+        if eplus_res is None:
+            if working_directory is None and self.run_directories is not None:
+                context = self.run_directories.directory()
+            elif working_directory is None:
+                context = temporary_directory()
+            else:
+                working_directory = Path(working_directory)
+                working_directory.mkdir(parents=True, exist_ok=True)
+                context = nullcontext(working_directory)
+
+            with context as temp_dir:
+                working_idf.saveas(
+                    (Path(temp_dir) / "in.idf").as_posix(), encoding="utf-8"
+                )
+                idd_ref = working_idf.idd_version
+                # EnergyPlus is run by the caller, see _simulate
+                yield dict(
+                    idf=working_idf,
+                    weather=epw_path,
+                    output_directory=Path(temp_dir).as_posix(),
+                    annual=False,
+                    design_day=False,
+                    readvars=False,
+                    verbose=simulation_options[SimuOpt.VERBOSE.value],
+                    ep_version=f"{idd_ref[0]}-{idd_ref[1]}-{idd_ref[2]}",
+                    timeout=simulation_options.get(SimuOpt.TIMEOUT.value),
+                )
+
+                # With lazy_results, eplusout.sql is read by the returned SqlResults
+                sql_path = Path(temp_dir) / "eplusout.sql"
+                if results_chunk is None and not lazy_results:
+                    eplus_res = read_sql_timeseries(
+                        sql_path, ref_year=ref_year, variables=variables
+                    )
+                elif not lazy_results:
+                    # POST-PROCESS each chunk, raw results are never fully loaded
+                    chunk_results = [
+                        get_results(
+                            idf=working_idf,
+                            eplus_res=chunk,
+                            systems=working_syst,
+                            outputs=simulation_options[SimuOpt.OUTPUTS.value],
+                        )
+                        for chunk in iter_sql_timeseries(
+                            sql_path,
+                            ref_year=ref_year,
+                            variables=variables,
+                            chunk_freq=results_chunk,
+                        )
+                    ]
+
+            if cache_key is not None:
+                self.result_cache.put(cache_key, eplus_res)
+
+        if self.results_store is not None and eplus_res is not None:
+            self.results_store.write(
+                eplus_res,
+                run_id=run_id,
+                parameters=property_dict,
+                simulation_options=simulation_options,
+                epw_path=epw_path,
+                eplus_version=working_idf.idd_version,
             )
 
-            eplus_res = read_sql_timeseries(
-                Path(temp_dir) / "eplusout.sql", ref_year=ref_year
+        # Save IDF file after pre-process
+        if idf_save_path:
+            working_idf.save(idf_save_path)
+
+        if lazy_results:
+            return SqlResults(
+                Path(working_directory) / "eplusout.sql",
+                ref_year=ref_year,
+                variables=variables,
             )
 
-            # Save IDF file after pre-process
-            if self.idf_save_path:
-                working_idf.save(idf_save_path)
+        if chunk_results is not None:
+            return pd.concat(chunk_results)
 
-            # POST-PROCESS
-            return get_results(
-                idf=working_idf,
-                eplus_res=eplus_res,
-                systems=working_syst,
-                outputs=simulation_options[SimuOpt.OUTPUTS.value],
+        # POST-PROCESS
+        return get_results(
+            idf=working_idf,
+            eplus_res=eplus_res,
+            systems=working_syst,
+            outputs=simulation_options[SimuOpt.OUTPUTS.value],
+        )
+
+    def simulate_batch(
+        self,
+        property_dicts: list[dict],
+        simulation_options: dict,
+        n_workers: int = -1,
+        **simulation_kwargs,
+    ) -> Iterator[tuple[int, pd.DataFrame]]:
+        """
+        Simulate the building model for several sets of parameters using a pool
+        of worker processes.
+
+        The Building is sent once to each worker when the pool starts. Each task
+        then only carries its property_dict, applied by simulate on a working copy
+        of the worker Building. The pool is stopped at the end of the batch, use a
+        BuildingPool to keep the workers across batches.
+
+        Results are yielded as soon as each simulation finishes, so they are not
+        ordered. Each item is a tuple (index of the property_dict in
+        property_dicts, simulate results).
+
+        :param property_dicts: A list of property_dict, see simulate.
+        :param simulation_options: Simulation options shared by all simulations,
+            see simulate.
+        :param n_workers: Number of worker processes. Negative values are
+            added to the number of available CPUs. If 1, simulations are run
+            sequentially in the current process.
+        :param simulation_kwargs: Additional keyword arguments passed to simulate.
+        :return: An iterator of (index, results DataFrame) tuples.
+
+        Usage:
+        for idx, res in building.simulate_batch(samples, simulation_options):
+            results[idx] = res
+        """
+        if n_workers <= 0:
+            n_workers = max(1, cpu_count() + n_workers)
+
+        if n_workers == 1:
+            for idx, property_dict in enumerate(property_dicts):
+                yield (
+                    idx,
+                    self.simulate(
+                        property_dict=property_dict,
+                        simulation_options=dict(simulation_options),
+                        **simulation_kwargs,
+                    ),
+                )
+            return
+
+        with BuildingPool(self, n_workers=n_workers) as pool:
+            yield from pool.simulate_batch(
+                property_dicts, simulation_options, **simulation_kwargs
             )
 
     def save(self, file_path: Path):
@@ -464,3 +772,93 @@ Others: {[obj.name for obj in self.systems[SystemCategories.OTHER]]}
         :param file_path: The file path where the parameters will be saved.
         """
         self.idf.saveas(file_path.as_posix(), encoding="utf-8")
+
+
+class BuildingPool:
+    """
+    Persistent pool of worker processes holding a base Building.
+
+    The IDD is set and the Building is loaded once in each worker when the pool
+    starts, and kept in memory across tasks. Each task then only carries its
+    property_dict and simulation options, applied by Building.simulate on a
+    copy-on-write working copy of the worker Building. Use it for repeated
+    batches of short simulations (e.g. design days or one-week runs), where
+    starting workers and loading the model would dominate.
+
+    Modifications of the Building after the pool creation are not seen by the
+    workers.
+
+    :param building: The base Building.
+    :param n_workers: Number of worker processes. Negative values are added to
+        the number of available CPUs. Default is -1.
+    :param mp_context: (Optional) A multiprocessing context for the worker
+        processes, see concurrent.futures.ProcessPoolExecutor.
+
+    Usage:
+    with BuildingPool(building, n_workers=4) as pool:
+        for idx, res in pool.simulate_batch(samples, simulation_options):
+            results[idx] = res
+        future = pool.submit(property_dict, simulation_options)
+    """
+
+    def __init__(self, building: Building, n_workers: int = -1, mp_context=None):
+        if n_workers <= 0:
+            n_workers = max(1, cpu_count() + n_workers)
+        self.n_workers = n_workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=mp_context,
+            initializer=_init_batch_worker,
+            initargs=(building, IDF.getiddname()),
+        )
+
+    def __repr__(self):
+        return f"BuildingPool(n_workers={self.n_workers})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(cancel_futures=exc_type is not None)
+
+    def submit(
+        self, property_dict: dict, simulation_options: dict, **simulation_kwargs
+    ) -> Future:
+        """
+        Submit a simulation of the worker Building, see Building.simulate.
+
+        :return: A concurrent.futures.Future of the simulation results.
+        """
+        return self._executor.submit(
+            _simulate_batch_sample,
+            property_dict,
+            dict(simulation_options),
+            simulation_kwargs,
+        )
+
+    def simulate_batch(
+        self,
+        property_dicts: list[dict],
+        simulation_options: dict,
+        **simulation_kwargs,
+    ) -> Iterator[tuple[int, pd.DataFrame]]:
+        """
+        Simulate the worker Building for several sets of parameters. Results are
+        yielded as soon as each simulation finishes, see Building.simulate_batch.
+
+        :return: An iterator of (index, results DataFrame) tuples.
+        """
+        futures = {
+            self.submit(property_dict, simulation_options, **simulation_kwargs): idx
+            for idx, property_dict in enumerate(property_dicts)
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import pickle
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+_FILE_DIGESTS = {}
+
+
+def file_digest(file_path: str | Path) -> str:
+    """
+    Return the sha256 of a file contents. Digests are memoized using the file
+    path, modification time and size.
+    """
+    file_path = Path(file_path)
+    stat = file_path.stat()
+    memo_key = (file_path.resolve(), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _FILE_DIGESTS:
+        _FILE_DIGESTS[memo_key] = hashlib.sha256(file_path.read_bytes()).hexdigest()
+    return _FILE_DIGESTS[memo_key]
+
+
+class SimulationCache:
+    """
+    On-disk cache of parsed EnergyPlus results.
+
+    Entries are addressed by a hash of everything that determines the
+    EnergyPlus outputs: the serialized IDF text, the EPW file contents, the
+    EnergyPlus version, the requested outputs, the reference year used to
+    build the time index and the selection of output variables. Each entry
+    stores the parsed results DataFrame (before energytool post-processing), so
+    systems post_process can still be applied on a cache hit.
+
+    The cache size is bounded. When it is exceeded, the least recently used
+    entries are removed. Entries access time is tracked using the files
+    modification time, so the cache can be shared by several processes.
+
+    :param cache_dir: Directory where the entries are stored. It is created if
+        it doesn't exist.
+    :param max_size: Maximum size of the cache in bytes. Default is 1 GB.
+
+    Attributes:
+        hits: Number of successful lookups since the cache object was created.
+        misses: Number of failed lookups since the cache object was created.
+    """
+
+    suffix = ".pkl"
+
+    def __init__(self, cache_dir: str | Path, max_size: int = 1024**3):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return (
+            f"SimulationCache({self.cache_dir}, {len(self)} entries, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __contains__(self, key: str):
+        return self._path(key).exists()
+
+    def key(
+        self,
+        idf_str: str,
+        epw_path: str | Path,
+        eplus_version: tuple | str,
+        outputs: str,
+        ref_year: int = None,
+        variables: list[tuple[str | list, str]] = None,
+    ) -> str:
+        """
+        Return the address of the results of a simulation.
+
+        :param idf_str: The serialized IDF, as returned by IDF.idfstr().
+        :param epw_path: Path to the weather file.
+        :param eplus_version: The EnergyPlus version, e.g. IDF.idd_version.
+        :param outputs: The requested outputs.
+        :param ref_year: The reference year of the results index.
+        :param variables: The (key_values, variable_name) tuples read from the
+            results. Default is None for all the variables.
+        """
+        hasher = hashlib.sha256()
+        for elmt in [
+            idf_str,
+            file_digest(epw_path),
+            str(eplus_version),
+            str(outputs),
+            str(ref_year),
+            str(variables),
+        ]:
+            hasher.update(elmt.encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        Return the results stored at key, or None if they are not in the cache.
+        Corrupted entries, e.g. truncated files or pickles of incompatible
+        versions, are removed and counted as misses.
+        """
+        path = self._path(key)
+        try:
+            results = pd.read_pickle(path)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (
+            pickle.UnpicklingError,
+            ValueError,
+            AttributeError,
+            ImportError,
+            EOFError,
+        ):
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return results
+
+    def put(self, key: str, results: pd.DataFrame):
+        """
+        Store results at key, then evict the least recently used entries if the
+        cache size exceeds max_size.
+        """
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        results.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def clear(self):
+        """Remove all the entries of the cache"""
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    @property
+    def size(self) -> int:
+        """Size of the cache in bytes"""
+        return sum(path.stat().st_size for path in self._entries())
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def _entries(self) -> list[Path]:
+        return list(self.cache_dir.glob(f"*{self.suffix}"))
+
+    def _evict(self):
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
@@ -0,0 +1,272 @@
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_PROC_STATUS = "/proc/self/status"
+
+# Runs tracked by all the MemoryPolicy instances of the process. The peak
+# counters (VmHWM, tracemalloc peak, children ru_maxrss) are process-wide, they
+# are only attributed to a run that did not overlap another one.
+_TRACKING_LOCK = threading.Lock()
+_ACTIVE_RUNS = []
+_TRACING_RUNS = 0
+_STARTED_TRACING = False
+
+
+def _proc_status_value(field: str) -> int | None:
+    """Read a memory field of /proc/self/status in bytes (Linux only)"""
+    try:
+        with open(_PROC_STATUS) as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss() -> int | None:
+    """
+    Resident set size of the current process in bytes, or None if it cannot be
+    measured on this platform.
+    """
+    rss = _proc_status_value("VmRSS")
+    if rss is not None:
+        return rss
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def _max_rss(who) -> int | None:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def peak_rss() -> int | None:
+    """
+    Peak resident set size of the current process in bytes since the last call
+    to reset_peak_rss, or since the process started if it cannot be reset.
+    """
+    peak = _proc_status_value("VmHWM")
+    if peak is not None:
+        return peak
+    return _max_rss(resource.RUSAGE_SELF) if resource is not None else None
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak resident set size (Linux only). Return True on success."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def children_peak_rss() -> int | None:
+    """
+    Largest peak resident set size of the terminated child processes in bytes,
+    e.g. EnergyPlus runs.
+    """
+    return _max_rss(resource.RUSAGE_CHILDREN) if resource is not None else None
+
+
+def _start_run(run: dict, trace_allocations: bool):
+    """Register a tracked run, called with _TRACKING_LOCK held"""
+    global _TRACING_RUNS, _STARTED_TRACING
+    for other_run in _ACTIVE_RUNS:
+        other_run["overlapped"] = True
+    run["overlapped"] = bool(_ACTIVE_RUNS)
+    _ACTIVE_RUNS.append(run)
+
+    run["trace_allocations"] = trace_allocations
+    if trace_allocations:
+        if _TRACING_RUNS == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _STARTED_TRACING = True
+        _TRACING_RUNS += 1
+
+    if not run["overlapped"]:
+        reset_peak_rss()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+    run["children_peak_before"] = children_peak_rss()
+    if trace_allocations:
+        run["traced_before"] = tracemalloc.get_traced_memory()[0]
+
+
+def _stop_run(run: dict) -> dict:
+    """
+    Unregister a tracked run and return its peak statistics, called with
+    _TRACKING_LOCK held
+    """
+    global _TRACING_RUNS, _STARTED_TRACING
+    _ACTIVE_RUNS.remove(run)
+    attributed = not run["overlapped"]
+
+    peaks = {
+        "peak_rss": peak_rss() if attributed else None,
+        "children_peak_rss": None,
+        "python_peak": None,
+        "python_allocated": None,
+    }
+    children_peak = children_peak_rss()
+    if (
+        attributed
+        and children_peak is not None
+        and run["children_peak_before"] is not None
+        and children_peak > run["children_peak_before"]
+    ):
+        peaks["children_peak_rss"] = children_peak
+
+    if run["trace_allocations"]:
+        if attributed:
+            traced, traced_peak = tracemalloc.get_traced_memory()
+            peaks["python_peak"] = traced_peak - run["traced_before"]
+            peaks["python_allocated"] = traced - run["traced_before"]
+        _TRACING_RUNS -= 1
+        if _TRACING_RUNS == 0 and _STARTED_TRACING:
+            tracemalloc.stop()
+            _STARTED_TRACING = False
+    return peaks
+
+
+class MemoryPolicy:
+    """
+    Decide when the garbage collector runs between simulations, and record the
+    memory statistics of each run.
+
+    By default the garbage collector is never forced, Python collects cyclic
+    garbage on its own. Forced collections can be triggered when the process
+    resident set size exceeds a threshold, and/or every n runs.
+
+    Statistics of each run are stored in stats as dictionaries:
+        - label: run label
+        - duration: run duration in seconds
+        - rss_before, rss_after: resident set size before and after the run
+        - peak_rss: peak resident set size during the run (Linux), or since the
+          process started on other platforms
+        - children_peak_rss: peak resident set size of the child processes of
+          the run, e.g. EnergyPlus. It is only known if it exceeds the peaks of
+          the previous child processes, None otherwise
+        - python_peak, python_allocated: peak and net size of the Python
+          allocations during the run, if trace_allocations is True
+        - collected: True if a garbage collection was forced after the run
+    Sizes are in bytes, None if they cannot be measured on the platform. The
+    peak statistics (peak_rss, children_peak_rss, python_peak and
+    python_allocated) are None for runs overlapping another tracked run, from
+    any MemoryPolicy of the process.
+
+    :param rss_threshold: Force a garbage collection after a run if the resident
+        set size exceeds this value in bytes. Default is None.
+    :param every_n_runs: Force a garbage collection every n runs. Default is None.
+    :param trace_allocations: If True, trace Python allocations using
+        tracemalloc. It gives exact allocation statistics but slows down the
+        runs. Default is False.
+    :param max_stats: Number of runs kept in stats. Default is 1000.
+    """
+
+    def __init__(
+        self,
+        rss_threshold: int = None,
+        every_n_runs: int = None,
+        trace_allocations: bool = False,
+        max_stats: int = 1000,
+    ):
+        self.rss_threshold = rss_threshold
+        self.every_n_runs = every_n_runs
+        self.trace_allocations = trace_allocations
+        self.runs = 0
+        self.collections = 0
+        self.stats = deque(maxlen=max_stats)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"MemoryPolicy(rss_threshold={self.rss_threshold}, "
+            f"every_n_runs={self.every_n_runs}, runs={self.runs}, "
+            f"collections={self.collections})"
+        )
+
+    def should_collect(self, rss: int | None) -> bool:
+        """Return True if a garbage collection must be forced after a run"""
+        if self.every_n_runs and self.runs % self.every_n_runs == 0:
+            return True
+        return (
+            self.rss_threshold is not None
+            and rss is not None
+            and rss > self.rss_threshold
+        )
+
+    @contextmanager
+    def track(self, label: str = None):
+        """
+        Context manager wrapping a run. Records its statistics, then forces a
+        garbage collection if required by the policy.
+
+        Runs can be tracked concurrently, from threads or asyncio tasks. The
+        peak statistics are measured with process-wide counters, so they are
+        None for runs that overlapped another tracked run.
+        """
+        run = {"overlapped": False}
+        with _TRACKING_LOCK:
+            _start_run(run, self.trace_allocations)
+
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            rss_after = current_rss()
+            with _TRACKING_LOCK:
+                peaks = _stop_run(run)
+
+            run_stats = {
+                "label": label,
+                "duration": duration,
+                "rss_before": rss_before,
+                "rss_after": rss_after,
+                **peaks,
+                "collected": False,
+            }
+            with self._lock:
+                self.runs += 1
+                collect = self.should_collect(rss_after)
+                if collect:
+                    self.collections += 1
+            if collect:
+                gc.collect()
+                run_stats["collected"] = True
+            with self._lock:
+                self.stats.append(run_stats)
+
+    def stats_frame(self) -> pd.DataFrame:
+        """Return the statistics of the recorded runs as a DataFrame"""
+        return pd.DataFrame(list(self.stats))
@@ -0,0 +1,221 @@
+import datetime as dt
+import hashlib
+import json
+import re
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from energytool.cache import file_digest
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+METADATA_KEY = b"energytool"
+
+# Run identifiers used as file names as is. Upper case letters are excluded, as
+# file names are case-insensitive on Windows and macOS
+_SAFE_RUN_ID = re.compile(r"[a-z0-9_-]{1,128}")
+_WINDOWS_RESERVED_NAMES = {
+    "con",
+    "prn",
+    "aux",
+    "nul",
+    *(f"com{i}" for i in range(1, 10)),
+    *(f"lpt{i}" for i in range(1, 10)),
+}
+# File names of hashed run identifiers start with this prefix, that cannot be
+# part of a safe run identifier
+_HASHED_PREFIX = "~"
+
+
+class ResultsStore:
+    """
+    On-disk store of simulation results, one compressed columnar file per run.
+
+    Each file holds the wide results DataFrame of a run and its metadata:
+    parameters, simulation options, EPW file path and hash, EnergyPlus version
+    and creation date. Results can be reloaded without running EnergyPlus
+    again, for all or some of their columns. Files are memory mapped when
+    read.
+
+    Run identifiers made of lower case letters, digits, "_" and "-" are used as
+    file names. Other identifiers, e.g. containing "/" or "..", are stored under
+    a hash of the identifier, and read back from the file metadata.
+
+    Requires pyarrow (pip install energytool[parquet]).
+
+    :param store_dir: Directory where the results are stored. It is created if
+        it doesn't exist.
+    :param file_format: "parquet" (default) or "feather".
+    :param compression: Compression codec, passed to pyarrow. Default is "zstd".
+    """
+
+    suffixes = {"parquet": ".parquet", "feather": ".feather"}
+
+    def __init__(
+        self,
+        store_dir: str | Path,
+        file_format: str = "parquet",
+        compression: str = "zstd",
+    ):
+        if pa is None:
+            raise ImportError(
+                "ResultsStore requires pyarrow. "
+                "Install it with 'pip install energytool[parquet]'"
+            )
+        if file_format not in self.suffixes:
+            raise ValueError(
+                f"{file_format} is not a valid file format, choose one of "
+                f"{list(self.suffixes)}"
+            )
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.file_format = file_format
+        self.compression = compression
+
+    def __repr__(self):
+        return f"ResultsStore({self.store_dir}, {self.file_format}, {len(self)} runs)"
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __contains__(self, run_id: str):
+        return self._path(run_id).exists()
+
+    def run_ids(self) -> list[str]:
+        """Identifiers of the stored runs, in alphabetical order"""
+        suffix = self.suffixes[self.file_format]
+        run_ids = []
+        for path in self._entries():
+            if path.name.startswith(_HASHED_PREFIX):
+                # The identifier is only known from the metadata
+                run_ids.append(
+                    json.loads(self._schema(path).metadata[METADATA_KEY])["run_id"]
+                )
+            else:
+                run_ids.append(path.name[: -len(suffix)])
+        return sorted(run_ids)
+
+    def write(
+        self,
+        results: pd.DataFrame,
+        run_id: str = None,
+        parameters: dict = None,
+        simulation_options: dict = None,
+        epw_path: str | Path = None,
+        eplus_version: tuple | str = None,
+    ) -> str:
+        """
+        Write the results of a run with its metadata.
+
+        :param results: Wide results DataFrame.
+        :param run_id: Identifier of the run, any non empty string. Default is
+            None for a random identifier. An existing run with the same
+            identifier is replaced.
+        :param parameters: The property_dict of the run.
+        :param simulation_options: The simulation options of the run.
+        :param epw_path: Path to the weather file. Its sha256 is stored.
+        :param eplus_version: The EnergyPlus version, e.g. IDF.idd_version.
+        :return: The run identifier.
+        """
+        if run_id is None:
+            run_id = uuid.uuid4().hex
+
+        metadata = {
+            "run_id": run_id,
+            "parameters": parameters or {},
+            "simulation_options": simulation_options or {},
+            "epw_path": None if epw_path is None else str(epw_path),
+            "epw_sha256": None if epw_path is None else file_digest(epw_path),
+            "eplus_version": None if eplus_version is None else str(eplus_version),
+            "created": dt.datetime.now().isoformat(),
+        }
+
+        table = pa.Table.from_pandas(results, preserve_index=True)
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                METADATA_KEY: json.dumps(metadata, default=str).encode("utf-8"),
+            }
+        )
+
+        path = self._path(run_id)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        if self.file_format == "parquet":
+            pq.write_table(table, tmp_path, compression=self.compression)
+        else:
+            feather.write_feather(table, tmp_path, compression=self.compression)
+        tmp_path.replace(path)
+
+        return run_id
+
+    def read(self, run_id: str, columns: list[str] = None) -> pd.DataFrame:
+        """
+        Read the results of a run.
+
+        :param run_id: Identifier of the run.
+        :param columns: Columns to read. Default is None for all the columns.
+        :return: The results DataFrame, with its index.
+        """
+        path = self._path(run_id)
+        if columns is not None:
+            columns = list(columns) + self._index_columns(self._schema(path))
+
+        if self.file_format == "parquet":
+            table = pq.read_table(path, columns=columns, memory_map=True)
+        else:
+            table = feather.read_table(path, columns=columns, memory_map=True)
+
+        results = table.to_pandas()
+        if isinstance(results.index, pd.DatetimeIndex) and len(results.index) > 2:
+            # The index frequency is not stored by pyarrow
+            results.index.freq = pd.infer_freq(results.index)
+        return results
+
+    def metadata(self, run_id: str) -> dict:
+        """Return the metadata of a run, without reading its results"""
+        schema = self._schema(self._path(run_id))
+        return json.loads(schema.metadata[METADATA_KEY])
+
+    def columns(self, run_id: str) -> list[str]:
+        """Return the result columns of a run, without reading its results"""
+        schema = self._schema(self._path(run_id))
+        index_columns = self._index_columns(schema)
+        return [name for name in schema.names if name not in index_columns]
+
+    def delete(self, run_id: str):
+        self._path(run_id).unlink(missing_ok=True)
+
+    def _path(self, run_id: str) -> Path:
+        if not isinstance(run_id, str) or not run_id:
+            raise ValueError(f"Invalid run identifier: {run_id!r}")
+        if _SAFE_RUN_ID.fullmatch(run_id) and run_id not in _WINDOWS_RESERVED_NAMES:
+            file_name = run_id
+        else:
+            digest = hashlib.sha256(run_id.encode("utf-8")).hexdigest()
+            file_name = f"{_HASHED_PREFIX}{digest}"
+        return self.store_dir / f"{file_name}{self.suffixes[self.file_format]}"
+
+    def _entries(self) -> list[Path]:
+        return list(self.store_dir.glob(f"*{self.suffixes[self.file_format]}"))
+
+    def _schema(self, path: Path):
+        if self.file_format == "parquet":
+            return pq.read_schema(path)
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).schema
+
+    @staticmethod
+    def _index_columns(schema) -> list[str]:
+        pandas_metadata = schema.pandas_metadata or {}
+        return [
+            col
+            for col in pandas_metadata.get("index_columns", [])
+            if isinstance(col, str)
+        ]
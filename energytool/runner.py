@@ -0,0 +1,361 @@
+import asyncio
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+
+from eppy.modeleditor import IDF
+from eppy.runner.run_functions import (
+    EnergyPlusRunError,
+    install_paths,
+    parse_error,
+)
+
+
+class EnergyPlusTimeoutError(EnergyPlusRunError, TimeoutError):
+    """EnergyPlus did not finish before the timeout, it was killed"""
+
+
+def _default_temp_root() -> str | None:
+    if platform.system() == "Windows":
+        return os.path.join(os.path.expanduser("~"), r"AppData\Local\Temp")
+    return None
+
+
+def _clear_directory(path: Path) -> bool:
+    """Remove the content of a directory. Return False if it failed."""
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+    except OSError:
+        return False
+    return True
+
+
+class RunDirectoryPool:
+    """
+    Pool of reusable EnergyPlus run directories.
+
+    Instead of creating and removing a temporary directory for each simulation,
+    run directories are created once in a root directory, emptied after each
+    run and handed to the next simulation. Directories are emptied in a
+    background thread by default, so the simulation returns without waiting
+    for the file deletions. A directory that cannot be emptied (e.g. files
+    still locked on Windows) is discarded.
+
+    Directories are not shared between processes: a pool pickled to worker
+    processes (e.g. with a Building) only keeps its settings, and each worker
+    creates its own directories.
+
+    :param root: (Optional) Directory in which the run directories are created.
+        Default is None for the system temporary directory, or /dev/shm if
+        use_tmpfs is True.
+    :param use_tmpfs: If True and root is None, run directories are created in
+        the /dev/shm tmpfs (Linux), so EnergyPlus outputs are written in memory.
+        Default is False.
+    :param async_cleanup: If True (default), directories are emptied in a
+        background thread.
+    """
+
+    def __init__(
+        self,
+        root: str | Path = None,
+        use_tmpfs: bool = False,
+        async_cleanup: bool = True,
+    ):
+        self.root = root
+        self.use_tmpfs = use_tmpfs
+        self.async_cleanup = async_cleanup
+        self._setup()
+
+    def _setup(self):
+        root = self.root
+        if root is None:
+            if self.use_tmpfs and os.path.isdir("/dev/shm"):
+                root = "/dev/shm"
+            else:
+                root = _default_temp_root()
+        self.path = Path(tempfile.mkdtemp(prefix="energytool_runs_", dir=root))
+        self._free = []
+        self._n_directories = 0
+        self._lock = threading.Lock()
+        self._cleaner = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="energytool_cleanup")
+            if self.async_cleanup
+            else None
+        )
+        self._finalizer = weakref.finalize(
+            self, shutil.rmtree, str(self.path), ignore_errors=True
+        )
+
+    def __getstate__(self):
+        return {
+            "root": self.root,
+            "use_tmpfs": self.use_tmpfs,
+            "async_cleanup": self.async_cleanup,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setup()
+
+    def __repr__(self):
+        return f"RunDirectoryPool({self.path}, {self._n_directories} directories)"
+
+    @contextmanager
+    def directory(self):
+        """Context manager providing an empty run directory"""
+        with self._lock:
+            if self._free:
+                run_dir = self._free.pop()
+            else:
+                self._n_directories += 1
+                run_dir = self.path / f"run_{self._n_directories}"
+                run_dir.mkdir()
+        try:
+            yield run_dir.as_posix()
+        finally:
+            if self._cleaner is not None:
+                self._cleaner.submit(self._release, run_dir)
+            else:
+                self._release(run_dir)
+
+    def _release(self, run_dir: Path):
+        if _clear_directory(run_dir):
+            with self._lock:
+                self._free.append(run_dir)
+        else:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    def flush(self):
+        """Wait for the pending clean-ups"""
+        if self._cleaner is not None:
+            self._cleaner.submit(lambda: None).result()
+
+    def close(self):
+        """Wait for the pending clean-ups and remove all the run directories"""
+        if self._cleaner is not None:
+            self._cleaner.shutdown(wait=True)
+        self._free = []
+        self._finalizer()
+
+
+def _kill_process_group(pid: int):
+    """Kill an EnergyPlus process and the processes it started"""
+    try:
+        if sys.platform == "win32":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        else:
+            os.killpg(pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+
+def _kill_process_tree(process: subprocess.Popen):
+    if process.poll() is not None:
+        return
+    _kill_process_group(process.pid)
+    if process.poll() is None:
+        process.kill()
+    process.wait()
+
+
+def _energyplus_command(
+    idf: IDF | str | Path,
+    weather: str | Path,
+    output_directory: str | Path,
+    ep_version: str = None,
+    annual: bool = False,
+    design_day: bool = False,
+    readvars: bool = False,
+    verbose: str = "v",
+) -> tuple[list[str], Path, Path]:
+    """Return the EnergyPlus command, the IDF path and the output directory"""
+    idf_path = Path(getattr(idf, "idfname", idf)).absolute()
+    if not idf_path.is_file():
+        raise EnergyPlusRunError(f"ERROR: Could not find input data file: {idf_path}")
+
+    if ep_version is None:
+        ep_version = "-".join(str(x) for x in idf.idd_version[:3])
+    eplus_exe_path, eplus_weather_path = install_paths(ep_version, IDF.getiddname())
+
+    weather = Path(weather)
+    weather = (
+        weather.absolute() if weather.is_file() else Path(eplus_weather_path) / weather
+    )
+    output_directory = Path(output_directory).absolute()
+
+    cmd = [
+        eplus_exe_path,
+        "--weather",
+        str(weather),
+        "--output-directory",
+        str(output_directory),
+    ]
+    if annual:
+        cmd.append("--annual")
+    if design_day:
+        cmd.append("--design-day")
+    if readvars:
+        cmd.append("--readvars")
+    with open(idf_path) as f:
+        if "HVACTEMPLATE:" in f.read().upper():
+            cmd.append("--expandobjects")
+    cmd.append(str(idf_path))
+
+    if verbose not in ("v", "q", "s"):
+        raise ValueError(f"Unknown verbose mode: {verbose}")
+    if verbose == "v":
+        print("\r\n" + " ".join(cmd) + "\r\n")
+
+    return cmd, idf_path, output_directory
+
+
+def _process_kwargs(verbose: str) -> dict:
+    """Keyword arguments of the EnergyPlus process creation"""
+    # EnergyPlus is started in its own process group, to be killed with its
+    # children (e.g. ExpandObjects)
+    if sys.platform == "win32":
+        group_kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group_kwargs = {"start_new_session": True}
+    return {
+        "stdout": None if verbose == "v" else subprocess.DEVNULL,
+        "stderr": subprocess.DEVNULL if verbose == "s" else subprocess.PIPE,
+        **group_kwargs,
+    }
+
+
+def _check_returncode(returncode: int, std_err: str, output_directory: Path):
+    if returncode != 0:
+        message = parse_error(
+            StringIO(std_err or ""), (output_directory / "eplusout.err").as_posix()
+        )
+        raise EnergyPlusRunError(message)
+
+
+def run(
+    idf: IDF | str | Path,
+    weather: str | Path,
+    output_directory: str | Path,
+    ep_version: str = None,
+    annual: bool = False,
+    design_day: bool = False,
+    readvars: bool = False,
+    verbose: str = "v",
+    timeout: float = None,
+):
+    """
+    Run EnergyPlus on an IDF, like eppy.runner.run_functions.run, but without
+    changing the working directory of the current process, so that several
+    simulations can run from different threads. EnergyPlus is killed with the
+    processes it started if it does not finish before the timeout.
+
+    :param idf: An eppy IDF object, saved beforehand (its idfname is run), or
+        the path to an IDF file.
+    :param weather: Path to the weather file, or its name in the EnergyPlus
+        WeatherData directory.
+    :param output_directory: Directory of the EnergyPlus outputs. EnergyPlus
+        runs in this directory.
+    :param ep_version: EnergyPlus version "X-X-X", used to find the install
+        directory if it cannot be found from the IDD. Default is the IDF
+        idd_version.
+    :param annual: Force annual simulation.
+    :param design_day: Force design-day-only simulation.
+    :param readvars: Run ReadVarsESO after the simulation.
+    :param verbose: "v" verbose, "q" quiet (no stdout) or "s" silent (no stdout
+        nor stderr).
+    :param timeout: Maximum duration of the simulation in seconds. Default is
+        None, no timeout.
+    :raises EnergyPlusRunError: If EnergyPlus fails.
+    :raises EnergyPlusTimeoutError: If EnergyPlus is killed after the timeout.
+    """
+    cmd, idf_path, output_directory = _energyplus_command(
+        idf,
+        weather,
+        output_directory,
+        ep_version,
+        annual,
+        design_day,
+        readvars,
+        verbose,
+    )
+    process = subprocess.Popen(
+        cmd, cwd=output_directory, text=True, **_process_kwargs(verbose)
+    )
+    try:
+        _, std_err = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_process_tree(process)
+        raise EnergyPlusTimeoutError(
+            f"EnergyPlus simulation of {idf_path} was killed after {timeout}s"
+        )
+    except BaseException:
+        _kill_process_tree(process)
+        raise
+
+    _check_returncode(process.returncode, std_err, output_directory)
+
+
+async def run_async(
+    idf: IDF | str | Path,
+    weather: str | Path,
+    output_directory: str | Path,
+    ep_version: str = None,
+    annual: bool = False,
+    design_day: bool = False,
+    readvars: bool = False,
+    verbose: str = "v",
+    timeout: float = None,
+):
+    """
+    Asynchronous version of run, EnergyPlus is launched with
+    asyncio.create_subprocess_exec. EnergyPlus is also killed if the task is
+    cancelled. See run for the parameters.
+    """
+    cmd, idf_path, output_directory = _energyplus_command(
+        idf,
+        weather,
+        output_directory,
+        ep_version,
+        annual,
+        design_day,
+        readvars,
+        verbose,
+    )
+    process = await asyncio.create_subprocess_exec(
+        *cmd, cwd=output_directory, **_process_kwargs(verbose)
+    )
+    try:
+        _, std_err = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        _kill_process_group(process.pid)
+        await process.wait()
+        raise EnergyPlusTimeoutError(
+            f"EnergyPlus simulation of {idf_path} was killed after {timeout}s"
+        )
+    except BaseException:
+        _kill_process_group(process.pid)
+        await process.wait()
+        raise
+
+    if std_err is not None:
+        std_err = std_err.decode(errors="replace")
+    _check_returncode(process.returncode, std_err, output_directory)
@@ -4,7 +4,6 @@ import json
 from abc import ABC, abstractmethod
 from pathlib import Path
 
-import eppy.modeleditor
 import numpy as np
 import pandas as pd
 from eppy.modeleditor import IDF
@@ -14,6 +13,7 @@ from energytool.base.idf_utils import (
     get_objects_name_list,
     set_named_objects_field_values,
     del_named_objects,
+    get_zone_geometry,
 )
 from energytool.base.idfobject_utils import (
     get_zones_idealloadsairsystem,
@@ -62,6 +62,16 @@ class System(ABC):
         """Operations happening after the simulation"""
         pass
 
+    def get_required_variables(self) -> list[tuple[str | list, str]] | None:
+        """
+        Output variables read by post_process, as a list of (key_values,
+        variable_name) tuples. key_values can be a name, a list of names or "*".
+        Called after pre_process. An empty list means that post_process doesn't
+        use any output variable. None (default) means that the required variables
+        are unknown, then all the simulation outputs are read.
+        """
+        return None
+
 
 class Overshoot28(System):
     """
@@ -135,6 +145,12 @@ class Overshoot28(System):
 
         return results
 
+    def get_required_variables(self):
+        return [
+            (self.zones, "Zone Operative Temperature"),
+            (self.zones, "Zone People Occupant Count"),
+        ]
+
 
 class LightAutonomy(System):
     """
@@ -233,6 +249,13 @@ class LightAutonomy(System):
 
         return results
 
+    def get_required_variables(self):
+        return [
+            (self.light_schedule_name, "Schedule Value"),
+            (self.zones, "Daylighting Reference Point 1 Illuminance"),
+            (self.zones, "Zone People Occupant Count"),
+        ]
+
 
 class Sensor(System):
     """
@@ -265,6 +288,9 @@ class Sensor(System):
         results.columns = results.columns + f"_{self.variables}"
         return results
 
+    def get_required_variables(self):
+        return [(self.key_values, self.variables)]
+
 
 class SimplifiedChiller(System):
     """
@@ -315,6 +341,14 @@ class SimplifiedChiller(System):
         system_out.name = f"{self.name}_{Units.ENERGY.value}"
         return system_out.to_frame()
 
+    def get_required_variables(self):
+        return [
+            (
+                [ilas.Name for ilas in self.ilas_list],
+                "Zone Ideal Loads Supply Air Total Cooling Energy",
+            )
+        ]
+
 
 class HeaterSimple(System):
     """
@@ -365,6 +399,14 @@ class HeaterSimple(System):
         system_out.name = f"{self.name}_{Units.ENERGY.value}"
         return system_out.to_frame()
 
+    def get_required_variables(self):
+        return [
+            (
+                [ilas.Name for ilas in self.ilas_list],
+                "Zone Ideal Loads Supply Air Total Heating Energy",
+            )
+        ]
+
 
 class HeatingAuxiliary(System):
     """
@@ -417,6 +459,14 @@ class HeatingAuxiliary(System):
         system_out.name = f"{self.name}_{Units.ENERGY.value}"
         return system_out.to_frame()
 
+    def get_required_variables(self):
+        return [
+            (
+                [ilas.Name for ilas in self.ilas_list],
+                "Zone Ideal Loads Supply Air Total Heating Energy",
+            )
+        ]
+
 
 class AirHandlingUnit(System):
     """
@@ -521,6 +571,14 @@ class AirHandlingUnit(System):
         system_out.name = f"{self.name}_{Units.ENERGY.value}"
         return system_out.to_frame()
 
+    def get_required_variables(self):
+        return [
+            (
+                self.zones,
+                "Zone Mechanical Ventilation Standard Density Volume Flow Rate",
+            )
+        ]
+
 
 class DHWIdealExternal(System):
     """
@@ -596,6 +654,10 @@ class DHWIdealExternal(System):
             index=eplus_results.index,
         )
 
+    def get_required_variables(self):
+        # Only the results index is used
+        return []
+
 
 class ArtificialLighting(System):
     """
@@ -668,6 +730,9 @@ class ArtificialLighting(System):
         lighting_out.name = f"{self.name}_{Units.ENERGY.value}"
         return lighting_out.to_frame()
 
+    def get_required_variables(self):
+        return [(self.zones, "Zone Lights Electricity Energy")]
+
 
 class AHUControl(System):
     """
@@ -739,6 +804,9 @@ class AHUControl(System):
     def post_process(self, idf: IDF = None, eplus_results: pd.DataFrame = None):
         pass
 
+    def get_required_variables(self):
+        return []
+
 
 class NaturalVentilation(System):
     def __init__(
@@ -768,6 +836,9 @@ class NaturalVentilation(System):
     def post_process(self, idf: IDF = None, eplus_results: pd.DataFrame = None):
         pass
 
+    def get_required_variables(self):
+        return []
+
 
 class OtherEquipment(System):
     def __init__(
@@ -863,7 +934,7 @@ class OtherEquipment(System):
 
         equipment_name_list = []
         if self.distribute_load:
-            surf_arr = np.array([eppy.modeleditor.zonearea(idf, z) for z in self.zones])
+            surf_arr = get_zone_geometry(idf).floor_area(to_list(self.zones))
             surf_ratio = surf_arr / np.sum(surf_arr)
         else:
             surf_ratio = np.array([1] * len(self.zones))
@@ -893,6 +964,9 @@ class OtherEquipment(System):
     def post_process(self, idf: IDF = None, eplus_results: pd.DataFrame = None):
         pass
 
+    def get_required_variables(self):
+        return []
+
 
 class ZoneThermostat(System):
     def __init__(
@@ -1090,3 +1164,6 @@ class ZoneThermostat(System):
 
     def post_process(self, idf: IDF = None, eplus_results: pd.DataFrame = None):
         pass
+
+    def get_required_variables(self):
+        return []
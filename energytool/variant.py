@@ -1,17 +1,32 @@
 import enum
+import hashlib
 import itertools
+import json
+import os
+import pickle
+import tempfile
+import time
 from collections.abc import Callable
-from copy import deepcopy
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from multiprocessing import cpu_count
 
+import numpy as np
+import pandas as pd
+from eppy.modeleditor import IDF
 from joblib import Parallel, delayed
 from fastprogress.fastprogress import progress_bar
 
 from corrai.base.model import Model
 
+from energytool.base.idf_delta import IdfDelta
+from energytool.base.working_idf import CopyOnWriteIDF
+from energytool.building import Building, SimuOpt
+from energytool.results_store import ResultsStore
+
 
 class VariantKeys(enum.Enum):
     MODIFIER = "MODIFIER"
@@ -19,6 +34,315 @@ class VariantKeys(enum.Enum):
     DESCRIPTION = "DESCRIPTION"
 
 
+class VariantResults:
+    """
+    Results of simulate_variants stored in a memory-mapped array file of shape
+    (variants, time steps, outputs). Workers write their results directly in the
+    file, and results are read without loading the whole array in memory.
+
+    :param path: Path to the array file.
+    :param index: The time index shared by all the variants results.
+    :param columns: The output names shared by all the variants results.
+    :param n_variants: Number of variants.
+    :param dtype: Data type of the array. Default is float64.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        index: pd.Index,
+        columns: pd.Index,
+        n_variants: int,
+        dtype: str = "float64",
+    ):
+        self.path = Path(path)
+        self.index = index
+        self.columns = columns
+        self.dtype = np.dtype(dtype)
+        self.shape = (n_variants, len(index), len(columns))
+
+    def __repr__(self):
+        return f"VariantResults({self.path}, shape={self.shape})"
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, variant_idx: int) -> pd.DataFrame:
+        return pd.DataFrame(
+            self.values[variant_idx], index=self.index, columns=self.columns
+        )
+
+    def __iter__(self):
+        for variant_idx in range(len(self)):
+            yield self[variant_idx]
+
+    @property
+    def values(self) -> np.memmap:
+        """Read-only memory-mapped array of shape (variants, time steps, outputs)"""
+        return np.memmap(self.path, dtype=self.dtype, mode="r", shape=self.shape)
+
+    def allocate(self):
+        """Create the array file, filled with NaN"""
+        array = np.memmap(self.path, dtype=self.dtype, mode="w+", shape=self.shape)
+        array[:] = np.nan
+        array.flush()
+
+    def write(self, variant_idx: int, results: pd.DataFrame):
+        """Write the results of a variant in the array file"""
+        if len(results.index) != len(self.index):
+            raise ValueError(
+                f"Variant {variant_idx} results have {len(results.index)} time "
+                f"steps, {len(self.index)} expected"
+            )
+        array = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=self.shape)
+        array[variant_idx] = results.reindex(columns=self.columns).to_numpy()
+        array.flush()
+        del array
+
+
+def _is_existing_variant(variant: str, add_existing: bool) -> bool:
+    return add_existing and variant.split("_")[0] == "EXISTING"
+
+
+def _apply_modifier(
+    model: Model,
+    variant: str,
+    variant_dict: dict[str, dict[VariantKeys, Any]],
+    modifier_map: dict[str, Callable],
+):
+    modifier = modifier_map[variant_dict[variant][VariantKeys.MODIFIER]]
+    modifier(
+        model=model,
+        description=variant_dict[variant][VariantKeys.DESCRIPTION],
+        **variant_dict[variant][VariantKeys.ARGUMENTS],
+    )
+
+
+def _public_state(model: Model) -> bytes:
+    """Pickled public attributes of a model, except its idf"""
+    return pickle.dumps(
+        {
+            key: value
+            for key, value in vars(model).items()
+            if key != "idf" and not key.startswith("_")
+        }
+    )
+
+
+def _modifier_delta(
+    model_bytes: bytes,
+    variant: str,
+    variant_dict: dict[str, dict[VariantKeys, Any]],
+    modifier_map: dict[str, Callable],
+) -> IdfDelta | None:
+    """
+    Apply the modifier of a variant to a copy-on-write working copy of the base
+    model, and return the resulting IdfDelta.
+    Return None if the model has no idf, or if the modifier changes anything else
+    than the idf (e.g. the systems of a Building). The modifier must then be
+    applied on each combination.
+    """
+    working_model = pickle.loads(model_bytes)
+    base_idf = getattr(working_model, "idf", None)
+    if not isinstance(base_idf, IDF):
+        return None
+
+    working_idf = CopyOnWriteIDF(base_idf)
+    working_model.idf = working_idf
+    state = _public_state(working_model)
+    _apply_modifier(working_model, variant, variant_dict, modifier_map)
+    if working_model.idf is not working_idf or _public_state(working_model) != state:
+        return None
+
+    return IdfDelta.from_working_idf(base_idf, working_idf)
+
+
+def _materialize_variant(
+    model_bytes: bytes,
+    simulation: tuple[str, ...],
+    variant_dict: dict[str, dict[VariantKeys, Any]],
+    modifier_map: dict[str, Callable],
+    add_existing: bool,
+    variant_deltas: dict[str, IdfDelta] = None,
+    applied: list[IdfDelta] = None,
+) -> Model:
+    """
+    Return a working copy of the pickled base model modified by the variants.
+    Variants with a delta in variant_deltas are replayed from it when possible,
+    other variants are applied using their modifier. A delta touching a field
+    already changed by a previous variant is not replayed, as the modifier may
+    depend on the changed value. applied holds the deltas of the variants
+    already applied to the pickled model, if any.
+    """
+    working_model = pickle.loads(model_bytes)
+    variant_deltas = variant_deltas or {}
+    # Deltas of the variants already applied, replayed or not
+    applied = list(applied or [])
+
+    for variant in simulation:
+        if _is_existing_variant(variant, add_existing):
+            continue
+        delta = variant_deltas.get(variant)
+        if delta is not None and delta.can_apply(working_model.idf, applied):
+            delta.apply(working_model.idf)
+        else:
+            _apply_modifier(working_model, variant, variant_dict, modifier_map)
+        if delta is not None:
+            applied.append(delta)
+
+    return working_model
+
+
+_WORKER_CONTEXTS = {}
+
+
+def _write_shared_context(
+    model_bytes: bytes, variant_deltas: dict[str, IdfDelta] = None
+) -> str:
+    """
+    Write the pickled base model and the variants deltas of a simulate_variants
+    call in a temporary file, read once per worker by _shared_context.
+    """
+    fd, context_path = tempfile.mkstemp(prefix="energytool_variants_", suffix=".pkl")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump({"model_bytes": model_bytes, "variant_deltas": variant_deltas}, f)
+    return context_path
+
+
+def _shared_context(context_path: str) -> dict:
+    """
+    Return the shared context written by _write_shared_context. It is loaded on
+    first use in each worker process, and reused by its following tasks.
+    """
+    try:
+        return _WORKER_CONTEXTS[context_path]
+    except KeyError:
+        pass
+    with open(context_path, "rb") as f:
+        context = pickle.load(f)
+    # Only keep the context of the current simulate_variants call
+    _WORKER_CONTEXTS.clear()
+    _WORKER_CONTEXTS[context_path] = context
+    return context
+
+
+def _simulate_combination(
+    combination_idx: int,
+    simulation: tuple[str, ...],
+    variant_results: VariantResults = None,
+    *,
+    context_path: str,
+    model_bytes: bytes = None,
+    variant_dict: dict[str, dict[VariantKeys, Any]],
+    modifier_map: dict[str, Callable],
+    add_existing: bool,
+    simulation_options: dict[str, Any],
+    simulate_kwargs: dict,
+    save_dir: Path = None,
+    file_extension: str = ".txt",
+    results_store: ResultsStore = None,
+    combination: tuple[str, ...] = None,
+    inputs_digest: str = None,
+):
+    """
+    Simulate a combination of variants. The working model is materialized from
+    model_bytes if given (e.g. a combination tree leaf), from the base model of
+    the shared context otherwise.
+    """
+    context = _shared_context(context_path)
+    working_model = _materialize_variant(
+        context["model_bytes"] if model_bytes is None else model_bytes,
+        simulation,
+        variant_dict,
+        modifier_map,
+        add_existing,
+        context["variant_deltas"],
+    )
+
+    if save_dir:
+        working_model.save(
+            (save_dir / f"Model_{combination_idx + 1}").with_suffix(file_extension)
+        )
+
+    # Models may complete the options with their defaults, each task has a copy
+    simulation_options = dict(simulation_options)
+    results = working_model.simulate(
+        simulation_options=simulation_options, **simulate_kwargs
+    )
+    if results_store is not None:
+        # Finished combinations are stored as soon as they complete
+        combination = simulation if combination is None else combination
+        results_store.write(
+            results,
+            run_id=combination_id(combination),
+            parameters={
+                "combination_idx": combination_idx,
+                "variants": list(combination),
+                "inputs_digest": inputs_digest,
+            },
+            simulation_options=simulation_options,
+        )
+    if variant_results is None:
+        return results
+    variant_results.write(combination_idx, results)
+
+
+def _iter_combination_models(
+    model_bytes: bytes,
+    combinations: list[tuple[str, ...]],
+    variant_dict: dict[str, dict[VariantKeys, Any]],
+    modifier_map: dict[str, Callable],
+    add_existing: bool,
+    variant_deltas: dict[str, IdfDelta] = None,
+):
+    """
+    Walk the prefix tree of the combinations depth-first, and yield
+    (combination index, pickled modified model) for each combination.
+
+    The model of each tree node is checkpointed as a pickle, and its children
+    are materialized from it, so that the modifier of each node is applied only
+    once. Only the checkpoints of the current branch live in memory. The
+    deltas of the variants of each checkpoint are passed down the branch, so
+    that overlapping deltas are not replayed.
+    """
+    variant_deltas = variant_deltas or {}
+    # Each node maps variants to child nodes, the None key holds the indices of
+    # the combinations ending at the node
+    tree = {}
+    for idx, combination in enumerate(combinations):
+        node = tree
+        for variant in combination:
+            node = node.setdefault(variant, {})
+        node.setdefault(None, []).append(idx)
+
+    def walk(node, node_bytes, applied):
+        for idx in node.get(None, []):
+            yield idx, node_bytes
+        for variant, child in node.items():
+            if variant is None:
+                continue
+            child_applied = applied
+            if _is_existing_variant(variant, add_existing):
+                child_bytes = node_bytes
+            else:
+                child_bytes = pickle.dumps(
+                    _materialize_variant(
+                        node_bytes,
+                        (variant,),
+                        variant_dict,
+                        modifier_map,
+                        add_existing,
+                        variant_deltas,
+                        applied,
+                    )
+                )
+                if variant in variant_deltas:
+                    child_applied = applied + [variant_deltas[variant]]
+            yield from walk(child, child_bytes, child_applied)
+
+    yield from walk(tree, model_bytes, [])
+
+
 def get_modifier_dict(
     variant_dict: dict[str, dict[VariantKeys, Any]], add_existing: bool = False
 ):
@@ -87,6 +411,145 @@ def get_combined_variants(
     return list(itertools.product(*list(modifier_dict.values())))
 
 
+# Interval between the checks of the running tasks deadlines in _executor_map
+_TIMEOUT_POLL = 0.1
+
+
+def _executor_map(
+    executor: Executor,
+    fn: Callable,
+    calls,
+    max_in_flight: int,
+    timeout: float = None,
+) -> list[tuple[Any, Any]]:
+    """
+    Submit fn(*args, **kwargs) to executor for each (key, args, kwargs) of calls,
+    with at most max_in_flight futures not completed at the same time. Calls are
+    consumed lazily.
+
+    :param timeout: (Optional) Maximum duration of each call in seconds, from
+        the moment its future is seen running. A TimeoutError is raised if a call
+        exceeds it, and the pending calls are cancelled. The call itself cannot
+        be interrupted, it keeps its executor worker until it returns.
+    :return: (key, result) tuples, in the order of completion.
+    """
+    results = []
+    in_flight = {}
+    started = {}
+
+    def collect(futures):
+        for future in futures:
+            started.pop(future, None)
+            results.append((in_flight.pop(future), future.result()))
+
+    def wait_completed():
+        if timeout is None:
+            return wait(in_flight, return_when=FIRST_COMPLETED)[0]
+        while True:
+            now = time.monotonic()
+            for future in in_flight:
+                if future not in started and (future.running() or future.done()):
+                    started[future] = now
+            for future, start in started.items():
+                if not future.done() and now - start > timeout:
+                    raise TimeoutError(
+                        f"Task {in_flight[future]} did not complete in {timeout}s"
+                    )
+            remaining = [start + timeout - now for start in started.values()]
+            done, _ = wait(
+                in_flight,
+                timeout=min([_TIMEOUT_POLL, *remaining]),
+                return_when=FIRST_COMPLETED,
+            )
+            if done:
+                return done
+
+    try:
+        for key, args, kwargs in calls:
+            if len(in_flight) >= max_in_flight:
+                collect(wait_completed())
+            in_flight[executor.submit(fn, *args, **kwargs)] = key
+        while in_flight:
+            collect(wait_completed())
+    except BaseException:
+        for future in in_flight:
+            future.cancel()
+        raise
+
+    return results
+
+
+def combination_id(combination: tuple[str, ...]) -> str:
+    """
+    Stable identifier of a combination of variants, used as run identifier in
+    the results store of simulate_variants.
+    """
+    return hashlib.sha1("\x1f".join(combination).encode("utf-8")).hexdigest()
+
+
+def _model_digest(model: Model) -> str:
+    """
+    Digest of the base model of simulate_variants. The idf of a model is digested
+    from its text, as the pickles of eppy objects differ between processes.
+    """
+    idf = getattr(model, "idf", None)
+    if isinstance(idf, IDF):
+        data = idf.idfstr().encode("utf-8") + _public_state(model)
+    else:
+        data = pickle.dumps(model)
+    return hashlib.sha1(data).hexdigest()
+
+
+_UNDIGESTED_OPTIONS = (SimuOpt.TIMEOUT.value, SimuOpt.VERBOSE.value)
+
+
+def _inputs_digest(
+    model_digest: str,
+    combination: tuple[str, ...],
+    variant_dict: dict[str, dict[VariantKeys, Any]],
+    modifier_map: dict[str, Callable],
+    add_existing: bool,
+    simulation_options: dict[str, Any],
+    simulate_kwargs: dict,
+) -> str:
+    """
+    Digest of everything the results of a combination depend on: the base model,
+    the modifiers and arguments of its variants, and the simulation options.
+    Stored with the results of the combination, a stored run is only reused if
+    its digest is unchanged. The simulation options that do not change the
+    results (timeout and verbosity) are not digested.
+    """
+    simulation_options = {
+        key: value
+        for key, value in simulation_options.items()
+        if key not in _UNDIGESTED_OPTIONS
+    }
+
+    def variant_inputs(variant: str):
+        if _is_existing_variant(variant, add_existing):
+            return None
+        variant_items = variant_dict[variant]
+        modifier = modifier_map[variant_items[VariantKeys.MODIFIER]]
+        return {
+            "modifier": f"{modifier.__module__}."
+            f"{getattr(modifier, '__qualname__', type(modifier).__qualname__)}",
+            "arguments": variant_items[VariantKeys.ARGUMENTS],
+            "description": variant_items[VariantKeys.DESCRIPTION],
+        }
+
+    inputs = json.dumps(
+        {
+            "model": model_digest,
+            "variants": [variant_inputs(variant) for variant in combination],
+            "simulation_options": simulation_options,
+            "simulate_kwargs": simulate_kwargs,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(inputs.encode("utf-8")).hexdigest()
+
+
 def simulate_variants(
     model: Model,
     variant_dict: dict[str, dict[VariantKeys, Any]],
@@ -98,46 +561,247 @@ def simulate_variants(
     save_dir: Path = None,
     file_extension: str = ".txt",
     simulate_kwargs: dict = None,
+    results_path: Path = None,
+    memoize_modifiers: bool = False,
+    combination_tree: bool = False,
+    results_store: ResultsStore = None,
+    executor: Executor = None,
+    max_in_flight: int = None,
+    task_timeout: float = None,
 ):
+    """
+    Simulate all the combinations of variants of a model.
+
+    The model is pickled once, in a temporary file with the variants deltas
+    (see memoize_modifiers) read once by each worker. Tasks only carry the
+    variants of their combination. Each combination is materialized in the
+    worker that simulates it, by unpickling a working copy and applying the
+    variants modifiers. Only one working model per worker lives in memory.
+
+    :param memoize_modifiers: If True, each variant modifier is applied once to
+        the base model, and the resulting IdfDelta is replayed on every
+        combination instead of running the modifier again. Modifiers that change
+        anything else than the idf, and deltas that conflict with the previous
+        variants of a combination or change the same fields, fall back to
+        applying the modifier. Variants deltas are computed independently from
+        the base model, so only use it with modifiers that do not depend on the
+        changes made by the other modifiers. Default is False.
+    :param combination_tree: If True, the prefix tree of the combinations is
+        walked depth-first in the main process. The model is checkpointed
+        (pickled) after each modifier level, so that the modifier of each tree
+        node is applied only once, and workers receive fully modified models.
+        Combinations sharing long prefixes of variants (e.g. the default
+        Cartesian product) need far fewer modifier applications, but the
+        modifiers are applied sequentially in the main process. Default is
+        False.
+    :param results_path: (Optional) Path of a memory-mapped array file. If
+        provided, workers write their results directly in this file instead of
+        sending them back to the main process, and a VariantResults handle is
+        returned instead of a list of DataFrames. All variants must return results
+        with the same index. Use a path on a tmpfs (e.g. /dev/shm on Linux) to
+        keep the array in shared memory.
+    :param results_store: (Optional) A ResultsStore where the results of each
+        combination are written as soon as it completes, with the run identifier
+        combination_id(combination). The identifiers of the stored runs are the
+        manifest of the completed combinations: they are not simulated again,
+        their results are read from the store. Re-invoking simulate_variants
+        with the same store after a crash resumes the sweep. A digest of the
+        inputs of each combination (base model, variants modifiers and
+        arguments, simulation options except the timeout and verbosity, and
+        simulate_kwargs) is stored in the run
+        parameters: stored runs whose inputs changed are simulated again and
+        replaced.
+    :param executor: (Optional) A concurrent.futures.Executor-like object (with
+        a submit method returning futures) running the combinations instead of
+        joblib, e.g. a ThreadPoolExecutor: EnergyPlus runs as a subprocess, so
+        threads avoid the process spawning and pickling overhead. The executor
+        is not shut down. n_cpu is then only used for the default
+        max_in_flight.
+    :param max_in_flight: Maximum number of combinations submitted to the
+        executor and not yet completed. Default is 2 * n_cpu.
+    :param task_timeout: (Optional) Maximum duration of each simulation in
+        seconds. It is passed to Building models as the SimuOpt.TIMEOUT
+        simulation option: EnergyPlus processes still running after this
+        duration are killed and an EnergyPlusTimeoutError is raised. For all
+        models, a TimeoutError is raised if a task of the executor exceeds it,
+        and the pending tasks are cancelled. The stuck task keeps its worker
+        until it returns. Without executor, it is the joblib Parallel timeout,
+        which only applies when n_cpu > 1.
+    :return: A list of results DataFrames, in the order of the combinations, or
+        a VariantResults.
+    """
     simulate_kwargs = simulate_kwargs or {}
+    # The options of the caller are not modified
+    simulation_options = dict(simulation_options)
+    if task_timeout is not None and isinstance(model, Building):
+        simulation_options[SimuOpt.TIMEOUT.value] = task_timeout
 
     if n_cpu <= 0:
         n_cpu = max(1, cpu_count() + n_cpu)
 
     if custom_combinations is not None:
-        combined_variants = custom_combinations
+        combined_variants = list(custom_combinations)
     else:
         combined_variants = get_combined_variants(variant_dict, add_existing)
 
-    models = []
+    # Inputs digests are only stored with the results of a results store
+    inputs_digests = [None] * len(combined_variants)
+    if results_store is not None:
+        model_digest = _model_digest(model)
+        inputs_digests = [
+            _inputs_digest(
+                model_digest,
+                simulation,
+                variant_dict,
+                modifier_map,
+                add_existing,
+                simulation_options,
+                simulate_kwargs,
+            )
+            for simulation in combined_variants
+        ]
 
-    for idx, simulation in enumerate(combined_variants, start=1):
-        working_model = deepcopy(model)
+    def is_stored(idx: int, stored_runs: set[str]) -> bool:
+        run_id = combination_id(combined_variants[idx])
+        if run_id not in stored_runs:
+            return False
+        parameters = results_store.metadata(run_id)["parameters"]
+        return parameters.get("inputs_digest") == inputs_digests[idx]
 
-        for variant in simulation:
-            split_var = variant.split("_")
-            if (add_existing and split_var[0] != "EXISTING") or not add_existing:
-                modifier = modifier_map[variant_dict[variant][VariantKeys.MODIFIER]]
-                modifier(
-                    model=working_model,
-                    description=variant_dict[variant][VariantKeys.DESCRIPTION],
-                    **variant_dict[variant][VariantKeys.ARGUMENTS],
+    completed = []
+    if results_store is not None:
+        stored_runs = set(results_store.run_ids())
+        completed = [
+            idx for idx in range(len(combined_variants)) if is_stored(idx, stored_runs)
+        ]
+    pending = sorted(set(range(len(combined_variants))) - set(completed))
+    pending_variants = [combined_variants[idx] for idx in pending]
+
+    def stored_results(idx: int) -> pd.DataFrame:
+        return results_store.read(combination_id(combined_variants[idx]))
+
+    model_bytes = pickle.dumps(model)
+    variant_deltas = None
+    if memoize_modifiers:
+        variant_deltas = {
+            variant: _modifier_delta(model_bytes, variant, variant_dict, modifier_map)
+            for variant in dict.fromkeys(itertools.chain(*pending_variants))
+            if not _is_existing_variant(variant, add_existing)
+        }
+
+    # Tasks are (combination index, variants to apply, pickled model). The model
+    # is None for the base model of the shared context
+    if combination_tree:
+        tasks = (
+            (pending[pending_idx], (), leaf_bytes)
+            for pending_idx, leaf_bytes in _iter_combination_models(
+                model_bytes,
+                pending_variants,
+                variant_dict,
+                modifier_map,
+                add_existing,
+                variant_deltas,
+            )
+        )
+    else:
+        # Working models are materialized in the workers, from the base model
+        # of the shared context, so that only one model per worker lives in
+        # memory
+        tasks = (
+            (idx, simulation, None)
+            for idx, simulation in zip(pending, pending_variants)
+        )
+
+    context_path = _write_shared_context(model_bytes, variant_deltas)
+    try:
+        simulate_combination = partial(
+            _simulate_combination,
+            context_path=context_path,
+            variant_dict=variant_dict,
+            modifier_map=modifier_map,
+            add_existing=add_existing,
+            simulation_options=simulation_options,
+            simulate_kwargs=simulate_kwargs,
+            save_dir=save_dir,
+            file_extension=file_extension,
+            results_store=results_store,
+        )
+
+        def run_tasks(n_tasks: int, variant_results: VariantResults = None):
+            """Run the pending tasks, return (combination index, output) tuples"""
+            calls = (
+                (
+                    idx,
+                    (idx, simulation, variant_results),
+                    {
+                        "model_bytes": task_bytes,
+                        "combination": combined_variants[idx],
+                        "inputs_digest": inputs_digests[idx],
+                    },
+                )
+                for idx, simulation, task_bytes in progress_bar(tasks, total=n_tasks)
+            )
+            if executor is not None:
+                return _executor_map(
+                    executor,
+                    simulate_combination,
+                    calls,
+                    max_in_flight=max_in_flight or 2 * n_cpu,
+                    timeout=task_timeout,
                 )
 
-        if save_dir:
-            working_model.save((save_dir / f"Model_{idx}").with_suffix(file_extension))
+            task_indices = []
 
-        models.append(working_model)
+            def dispatch():
+                for idx, args, kwargs in calls:
+                    task_indices.append(idx)
+                    yield delayed(simulate_combination)(*args, **kwargs)
 
-    bar = progress_bar(models)
+            # Sequential runs do not support the joblib timeout
+            outputs = Parallel(
+                n_jobs=n_cpu, timeout=task_timeout if n_cpu > 1 else None
+            )(dispatch())
+            return list(zip(task_indices, outputs))
 
-    results = Parallel(n_jobs=n_cpu)(
-        delayed(
-            lambda m: m.simulate(
-                simulation_options=simulation_options, **simulate_kwargs
+        if results_path is not None and combined_variants:
+            # The first variant results give the shape of the results array
+            if pending:
+                first_idx, first_simulation, first_bytes = next(tasks)
+                first_results = simulate_combination(
+                    first_idx,
+                    first_simulation,
+                    model_bytes=first_bytes,
+                    combination=combined_variants[first_idx],
+                    inputs_digest=inputs_digests[first_idx],
+                )
+            else:
+                first_idx = completed[0]
+                first_results = stored_results(first_idx)
+            variant_results = VariantResults(
+                results_path,
+                first_results.index,
+                first_results.columns,
+                len(combined_variants),
             )
-        )(m)
-        for m in bar
-    )
+            variant_results.allocate()
+            variant_results.write(first_idx, first_results)
+            del first_results
 
-    return results
+            for idx in completed:
+                if idx != first_idx:
+                    variant_results.write(idx, stored_results(idx))
+
+            run_tasks(max(len(pending) - 1, 0), variant_results)
+            return variant_results
+
+        # Tasks may not be dispatched nor completed in the order of the combinations
+        results = [None] * len(combined_variants)
+        for idx, output in run_tasks(len(pending)):
+            results[idx] = output
+        for idx in completed:
+            results[idx] = stored_results(idx)
+
+        return results
+    finally:
+        _WORKER_CONTEXTS.pop(context_path, None)
+        os.unlink(context_path)
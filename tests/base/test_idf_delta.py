@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import eppy
+from eppy.modeleditor import IDF
+
+from energytool.base.idf_delta import IdfDelta
+from energytool.base.idf_utils import (
+    get_named_objects_field_values,
+    set_named_objects_field_values,
+    get_objects_name_list,
+    get_idf_index,
+)
+from energytool.base.working_idf import CopyOnWriteIDF
+
+TEST_RESOURCES_PATH = Path(__file__).parent.parent / "resources"
+
+try:
+    IDF.setiddname((TEST_RESOURCES_PATH / "Energy+.idd").as_posix())
+except eppy.modeleditor.IDDAlreadySetError:
+    pass
+
+
+class TestIdfDelta:
+    def test_idf_delta(self):
+        base_idf = IDF((TEST_RESOURCES_PATH / "test.idf").as_posix())
+        working_idf = CopyOnWriteIDF(base_idf)
+        zone_to_remove = get_objects_name_list(base_idf, "Zone")[0]
+
+        set_named_objects_field_values(
+            working_idf, "Material", "Conductivity", 0.5, "Cast Concrete (Dense)_.1"
+        )
+        working_idf.newidfobject("Zone", Name="New_zone")
+        working_idf.removeidfobject(working_idf.getobject("Zone", zone_to_remove))
+        working_idf.idfobjects["Timestep"]
+
+        delta = IdfDelta.from_working_idf(base_idf, working_idf)
+        assert sorted(delta.types) == ["MATERIAL", "ZONE"]
+
+        target_idf = IDF((TEST_RESOURCES_PATH / "test.idf").as_posix())
+        assert delta.can_apply(target_idf)
+        version = get_idf_index(target_idf).version("Material")
+        delta.apply(target_idf)
+        assert get_idf_index(target_idf).version("Material") > version
+        assert target_idf.idfstr() == working_idf.idfstr()
+        assert get_named_objects_field_values(
+            target_idf, "Material", "Conductivity", "Cast Concrete (Dense)_.1"
+        ) == [0.5]
+
+        # The zone to remove no longer exists and New_zone already exists
+        assert not delta.can_apply(target_idf)
+
+        # Objects without unique names cannot be removed
+        base_idf.newidfobject(
+            "Output:Variable", Variable_Name="Zone People Occupant Count"
+        )
+        working_idf = CopyOnWriteIDF(base_idf)
+        working_idf.newidfobject(
+            "Output:Variable", Variable_Name="Zone Air Temperature"
+        )
+        assert list(IdfDelta.from_working_idf(base_idf, working_idf).types) == [
+            "OUTPUT:VARIABLE"
+        ]
+        working_idf.idfobjects["Output:Variable"].pop(0)
+        working_idf.idfobjects["Output:Variable"].pop(0)
+        assert IdfDelta.from_working_idf(base_idf, working_idf) is None
+
+    def test_overlapping_deltas(self):
+        base_idf = IDF((TEST_RESOURCES_PATH / "test.idf").as_posix())
+        material = "Cast Concrete (Dense)_.1"
+        zone = get_objects_name_list(base_idf, "Zone")[0]
+
+        def delta_of(modifier):
+            working_idf = CopyOnWriteIDF(base_idf)
+            modifier(working_idf)
+            return IdfDelta.from_working_idf(base_idf, working_idf)
+
+        conductivity_1 = delta_of(
+            lambda idf: set_named_objects_field_values(
+                idf, "Material", "Conductivity", 0.5, material
+            )
+        )
+        conductivity_2 = delta_of(
+            lambda idf: set_named_objects_field_values(
+                idf, "Material", "Conductivity", 0.7, material
+            )
+        )
+        density = delta_of(
+            lambda idf: set_named_objects_field_values(
+                idf, "Material", "Density", 1000, material
+            )
+        )
+        remove_zone = delta_of(
+            lambda idf: idf.removeidfobject(idf.getobject("Zone", zone))
+        )
+        zone_origin = delta_of(
+            lambda idf: set_named_objects_field_values(
+                idf, "Zone", "X_Origin", 10, zone
+            )
+        )
+
+        field_idx = base_idf.getobject("Material", material).objls.index("Conductivity")
+        assert conductivity_1.touched_fields() == {
+            ("MATERIAL", material.upper(), field_idx)
+        }
+        assert remove_zone.touched_fields() == {("ZONE", zone.upper(), None)}
+
+        # Two deltas changing the same field of the same object overlap
+        assert conductivity_1.overlaps(conductivity_2)
+        assert not conductivity_1.overlaps(density)
+        assert remove_zone.overlaps(zone_origin)
+        assert zone_origin.overlaps(remove_zone)
+
+        target_idf = IDF((TEST_RESOURCES_PATH / "test.idf").as_posix())
+        conductivity_1.apply(target_idf)
+        assert not conductivity_2.can_apply(target_idf, [conductivity_1])
+        assert density.can_apply(target_idf, [conductivity_1])
+        assert conductivity_2.can_apply(target_idf)
@@ -1,11 +1,15 @@
+import gc
+import pickle
 from io import StringIO
 from pathlib import Path
 
+import numpy as np
 import pytest
 import eppy
 
 from eppy.modeleditor import IDF
 
+import energytool.base.idf_utils
 from energytool.base.idf_utils import (
     get_objects_name_list,
     set_named_objects_field_values,
@@ -13,7 +17,16 @@ from energytool.base.idf_utils import (
     get_named_objects_field_values,
     del_named_objects,
     getidfvalue,
+    IdfObjectIndex,
+    get_idf_index,
+    get_field_array,
+    set_field_array,
+    get_fields_table,
+    get_zone_geometry,
+    get_building_volume,
+    get_building_surface_area,
 )
+from energytool.base.working_idf import CopyOnWriteIDF
 
 TEST_RESOURCES_PATH = Path(__file__).parent.parent / "resources"
 
@@ -148,6 +161,46 @@ class TestIdfObjectUtils:
 
         assert three_materials_test == [0.41, 1.4, 0.25]
 
+    def test_field_array(self):
+        idf = IDF(StringIO(""))
+        for toy_zone in range(4):
+            idf.newidfobject("Zone", Name=f"Zone_{toy_zone}")
+        idf.newidfobject(
+            "Lights",
+            Name="Light_0",
+            Zone_or_ZoneList_Name="Zone_0",
+        )
+
+        assert get_field_array(idf, "Zone", "Volume").tolist() == ["autocalculate"] * 4
+
+        set_field_array(idf, "Zone", "Volume", 30.0)
+        assert [zone.Volume for zone in idf.idfobjects["Zone"]] == [30.0] * 4
+
+        set_field_array(idf, "Zone", "Volume", np.array([1.0, 2.0, 3.0, 4.0]))
+        values = get_field_array(idf, "Zone", "Volume")
+        assert isinstance(values, np.ndarray)
+        assert values.tolist() == [1.0, 2.0, 3.0, 4.0]
+
+        set_field_array(idf, "Zone", "Volume", [10.0, 20.0], names=["Zone_2", "Zone_0"])
+        assert get_field_array(
+            idf, "Zone", "Volume", names=["Zone_0", "Zone_2", "Unknown"]
+        ).tolist() == [20.0, 10.0, None]
+
+        with pytest.raises(ValueError):
+            set_field_array(idf, "Zone", "Volume", [1.0, 2.0])
+
+        # The field is appended to the raw values of the objects
+        set_field_array(idf, "Lights", "Watts_per_Zone_Floor_Area", 5.0)
+        assert idf.idfobjects["Lights"][0].Watts_per_Zone_Floor_Area == 5.0
+
+        # Nothing to set on an empty type
+        set_field_array(idf, "Material", "Thickness", 0.1)
+
+        table = get_fields_table(idf, "Zone", ["Volume", "Multiplier"])
+        assert table.index.tolist() == ["Zone_0", "Zone_1", "Zone_2", "Zone_3"]
+        assert table.columns.tolist() == ["Volume", "Multiplier"]
+        assert table.Volume.tolist() == [20.0, 2.0, 10.0, 4.0]
+
     def test_del_obj_by_names(self, toy_idf):
         del_named_objects(toy_idf, "Zone", ["Zone_0", "Zone_1"])
         zone_name_list = get_objects_name_list(toy_idf, "Zone")
@@ -165,3 +218,158 @@ class TestIdfObjectUtils:
         del_named_objects(toy_idf, "Zone", "*")
         zone_name_list = get_objects_name_list(toy_idf, "Zone")
         assert zone_name_list == []
+
+    def test_idf_object_index(self):
+        idf = IDF(StringIO(""))
+        for toy_zone in range(3):
+            idf.newidfobject("Zone", Name=f"Zone_{toy_zone}", Floor_Area=10)
+
+        index = IdfObjectIndex(idf)
+        zone_1 = index.getobject("Zone", "ZONE_1")
+        assert zone_1 is idf.idfobjects["Zone"][1]
+        assert index.getobject("Zone", "Zone_42") is None
+        assert getidfvalue(idf, "idf.Zone.Zone_1.Floor_Area", index=index) == 10
+
+        # Field modifications are read from the objects
+        zone_1.Floor_Area = 42
+        assert getidfvalue(idf, "idf.Zone.Zone_1.Floor_Area", index=index) == 42
+
+        # Structural modifications invalidate the index
+        zone_1.Name = "Renamed"
+        assert index.getobject("Zone", "Zone_1") is None
+        assert index.getobject("Zone", "Renamed") is zone_1
+
+        idf.newidfobject("Zone", Name="Zone_42")
+        assert index.getobject("Zone", "Zone_42") is idf.idfobjects["Zone"][-1]
+
+        del_named_objects(idf, "Zone", "Zone_42")
+        assert index.getobject("Zone", "Zone_42") is None
+
+        # Removed objects are detected
+        zone_2 = index.getobject("Zone", "Zone_2")
+        idf.removeidfobject(idf.idfobjects["Zone"][0])
+        assert index.getobject("Zone", "Zone_2") is zone_2
+        assert index.getobject("Zone", "Zone_0") is None
+
+        # Objects sharing a name
+        duplicate = idf.newidfobject("Zone", Name="zone_2")
+        assert index.getobjects("Zone", "Zone_2") == [zone_2, duplicate]
+
+        # A single index is shared per IDF, and used by the helpers
+        assert get_idf_index(idf) is get_idf_index(idf)
+        set_named_objects_field_values(idf, "Zone", "Floor_Area", 12, "zone_2")
+        assert duplicate.Floor_Area == 12
+        assert zone_2.Floor_Area == 10
+
+        # Versions change with any modification of the objects of a type
+        idf = IDF(StringIO(""))
+        zone = idf.newidfobject("Zone", Name="Zone_0")
+        index = get_idf_index(idf)
+        version = index.version("Zone")
+        assert index.version("ZONE") == version
+        zone.Floor_Area = 14
+        assert index.version("Zone") > version
+        version = index.version("Zone")
+        added = idf.newidfobject("Zone", Name="Zone_1")
+        assert index.version("Zone") > version
+        version = index.version("Zone")
+        idf.removeidfobject(added)
+        assert index.version("Zone") > version
+        version = index.version("Zone")
+        set_field_array(idf, "Zone", "Floor_Area", [1.0])
+        assert index.version("Zone") > version
+        version = index.version("Zone")
+        idf.newidfobject("Material", Name="Concrete")
+        assert index.version("Zone") == version
+
+        # Reassigned plain lists cannot be tracked and are always outdated
+        del_named_objects(idf, "Zone", "Zone_42")
+        assert index.version("Zone") != index.version("Zone")
+
+        file_idf = IDF((TEST_RESOURCES_PATH / "test.idf").as_posix())
+        zone_name = get_objects_name_list(file_idf, "Zone")[0]
+        copied = pickle.loads(pickle.dumps(get_idf_index(file_idf)))
+        assert copied.getobject("Zone", zone_name).Name == zone_name
+
+        # The index does not keep its IDF alive
+        n_indexes = len(energytool.base.idf_utils._IDF_INDEXES)
+        for _ in range(3):
+            temp_idf = IDF((TEST_RESOURCES_PATH / "test.idf").as_posix())
+            get_idf_index(temp_idf).getobject("Zone", zone_name)
+            temp_idf.idfobjects["Zone"] = list(temp_idf.idfobjects["Zone"])
+            get_idf_index(temp_idf).getobject("Zone", zone_name)
+            del temp_idf
+        gc.collect()
+        assert len(energytool.base.idf_utils._IDF_INDEXES) <= n_indexes
+
+    def test_zone_geometry(self, monkeypatch):
+        idf = IDF(TEST_RESOURCES_PATH / "test.idf")
+        geometry = get_zone_geometry(idf)
+        assert geometry is get_zone_geometry(idf)
+
+        for zone in get_objects_name_list(idf, "Zone"):
+            assert geometry.floor_area(zone) == pytest.approx(
+                eppy.modeleditor.zonearea(idf, zone)
+            )
+            assert geometry.volume(zone) == pytest.approx(
+                eppy.modeleditor.zonevolume(idf, zone)
+            )
+        assert geometry.floor_area("BLOCK1:APPTX1W") == geometry.floor_area(
+            "Block1:ApptX1W"
+        )
+        assert geometry.floor_area("Unknown") == 0.0
+
+        zones = geometry.zones()
+        assert zones.columns.tolist() == [
+            "floor_area",
+            "height",
+            "volume",
+            "exterior_surface_area",
+        ]
+        assert zones.floor_area.sum() == pytest.approx(200.0)
+        assert get_building_volume(idf) == pytest.approx(600.0)
+        for condition in ["Outdoors", "Ground", "Surface"]:
+            assert get_building_surface_area(idf, condition) == pytest.approx(
+                sum(
+                    surf.area
+                    for surf in idf.idfobjects["BuildingSurface:Detailed"]
+                    if surf.Outside_Boundary_Condition == condition
+                )
+            )
+        assert zones.exterior_surface_area.sum() == pytest.approx(
+            get_building_surface_area(idf, "Outdoors")
+        )
+
+        # Working copies share the geometry of their base IDF
+        working_idf = CopyOnWriteIDF(idf)
+        assert get_zone_geometry(working_idf) is geometry
+
+        # The geometry is not recomputed while surfaces are unchanged
+        n_builds = []
+        surfaces_geometry = energytool.base.idf_utils._surfaces_geometry
+        monkeypatch.setattr(
+            energytool.base.idf_utils,
+            "_surfaces_geometry",
+            lambda surfaces: n_builds.append(1) or surfaces_geometry(surfaces),
+        )
+        geometry.floor_area("Block1:ApptX1W")
+        geometry.volume("Block1:ApptX1W")
+        assert n_builds == []
+
+        # The geometry is updated when surfaces are modified
+        floor = next(
+            surf
+            for surf in idf.idfobjects["BuildingSurface:Detailed"]
+            if surf.Zone_Name == "Block1:ApptX1W" and surf.Surface_Type == "Floor"
+        )
+        area = geometry.floor_area("Block1:ApptX1W")
+        floor.Vertex_1_Xcoordinate = floor.Vertex_1_Xcoordinate * 2
+        assert geometry.floor_area("Block1:ApptX1W") != area
+        assert geometry.floor_area("Block1:ApptX1W") == pytest.approx(
+            eppy.modeleditor.zonearea(idf, "Block1:ApptX1W")
+        )
+        assert n_builds == [1]
+
+        empty_idf = IDF(StringIO(""))
+        assert get_zone_geometry(empty_idf).zones().empty
+        assert get_building_surface_area(empty_idf, "Outdoors") == 0.0
@@ -1,17 +1,28 @@
 import datetime as dt
+import gc
 from io import StringIO
+from pathlib import Path
 
 import pytest
 from eppy.modeleditor import IDF
 
-from energytool.base.idf_utils import get_named_objects_field_values
+import energytool.base.idfobject_utils
+from energytool.base.idf_utils import _peek_objects, get_named_objects_field_values
 from energytool.base.idfobject_utils import (
     set_timestep,
     set_run_period,
     get_number_of_people,
     add_output_variable,
+    add_output_variables,
     add_natural_ventilation,
+    del_output_variable,
+    get_output_variable_index,
+    get_zones_idealloadsairsystem,
+    get_zone_equipment_graph,
 )
+from energytool.base.working_idf import CopyOnWriteIDF
+
+RESOURCES_PATH = Path(__file__).parent.parent / "resources"
 
 
 @pytest.fixture(scope="session")
@@ -63,6 +74,119 @@ class TestIdfObjectUtils:
         ]
         assert to_test == ref
 
+    def test_add_output_variables(self, monkeypatch):
+        idf = IDF(StringIO(""))
+        add_output_variables(
+            idf,
+            [
+                ("Zone_1", "Conso"),
+                ("Zone_1", "Conso"),
+                ("Zone_2", "Elec"),
+                ("*", "Elec"),
+                ("Zone_3", "Elec"),
+                ("Zone_3", "Conso"),
+            ],
+            reporting_frequency="Hourly",
+        )
+
+        to_test = [elmt["obj"] for elmt in idf.idfobjects["Output:Variable"]]
+        assert to_test == [
+            ["OUTPUT:VARIABLE", "Zone_1", "Conso", "Hourly"],
+            ["OUTPUT:VARIABLE", "*", "Elec", "Hourly"],
+            ["OUTPUT:VARIABLE", "Zone_3", "Conso", "Hourly"],
+        ]
+
+        index = get_output_variable_index(idf)
+        assert index is get_output_variable_index(idf)
+        assert index.has_output("Zone_5", "Elec")
+        assert not index.has_output("Zone_5", "Conso")
+
+        # Objects added, removed or modified outside the helpers are tracked
+        idf.newidfobject("Output:Variable", Key_Value="Zone_5", Variable_Name="Gas")
+        assert index.has_output("Zone_5", "Gas")
+        del_output_variable(idf, "Conso")
+        assert not index.has_output("Zone_1", "Conso")
+        add_output_variable(idf, ["Zone_1", "Zone_2"], "Temperature")
+        idf.getobject("Output:Variable", "Zone_1").Variable_Name = "Operative"
+        add_output_variable(idf, "Zone_1", "Temperature")
+        assert [
+            obj.Variable_Name
+            for obj in idf.idfobjects["Output:Variable"]
+            if obj.Key_Value == "Zone_1"
+        ] == ["Operative", "Temperature"]
+
+        # The pairs added by the helpers do not rebuild the set
+        n_builds = []
+        monkeypatch.setattr(
+            energytool.base.idfobject_utils,
+            "_peek_objects",
+            lambda *args: n_builds.append(1) or _peek_objects(*args),
+        )
+        add_output_variables(idf, [(f"Zone_{i}", "Humidity") for i in range(10)])
+        monkeypatch.undo()
+        assert n_builds == []
+        assert all(index.has_output(f"Zone_{i}", "Humidity") for i in range(10))
+        idf.idfobjects["Output:Variable"] = []
+        assert index.pairs() == set()
+
+        # The index does not keep its IDF alive
+        indexes = energytool.base.idfobject_utils._OUTPUT_VARIABLE_INDEXES
+        n_indexes = len(indexes)
+        for _ in range(3):
+            temp_idf = IDF((RESOURCES_PATH / "test.idf").as_posix())
+            add_output_variable(temp_idf, "Zone_1", "Conso")
+            assert get_output_variable_index(temp_idf).has_output("Zone_1", "Conso")
+            del temp_idf
+        gc.collect()
+        assert len(indexes) <= n_indexes
+
+    def test_get_zones_idealloadsairsystem(self, monkeypatch):
+        idf = IDF((RESOURCES_PATH / "test.idf").as_posix())
+
+        ilas_list = get_zones_idealloadsairsystem(idf)
+        assert [ilas.Name for ilas in ilas_list] == [
+            "Block1:ApptX1W Ideal Loads Air",
+            "Block1:ApptX1E Ideal Loads Air",
+            "Block2:ApptX2W Ideal Loads Air",
+            "Block2:ApptX2E Ideal Loads Air",
+        ]
+        ilas_list = get_zones_idealloadsairsystem(idf, "Block2:ApptX2E")
+        assert [ilas.Name for ilas in ilas_list] == ["Block2:ApptX2E Ideal Loads Air"]
+
+        # Working copies share the graph of their base IDF, and get their own
+        # equipment objects
+        working_idf = CopyOnWriteIDF(idf)
+        graph = get_zone_equipment_graph(idf)
+        assert get_zone_equipment_graph(working_idf) is graph
+        working_ilas = get_zones_idealloadsairsystem(working_idf, "Block2:ApptX2E")
+        assert working_ilas[0].Name == "Block2:ApptX2E Ideal Loads Air"
+        assert working_ilas[0] is not ilas_list[0]
+        assert (
+            working_ilas[0] is working_idf.idfobjects["ZoneHVAC:IdealLoadsAirSystem"][3]
+        )
+
+        # The graph is not rebuilt while ZoneHVAC objects are unchanged
+        n_builds = []
+        build = graph._build
+        monkeypatch.setattr(
+            graph, "_build", lambda idf: n_builds.append(1) or build(idf)
+        )
+        get_zones_idealloadsairsystem(idf, "Block2:ApptX2E")
+        idf.newidfobject("Material", Name="Concrete")
+        get_zones_idealloadsairsystem(idf, "Block2:ApptX2E")
+        assert n_builds == []
+
+        # The graph is rebuilt when ZoneHVAC connections are modified
+        connection = idf.getobject("ZoneHVAC:EquipmentConnections", "Block2:ApptX2E")
+        connection.Zone_Conditioning_Equipment_List_Name = "Block2:ApptX2W Equipment"
+        ilas_list = get_zones_idealloadsairsystem(idf, "Block2:ApptX2E")
+        assert [ilas.Name for ilas in ilas_list] == ["Block2:ApptX2W Ideal Loads Air"]
+        assert n_builds == [1]
+
+        idf.removeidfobject(connection)
+        with pytest.raises(ValueError):
+            get_zones_idealloadsairsystem(idf, "Block2:ApptX2E")
+
     def test_set_run_period(self, toy_idf):
         toy_idf.newidfobject("RunPeriod")
 
@@ -0,0 +1,127 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from energytool.base.sql_results import (
+    SqlResults,
+    iter_sql_timeseries,
+    read_sql_timeseries,
+)
+from tests.conftest import write_eplus_sql
+
+
+class TestSqlResults:
+    def test_sql_results(self, eplus_sql):
+        full = read_sql_timeseries(eplus_sql, ref_year=2009)
+        results = SqlResults(eplus_sql, ref_year=2009)
+
+        assert results.columns == list(full.columns)
+        pd.testing.assert_frame_equal(results.to_pandas(), full)
+
+        west = results.select("Zone Mean Air Temperature", key_values="BLOCK1:APPTX1W")
+        assert west.columns == ["BLOCK1:APPTX1W:Zone Mean Air Temperature [C](Hourly)"]
+        pd.testing.assert_frame_equal(west.to_pandas(), full[west.columns])
+
+        # Successive selections are intersected
+        assert results.select("Zone Mean Air Temperature").select(
+            "Zone Mean Air Temperature", key_values="BLOCK1:APPTX1E"
+        ).columns == ["BLOCK1:APPTX1E:Zone Mean Air Temperature [C](Hourly)"]
+        assert (
+            results.select("Zone Ideal Loads")
+            .select("Zone Mean Air Temperature")
+            .columns
+            == []
+        )
+
+        sliced = results.between("2009-01-01 12:00", "2009-01-02 06:00")
+        pd.testing.assert_frame_equal(
+            sliced.to_pandas(),
+            full.loc["2009-01-01 12:00":"2009-01-02 06:00"],
+            check_freq=False,
+        )
+        assert sliced.between("2009-01-02").to_pandas().index[0] == pd.Timestamp(
+            "2009-01-02"
+        )
+
+    def test_resample(self, eplus_sql):
+        full = read_sql_timeseries(eplus_sql, ref_year=2009)
+        results = SqlResults(eplus_sql, ref_year=2009)
+
+        for how in ["mean", "sum", "min", "max"]:
+            pd.testing.assert_frame_equal(
+                results.resample("D", how=how).to_pandas(),
+                full.resample("D").agg(how),
+                check_freq=False,
+                check_names=False,
+            )
+
+        pd.testing.assert_frame_equal(
+            results.select("Zone Mean Air Temperature")
+            .between(end="2009-01-01 23:00")
+            .resample("6h", how="max")
+            .to_pandas(),
+            full.filter(like="Zone Mean Air Temperature")
+            .loc[:"2009-01-01 23:00"]
+            .resample("6h")
+            .max(),
+            check_freq=False,
+            check_names=False,
+        )
+
+        with pytest.raises(ValueError):
+            results.resample("D", how="median")
+        with pytest.raises(ValueError):
+            results.resample("D").resample("ME")
+
+    def test_report_times(self, eplus_sql):
+        full = read_sql_timeseries(eplus_sql, ref_year=2009)
+
+        # Time rows of frequencies without reported variables, e.g. the daily
+        # time steps, are not part of the results
+        with sqlite3.connect(eplus_sql) as conn:
+            conn.executemany(
+                "INSERT INTO Time (Year, Month, Day, Hour, Minute, Interval, "
+                "IntervalType) VALUES (2009, 1, ?, 24, 0, 1440, 2)",
+                [(1,), (2,), (4,)],
+            )
+            # A dictionary row without data
+            conn.execute(
+                "INSERT INTO ReportDataDictionary (ReportDataDictionaryIndex, "
+                "KeyValue, Name, ReportingFrequency, Units) VALUES "
+                "(1000, 'BLOCK1:APPTX1N', 'Zone Mean Air Temperature', 'Hourly', 'C')"
+            )
+        variables = [("BLOCK1:APPTX1W", "Zone Mean Air Temperature")]
+        column = "BLOCK1:APPTX1W:Zone Mean Air Temperature [C](Hourly)"
+
+        res = read_sql_timeseries(eplus_sql, ref_year=2009, variables=variables)
+        pd.testing.assert_frame_equal(res, full[[column]])
+        chunks = list(
+            iter_sql_timeseries(
+                eplus_sql, ref_year=2009, variables=variables, chunk_freq="D"
+            )
+        )
+        pd.testing.assert_frame_equal(pd.concat(chunks), full[[column]])
+
+        results = SqlResults(eplus_sql, ref_year=2009)
+        assert results.select("Zone Mean Air Temperature").columns == [
+            "BLOCK1:APPTX1E:Zone Mean Air Temperature [C](Hourly)",
+            "BLOCK1:APPTX1N:Zone Mean Air Temperature [C](Hourly)",
+            column,
+        ]
+        pd.testing.assert_frame_equal(
+            results.select("Zone Mean Air Temperature", "BLOCK1:APPTX1W").to_pandas(),
+            full[[column]],
+        )
+
+    def test_empty_results(self, tmp_path):
+        sql_path = write_eplus_sql(tmp_path / "eplusout.sql", periods=0)
+        full = read_sql_timeseries(sql_path)
+        assert full.empty
+
+        for unify_frequency in [True, False]:
+            chunks = list(
+                iter_sql_timeseries(sql_path, unify_frequency=unify_frequency)
+            )
+            assert len(chunks) == 1
+            pd.testing.assert_frame_equal(pd.concat(chunks), full)
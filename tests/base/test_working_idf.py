@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import eppy
+from eppy.modeleditor import IDF
+
+from energytool.base.idf_utils import (
+    get_named_objects_field_values,
+    set_named_objects_field_values,
+    get_objects_name_list,
+)
+from energytool.base.working_idf import CopyOnWriteIDF
+
+TEST_RESOURCES_PATH = Path(__file__).parent.parent / "resources"
+
+try:
+    IDF.setiddname((TEST_RESOURCES_PATH / "Energy+.idd").as_posix())
+except eppy.modeleditor.IDDAlreadySetError:
+    pass
+
+
+class TestCopyOnWriteIDF:
+    def test_copy_on_write(self):
+        base_idf = IDF((TEST_RESOURCES_PATH / "test.idf").as_posix())
+        working_idf = CopyOnWriteIDF(base_idf)
+
+        assert working_idf.copied_types == []
+        assert working_idf.idfstr() == base_idf.idfstr()
+
+        set_named_objects_field_values(
+            working_idf, "Material", "Conductivity", 0.5, "Cast Concrete (Dense)_.1"
+        )
+        working_idf.newidfobject("Zone", Name="New_zone")
+
+        assert sorted(working_idf.copied_types) == ["MATERIAL", "ZONE"]
+
+        assert get_named_objects_field_values(
+            working_idf, "Material", "Conductivity", "Cast Concrete (Dense)_.1"
+        ) == [0.5]
+        assert get_named_objects_field_values(
+            base_idf, "Material", "Conductivity", "Cast Concrete (Dense)_.1"
+        ) == [1.4]
+
+        assert "New_zone" in get_objects_name_list(working_idf, "Zone")
+        assert "New_zone" not in get_objects_name_list(base_idf, "Zone")
+
+        working_str = working_idf.idfstr()
+        assert "New_zone" in working_str
+        assert "New_zone" not in base_idf.idfstr()
+
+        assert working_idf.idfobjects["Zone"][-1].theidf is working_idf
+
+    def test_save(self, tmp_path):
+        base_idf = IDF((TEST_RESOURCES_PATH / "test.idf").as_posix())
+        working_idf = CopyOnWriteIDF(base_idf)
+        set_named_objects_field_values(working_idf, "Zone", "Floor_Area", 42)
+
+        working_idf.saveas((tmp_path / "in.idf").as_posix(), encoding="utf-8")
+        reloaded = IDF((tmp_path / "in.idf").as_posix())
+
+        assert get_named_objects_field_values(reloaded, "Zone", "Floor_Area") == [
+            42
+        ] * len(base_idf.idfobjects["Zone"])
+        assert len(reloaded.idfobjects["BuildingSurface:Detailed"]) == len(
+            base_idf.idfobjects["BuildingSurface:Detailed"]
+        )
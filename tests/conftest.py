@@ -0,0 +1,77 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SQL_VARIABLES = [
+    ("BLOCK1:APPTX1W", "Zone Mean Air Temperature", "C", "Hourly"),
+    ("BLOCK1:APPTX1E", "Zone Mean Air Temperature", "C", "Hourly"),
+    (
+        "BLOCK1:APPTX1W IDEAL LOADS AIR",
+        "Zone Ideal Loads Supply Air Total Heating Energy",
+        "J",
+        "Hourly",
+    ),
+]
+
+
+def write_eplus_sql(path, start="2009-01-01", periods=48, variables=None):
+    """
+    Write a minimal eplusout.sql file holding hourly random values for variables.
+    Only the tables and columns read by energytool are filled.
+    """
+    variables = SQL_VARIABLES if variables is None else variables
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE Time (TimeIndex INTEGER PRIMARY KEY, Year INTEGER, "
+        "Month INTEGER, Day INTEGER, Hour INTEGER, Minute INTEGER, "
+        "Interval INTEGER, IntervalType INTEGER, EnvironmentPeriodIndex INTEGER, "
+        "WarmupFlag INTEGER)"
+    )
+    conn.execute(
+        "CREATE TABLE ReportDataDictionary (ReportDataDictionaryIndex INTEGER "
+        "PRIMARY KEY, IsMeter INTEGER, Type TEXT, IndexGroup TEXT, "
+        "TimestepType TEXT, KeyValue TEXT, Name TEXT, ReportingFrequency TEXT, "
+        "ScheduleName TEXT, Units TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE ReportData (ReportDataIndex INTEGER PRIMARY KEY, "
+        "TimeIndex INTEGER, ReportDataDictionaryIndex INTEGER, Value REAL)"
+    )
+
+    # EnergyPlus time stamps are at the end of each time step, hours from 1 to 24
+    start = pd.Timestamp(start)
+    for time_index in range(1, periods + 1):
+        stamp = start + pd.Timedelta(hours=time_index - 1)
+        conn.execute(
+            "INSERT INTO Time (TimeIndex, Year, Month, Day, Hour, Minute, Interval, "
+            "IntervalType) VALUES (?, ?, ?, ?, ?, 0, 60, 1)",
+            (time_index, stamp.year, stamp.month, stamp.day, stamp.hour + 1),
+        )
+
+    rng = np.random.default_rng(42)
+    for var_nb, (key, name, units, frequency) in enumerate(variables):
+        # Dictionary indexes are not contiguous in EnergyPlus outputs
+        rdd_index = 2 * var_nb + 7
+        conn.execute(
+            "INSERT INTO ReportDataDictionary (ReportDataDictionaryIndex, "
+            "KeyValue, Name, ReportingFrequency, Units) VALUES (?, ?, ?, ?, ?)",
+            (rdd_index, key, name, frequency, units),
+        )
+        conn.executemany(
+            "INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, Value) "
+            "VALUES (?, ?, ?)",
+            [
+                (time_index, rdd_index, float(value))
+                for time_index, value in enumerate(rng.random(periods), start=1)
+            ],
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture()
+def eplus_sql(tmp_path):
+    return write_eplus_sql(tmp_path / "eplusout.sql")
@@ -1,15 +1,41 @@
+import asyncio
+import sqlite3
 from pathlib import Path
 from tempfile import TemporaryDirectory
+
+import pandas as pd
+import pytest
 from pytest import approx
-from energytool.building import Building, SimuOpt
+
+import energytool.building
+from energytool.building import (
+    Building,
+    BuildingPool,
+    SimuOpt,
+    read_sql_timeseries,
+    iter_sql_timeseries,
+    _required_variables,
+)
+from energytool.base.sql_results import SqlResults
 from energytool.outputs import OutputCategories
-from energytool.system import HeaterSimple
+from energytool.system import HeaterSimple, Sensor
+from tests.conftest import write_eplus_sql
 
 RESOURCES_PATH = Path(__file__).parent / "resources"
 
 Building.set_idd(RESOURCES_PATH)
 
 
+class NoEplusBuilding(Building):
+    """Return the conductivity that would be simulated instead of running E+"""
+
+    def simulate(self, property_dict=None, simulation_options=None, **kwargs):
+        key = "idf.Material.Urea Formaldehyde Foam_.1327.Conductivity"
+        return pd.DataFrame(
+            {"conductivity": [property_dict.get(key, self.get_param_init_value(key))]}
+        )
+
+
 class TestBuilding:
     def test_building(self):
         test_build = Building(idf_path=RESOURCES_PATH / "test.idf")
@@ -163,3 +189,273 @@ class TestBuilding:
 
         init_values = test_build.get_param_init_value(string_search_start)
         assert init_values == [3, 3, 3, 3]
+
+    def test_simulate_batch(self):
+        test_build = NoEplusBuilding(idf_path=RESOURCES_PATH / "test.idf")
+        key = "idf.Material.Urea Formaldehyde Foam_.1327.Conductivity"
+        property_dicts = [{key: 0.01 * i} for i in range(4)]
+
+        for n_workers in [1, 2]:
+            results = dict(
+                test_build.simulate_batch(
+                    property_dicts, simulation_options={}, n_workers=n_workers
+                )
+            )
+            assert sorted(results.keys()) == [0, 1, 2, 3]
+            assert [results[i]["conductivity"].iloc[0] for i in range(4)] == approx(
+                [0.0, 0.01, 0.02, 0.03]
+            )
+
+    def test_read_sql_timeseries(self, eplus_sql):
+        res = read_sql_timeseries(eplus_sql, ref_year=2009)
+
+        assert list(res.columns) == [
+            "BLOCK1:APPTX1E:Zone Mean Air Temperature [C](Hourly)",
+            "BLOCK1:APPTX1W IDEAL LOADS AIR:"
+            "Zone Ideal Loads Supply Air Total Heating Energy [J](Hourly)",
+            "BLOCK1:APPTX1W:Zone Mean Air Temperature [C](Hourly)",
+        ]
+        assert res.shape == (48, 3)
+        assert res.index[0] == pd.Timestamp("2009-01-01 01:00:00")
+        assert res.index[-1] == pd.Timestamp("2009-01-03 00:00:00")
+        assert res.index.freq == "h"
+        assert not res.isna().any().any()
+
+        with sqlite3.connect(eplus_sql) as conn:
+            expected = [
+                val
+                for (val,) in conn.execute(
+                    "SELECT Value FROM ReportData WHERE ReportDataDictionaryIndex = 7 "
+                    "ORDER BY TimeIndex"
+                )
+            ]
+        assert (
+            res["BLOCK1:APPTX1W:Zone Mean Air Temperature [C](Hourly)"].tolist()
+            == expected
+        )
+
+    def test_read_sql_timeseries_variables(self, eplus_sql):
+        full = read_sql_timeseries(eplus_sql, ref_year=2009)
+
+        res = read_sql_timeseries(
+            eplus_sql,
+            ref_year=2009,
+            variables=[("BLOCK1:APPTX1W", "Zone Mean Air Temperature")],
+        )
+        assert list(res.columns) == [
+            "BLOCK1:APPTX1W:Zone Mean Air Temperature [C](Hourly)"
+        ]
+        pd.testing.assert_frame_equal(res, full[res.columns])
+
+        res = read_sql_timeseries(
+            eplus_sql,
+            ref_year=2009,
+            variables=[
+                ("*", "Zone Mean Air Temperature"),
+                (["BLOCK1:APPTX1W IDEAL LOADS AIR"], "Zone Ideal Loads"),
+            ],
+        )
+        pd.testing.assert_frame_equal(res, full)
+
+        res = read_sql_timeseries(eplus_sql, ref_year=2009, variables=[])
+        assert res.shape == (48, 0)
+        pd.testing.assert_index_equal(res.index, full.index)
+
+    def test_required_variables(self):
+        sensor = Sensor(
+            name="Temp",
+            variables="Zone Mean Air Temperature",
+            key_values="BLOCK1:APPTX1W",
+        )
+
+        options = {SimuOpt.OUTPUTS.value: OutputCategories.SENSOR.value}
+        assert _required_variables([sensor], options) == [
+            ("BLOCK1:APPTX1W", "Zone Mean Air Temperature")
+        ]
+
+        options[SimuOpt.OUTPUTS.value] = "RAW|SENSOR"
+        assert _required_variables([sensor], options) is None
+
+        options[SimuOpt.RAW_VARIABLES.value] = [("*", "Zone Mean Radiant Temperature")]
+        assert _required_variables([sensor], options) == [
+            ("*", "Zone Mean Radiant Temperature"),
+            ("BLOCK1:APPTX1W", "Zone Mean Air Temperature"),
+        ]
+
+    def test_iter_sql_timeseries(self, tmp_path):
+        # 1-hour steps over 3 months, with a daily variable
+        sql_path = write_eplus_sql(tmp_path / "eplusout.sql", periods=24 * 75)
+        with sqlite3.connect(sql_path) as conn:
+            conn.execute(
+                "INSERT INTO ReportDataDictionary (ReportDataDictionaryIndex, "
+                "KeyValue, Name, ReportingFrequency, Units) "
+                "VALUES (99, 'Environment', 'Site Rain Status', 'Daily', '')"
+            )
+            conn.executemany(
+                "INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, "
+                "Value) VALUES (?, 99, ?)",
+                [(time_index, time_index) for time_index in range(24, 24 * 75, 24)],
+            )
+
+        full = read_sql_timeseries(sql_path, ref_year=2009)
+        chunks = list(iter_sql_timeseries(sql_path, ref_year=2009))
+
+        assert len(chunks) == 3
+        assert all(list(chunk.columns) == list(full.columns) for chunk in chunks)
+        pd.testing.assert_frame_equal(pd.concat(chunks), full, check_freq=False)
+
+        variables = [("*", "Zone Mean Air Temperature")]
+        chunks = list(
+            iter_sql_timeseries(
+                sql_path, ref_year=2009, variables=variables, chunk_freq="W"
+            )
+        )
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks),
+            read_sql_timeseries(sql_path, ref_year=2009, variables=variables),
+            check_freq=False,
+        )
+
+    def test_simulate_results_chunk(self, monkeypatch):
+        def fake_run(output_directory, **kwargs):
+            write_eplus_sql(Path(output_directory) / "eplusout.sql", periods=24 * 60)
+
+        monkeypatch.setattr(energytool.building, "run", fake_run)
+
+        test_build = Building(idf_path=RESOURCES_PATH / "test.idf")
+        test_build.add_system(
+            Sensor(
+                name="Temp",
+                variables="Zone Mean Air Temperature",
+                key_values="BLOCK1:APPTX1W",
+            )
+        )
+        simulation_options = {
+            SimuOpt.EPW_FILE.value: (RESOURCES_PATH / "Paris_2020.epw").as_posix(),
+            SimuOpt.OUTPUTS.value: OutputCategories.SENSOR.value,
+            SimuOpt.START.value: "2009-01-01",
+            SimuOpt.STOP.value: "2009-03-01",
+        }
+
+        full = test_build.simulate(simulation_options=dict(simulation_options))
+        simulation_options[SimuOpt.RESULTS_CHUNK.value] = "M"
+        chunked = test_build.simulate(simulation_options=dict(simulation_options))
+
+        assert list(chunked.columns) == ["BLOCK1:APPTX1W_Zone Mean Air Temperature"]
+        assert chunked.shape[0] == 24 * 60
+        pd.testing.assert_frame_equal(chunked, full, check_freq=False)
+
+        # Simulations reporting no time step
+        monkeypatch.setattr(
+            energytool.building,
+            "run",
+            lambda output_directory, **kwargs: write_eplus_sql(
+                Path(output_directory) / "eplusout.sql", periods=0
+            ),
+        )
+        assert test_build.simulate(simulation_options=dict(simulation_options)).empty
+
+    def test_simulate_lazy_results(self, tmp_path, monkeypatch):
+        def fake_run(output_directory, **kwargs):
+            write_eplus_sql(Path(output_directory) / "eplusout.sql")
+
+        monkeypatch.setattr(energytool.building, "run", fake_run)
+
+        test_build = Building(idf_path=RESOURCES_PATH / "test.idf")
+        simulation_options = {
+            SimuOpt.EPW_FILE.value: (RESOURCES_PATH / "Paris_2020.epw").as_posix(),
+            SimuOpt.OUTPUTS.value: OutputCategories.RAW.value,
+            SimuOpt.START.value: "2009-01-01",
+            SimuOpt.STOP.value: "2009-01-02",
+        }
+
+        results = test_build.simulate(
+            simulation_options=dict(simulation_options),
+            working_directory=tmp_path,
+            lazy_results=True,
+        )
+        assert isinstance(results, SqlResults)
+        pd.testing.assert_frame_equal(
+            results.to_pandas(),
+            read_sql_timeseries(tmp_path / "eplusout.sql", ref_year=2009),
+        )
+
+        with pytest.raises(ValueError):
+            test_build.simulate(
+                simulation_options=dict(simulation_options), lazy_results=True
+            )
+
+    def test_simulate_async(self, monkeypatch):
+        running = []
+        max_running = []
+
+        async def fake_run_async(output_directory, **kwargs):
+            running.append(output_directory)
+            max_running.append(len(running))
+            await asyncio.sleep(0.05)
+            write_eplus_sql(Path(output_directory) / "eplusout.sql")
+            running.remove(output_directory)
+
+        monkeypatch.setattr(energytool.building, "run_async", fake_run_async)
+
+        test_build = Building(idf_path=RESOURCES_PATH / "test.idf")
+        simulation_options = {
+            SimuOpt.EPW_FILE.value: (RESOURCES_PATH / "Paris_2020.epw").as_posix(),
+            SimuOpt.OUTPUTS.value: OutputCategories.RAW.value,
+            SimuOpt.START.value: "2009-01-01",
+            SimuOpt.STOP.value: "2009-01-02",
+        }
+
+        async def simulate_all():
+            semaphore = asyncio.Semaphore(2)
+            return await asyncio.gather(
+                *(
+                    test_build.simulate_async(
+                        simulation_options=dict(simulation_options),
+                        semaphore=semaphore,
+                    )
+                    for _ in range(4)
+                )
+            )
+
+        results = asyncio.run(simulate_all())
+        assert len(results) == 4
+        assert max(max_running) == 2
+        monkeypatch.setattr(
+            energytool.building,
+            "run",
+            lambda output_directory, **kwargs: write_eplus_sql(
+                Path(output_directory) / "eplusout.sql"
+            ),
+        )
+        expected = test_build.simulate(simulation_options=dict(simulation_options))
+        for res in results:
+            pd.testing.assert_frame_equal(res, expected)
+
+        async def failing_run_async(output_directory, **kwargs):
+            raise RuntimeError("EnergyPlus failed")
+
+        monkeypatch.setattr(energytool.building, "run_async", failing_run_async)
+        with pytest.raises(RuntimeError):
+            asyncio.run(
+                test_build.simulate_async(simulation_options=dict(simulation_options))
+            )
+
+    def test_building_pool(self):
+        test_build = NoEplusBuilding(idf_path=RESOURCES_PATH / "test.idf")
+        key = "idf.Material.Urea Formaldehyde Foam_.1327.Conductivity"
+
+        with BuildingPool(test_build, n_workers=2) as pool:
+            # Workers are kept across batches
+            for _ in range(2):
+                results = dict(
+                    pool.simulate_batch(
+                        [{key: 0.01 * i} for i in range(4)], simulation_options={}
+                    )
+                )
+                assert [results[i]["conductivity"].iloc[0] for i in range(4)] == approx(
+                    [0.0, 0.01, 0.02, 0.03]
+                )
+
+            future = pool.submit({key: 0.05}, simulation_options={})
+            assert future.result()["conductivity"].iloc[0] == approx(0.05)
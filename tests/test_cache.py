@@ -0,0 +1,107 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import energytool.building
+from energytool.building import Building, SimuOpt
+from energytool.cache import SimulationCache
+from energytool.outputs import OutputCategories
+
+RESOURCES_PATH = Path(__file__).parent / "resources"
+
+Building.set_idd(RESOURCES_PATH)
+
+
+def toy_results(value=1.0):
+    return pd.DataFrame(
+        {"ZONE:Zone Mean Air Temperature [C](Hourly)": [value] * 3},
+        index=pd.date_range("2009-01-01", freq="h", periods=3),
+    )
+
+
+class TestSimulationCache:
+    def test_cache(self, tmp_path):
+        epw_path = RESOURCES_PATH / "Paris_2020.epw"
+        cache = SimulationCache(tmp_path / "cache")
+
+        key = cache.key("idf_str", epw_path, (9, 4, 0), "RAW", 2009)
+        assert key == cache.key("idf_str", epw_path, (9, 4, 0), "RAW", 2009)
+        assert key != cache.key("idf_str", epw_path, (9, 4, 0), "RAW|SYSTEM", 2009)
+        assert key != cache.key(
+            "idf_str", RESOURCES_PATH / "B4R_weather_Paris_2020.epw", (9, 4, 0), "RAW"
+        )
+
+        assert cache.get(key) is None
+        cache.put(key, toy_results())
+        pd.testing.assert_frame_equal(cache.get(key), toy_results())
+        assert key in cache
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_corrupted_entries(self, tmp_path):
+        cache = SimulationCache(tmp_path / "cache")
+        cache.put("truncated", toy_results())
+        path = cache.cache_dir / "truncated.pkl"
+        path.write_bytes(path.read_bytes()[:20])
+        (cache.cache_dir / "empty.pkl").write_bytes(b"")
+        (cache.cache_dir / "garbage.pkl").write_bytes(b"not a pickle")
+
+        for key in ["truncated", "empty", "garbage"]:
+            assert cache.get(key) is None
+            assert key not in cache
+        assert (cache.hits, cache.misses) == (0, 3)
+
+        cache.put("truncated", toy_results())
+        pd.testing.assert_frame_equal(cache.get("truncated"), toy_results())
+
+    def test_lru_eviction(self, tmp_path):
+        cache = SimulationCache(tmp_path / "cache")
+        cache.put("a", toy_results(1))
+        cache.max_size = cache.size * 2
+        cache.put("b", toy_results(2))
+
+        # "a" is older, but reading it makes "b" the least recently used entry
+        os.utime(cache.cache_dir / "a.pkl", (1000, 1000))
+        os.utime(cache.cache_dir / "b.pkl", (2000, 2000))
+        cache.get("a")
+        cache.put("c", toy_results(3))
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_building_cache(self, tmp_path, monkeypatch):
+        run_calls = []
+        monkeypatch.setattr(
+            energytool.building, "run", lambda **kwargs: run_calls.append(kwargs)
+        )
+        monkeypatch.setattr(
+            energytool.building,
+            "read_sql_timeseries",
+            lambda *args, **kwargs: toy_results(),
+        )
+
+        test_build = Building(
+            idf_path=RESOURCES_PATH / "test.idf",
+            result_cache=SimulationCache(tmp_path / "cache"),
+        )
+        simulation_options = {
+            SimuOpt.EPW_FILE.value: (RESOURCES_PATH / "Paris_2020.epw").as_posix(),
+            SimuOpt.OUTPUTS.value: OutputCategories.RAW.value,
+        }
+        property_dict = {"idf.Material.Urea Formaldehyde Foam_.1327.Conductivity": 0.05}
+
+        first = test_build.simulate(property_dict, dict(simulation_options))
+        second = test_build.simulate(property_dict, dict(simulation_options))
+        pd.testing.assert_frame_equal(first, second)
+        assert len(run_calls) == 1
+        assert (test_build.result_cache.hits, test_build.result_cache.misses) == (1, 1)
+
+        test_build.simulate(
+            {"idf.Material.Urea Formaldehyde Foam_.1327.Conductivity": 0.06},
+            dict(simulation_options),
+        )
+        assert len(run_calls) == 2
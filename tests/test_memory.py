@@ -0,0 +1,108 @@
+import pickle
+import threading
+import tracemalloc
+from pathlib import Path
+
+import energytool.building
+from energytool.building import Building, SimuOpt
+from energytool.memory import MemoryPolicy, current_rss
+from energytool.outputs import OutputCategories
+from tests.conftest import write_eplus_sql
+
+RESOURCES_PATH = Path(__file__).parent / "resources"
+
+Building.set_idd(RESOURCES_PATH)
+
+
+class TestMemoryPolicy:
+    def test_memory_policy(self):
+        policy = MemoryPolicy(every_n_runs=2, trace_allocations=True)
+        for run in range(4):
+            with policy.track(label=f"run_{run}"):
+                data = [0.0] * 100_000
+            del data
+
+        assert policy.runs == 4
+        assert policy.collections == 2
+        stats = policy.stats_frame()
+        assert stats.label.tolist() == ["run_0", "run_1", "run_2", "run_3"]
+        assert stats.collected.tolist() == [False, True, False, True]
+        assert (stats.python_peak >= 800_000).all()
+        assert (stats.duration >= 0).all()
+
+        policy = MemoryPolicy(rss_threshold=0, max_stats=2)
+        for _ in range(3):
+            with policy.track():
+                pass
+        if current_rss() is not None:
+            assert policy.collections == 3
+        assert len(policy.stats) == 2
+        assert policy.stats[0]["python_peak"] is None
+
+        policy = MemoryPolicy()
+        with policy.track():
+            pass
+        assert policy.collections == 0
+
+    def test_concurrent_runs(self):
+        policy = MemoryPolicy(every_n_runs=3, trace_allocations=True)
+        other_policy = MemoryPolicy(trace_allocations=True)
+        started = threading.Barrier(8)
+
+        def tracked_run(run_policy, label):
+            with run_policy.track(label=label):
+                started.wait()
+
+        threads = [
+            threading.Thread(
+                target=tracked_run,
+                args=(policy if idx % 2 else other_policy, f"run_{idx}"),
+            )
+            for idx in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert policy.runs == 4
+        assert policy.collections == 1
+        assert other_policy.runs == 4
+        assert not tracemalloc.is_tracing()
+        # Process-wide peaks cannot be attributed to overlapping runs
+        for run_stats in [*policy.stats, *other_policy.stats]:
+            assert run_stats["peak_rss"] is None
+            assert run_stats["children_peak_rss"] is None
+            assert run_stats["python_peak"] is None
+
+        # A policy in use can be pickled with its model
+        with policy.track():
+            restored = pickle.loads(pickle.dumps(policy))
+        assert restored.runs == 4
+        with restored.track():
+            data = [0.0] * 100_000
+        del data
+        assert restored.stats[-1]["python_peak"] >= 800_000
+        assert not tracemalloc.is_tracing()
+
+    def test_building_memory_policy(self, monkeypatch):
+        def fake_run(output_directory, **kwargs):
+            write_eplus_sql(Path(output_directory) / "eplusout.sql")
+
+        monkeypatch.setattr(energytool.building, "run", fake_run)
+
+        test_build = Building(
+            idf_path=RESOURCES_PATH / "test.idf",
+            memory_policy=MemoryPolicy(every_n_runs=1),
+        )
+        test_build.simulate(
+            simulation_options={
+                SimuOpt.EPW_FILE.value: (RESOURCES_PATH / "Paris_2020.epw").as_posix(),
+                SimuOpt.OUTPUTS.value: OutputCategories.RAW.value,
+            },
+            run_id="first",
+        )
+
+        assert test_build.memory_policy.runs == 1
+        assert test_build.memory_policy.collections == 1
+        assert test_build.memory_policy.stats[0]["label"] == "first"
@@ -1,3 +1,4 @@
+import gc
 from pathlib import Path
 import pytest
 
@@ -6,7 +7,9 @@ import pandas as pd
 from eppy.modeleditor import IDF
 
 from energytool.building import Building
+import energytool.base.parse_results
 from energytool.base.parse_results import (
+    get_column_index,
     get_output_variable,
     read_eplus_res,
     zone_contains_regex,
@@ -138,3 +141,110 @@ class TestEplusPostProcess:
                 ],
             ),
         )
+
+    def test_column_index(self):
+        columns = pd.Index(
+            [
+                "ZONE1:Zone Mean Air Temperature [C](Hourly)",
+                "BLOCK1:ZONE1:Zone Mean Air Temperature [C](Hourly)",
+                "ZONE2:Zone Mean Air Temperature [C](Hourly)",
+                "ZONE1:Site Outdoor Air Drybulb Temperature [C](Hourly)",
+                "ZONE1:Zone Outdoor Air Drybulb Temperature [C](Hourly)",
+                "Environment:Site Wind Speed [m/s](Hourly)",
+            ]
+        )
+        column_index = get_column_index(columns)
+        assert get_column_index(columns) is column_index
+        assert column_index.key_values[1] == "BLOCK1:ZONE1"
+        assert column_index.variables[1] == "Zone Mean Air Temperature"
+        assert column_index.units[5] == "m/s"
+        assert column_index.frequencies[5] == "Hourly"
+
+        # Exact names
+        assert column_index.mask("Zone Mean Air Temperature", "ZONE2").tolist() == [
+            False,
+            False,
+            True,
+            False,
+            False,
+            False,
+        ]
+        # Partial names behave as the regex selection
+        assert column_index.mask("Zone Mean Air Temperature", "zone1").tolist() == [
+            True,
+            True,
+            False,
+            False,
+            False,
+            False,
+        ]
+        assert column_index.mask("Outdoor Air Drybulb Temperature").tolist() == [
+            False,
+            False,
+            False,
+            True,
+            True,
+            False,
+        ]
+        assert column_index.mask(
+            ["Zone Outdoor Air Drybulb Temperature", "Site Wind Speed"]
+        ).tolist() == [False, False, False, False, True, True]
+
+    def test_column_index_metacharacters(self):
+        columns = pd.Index(
+            [
+                "ZONE (1):Zone Mean Air Temperature [C](Hourly)",
+                "ZONE 1:Zone Mean Air Temperature [C](Hourly)",
+                "A.B:Zone Mean Air Temperature [C](Hourly)",
+                "AXB:Zone Mean Air Temperature [C](Hourly)",
+                "BLOCK1:A.B:Zone Mean Air Temperature [C](Hourly)",
+                "ZONE 1:Zone Air Temperature (Mean) [C](Hourly)",
+            ]
+        )
+        column_index = get_column_index(columns)
+
+        # Resolved with the index
+        assert column_index.mask("Zone Mean Air Temperature", "ZONE (1)").tolist() == [
+            True,
+            False,
+            False,
+            False,
+            False,
+            False,
+        ]
+        assert column_index.mask("Zone Air Temperature (Mean)").tolist() == [
+            False,
+            False,
+            False,
+            False,
+            False,
+            True,
+        ]
+        # Partial match, resolved by scanning the columns
+        assert column_index.mask("Zone Mean Air Temperature", "A.B").tolist() == [
+            False,
+            False,
+            True,
+            False,
+            True,
+            False,
+        ]
+
+    def test_column_index_cache_release(self):
+        cache = energytool.base.parse_results._COLUMN_INDEXES
+        gc.collect()
+        n_entries = len(cache)
+
+        frames = [
+            pd.DataFrame(
+                [[1.0]], columns=[f"ZONE{i}:Zone Mean Air Temperature [C](Hourly)"]
+            )
+            for i in range(50)
+        ]
+        for frame in frames:
+            get_output_variable(frame, "Zone Mean Air Temperature")
+        assert len(cache) == n_entries + 50
+
+        del frame, frames
+        gc.collect()
+        assert len(cache) == n_entries
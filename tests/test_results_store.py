@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import energytool.building
+from energytool.building import Building, SimuOpt
+from energytool.outputs import OutputCategories
+from energytool.results_store import ResultsStore
+
+RESOURCES_PATH = Path(__file__).parent / "resources"
+
+Building.set_idd(RESOURCES_PATH)
+
+pytest.importorskip("pyarrow")
+
+
+def toy_results():
+    return pd.DataFrame(
+        {
+            "ZONE1:Zone Mean Air Temperature [C](Hourly)": [20.0, 21.0, 22.0],
+            "ZONE2:Zone Mean Air Temperature [C](Hourly)": [18.0, 19.0, 20.0],
+        },
+        index=pd.date_range("2009-01-01", freq="h", periods=3),
+    )
+
+
+class TestResultsStore:
+    @pytest.mark.parametrize("file_format", ["parquet", "feather"])
+    def test_results_store(self, tmp_path, file_format):
+        store = ResultsStore(tmp_path / "store", file_format=file_format)
+        epw_path = RESOURCES_PATH / "Paris_2020.epw"
+
+        run_id = store.write(
+            toy_results(),
+            parameters={"idf.Zone.*.Floor_Area": 42},
+            epw_path=epw_path,
+            eplus_version=(9, 2, 0),
+        )
+        assert run_id in store
+        assert store.run_ids() == [run_id]
+
+        pd.testing.assert_frame_equal(store.read(run_id), toy_results())
+        pd.testing.assert_frame_equal(
+            store.read(run_id, columns=["ZONE2:Zone Mean Air Temperature [C](Hourly)"]),
+            toy_results().iloc[:, [1]],
+        )
+        assert store.columns(run_id) == list(toy_results().columns)
+
+        metadata = store.metadata(run_id)
+        assert metadata["parameters"] == {"idf.Zone.*.Floor_Area": 42}
+        assert metadata["eplus_version"] == "(9, 2, 0)"
+        assert len(metadata["epw_sha256"]) == 64
+
+        store.write(toy_results() * 2, run_id="run_2")
+        assert len(store) == 2
+        store.delete(run_id)
+        assert store.run_ids() == ["run_2"]
+
+        with pytest.raises(ValueError):
+            ResultsStore(tmp_path / "store", file_format="csv")
+
+    def test_unsafe_run_ids(self, tmp_path):
+        store = ResultsStore(tmp_path / "store")
+        run_ids = ["../escape", "a/b", "Run A", "run a", "CON", "nul", "run_1"]
+        for factor, run_id in enumerate(run_ids, start=1):
+            assert store.write(toy_results() * factor, run_id=run_id) == run_id
+
+        # Files are written in the store directory only, one per run
+        assert not (tmp_path / "escape.parquet").exists()
+        assert all(path.is_file() for path in store.store_dir.iterdir())
+        assert len(list(store.store_dir.iterdir())) == len(run_ids)
+        assert (store.store_dir / "run_1.parquet").exists()
+
+        assert store.run_ids() == sorted(run_ids)
+        for factor, run_id in enumerate(run_ids, start=1):
+            assert run_id in store
+            assert store.metadata(run_id)["run_id"] == run_id
+            pd.testing.assert_frame_equal(store.read(run_id), toy_results() * factor)
+
+        store.delete("a/b")
+        assert "a/b" not in store
+        assert len(store) == len(run_ids) - 1
+
+        with pytest.raises(ValueError):
+            store.write(toy_results(), run_id="")
+
+    def test_building_results_store(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(energytool.building, "run", lambda **kwargs: None)
+        monkeypatch.setattr(
+            energytool.building,
+            "read_sql_timeseries",
+            lambda *args, **kwargs: toy_results(),
+        )
+
+        test_build = Building(
+            idf_path=RESOURCES_PATH / "test.idf",
+            results_store=ResultsStore(tmp_path / "store"),
+        )
+        property_dict = {"idf.Material.Urea Formaldehyde Foam_.1327.Conductivity": 0.05}
+        test_build.simulate(
+            property_dict,
+            simulation_options={
+                SimuOpt.EPW_FILE.value: (RESOURCES_PATH / "Paris_2020.epw").as_posix(),
+                SimuOpt.OUTPUTS.value: OutputCategories.RAW.value,
+            },
+            run_id="conductivity_005",
+        )
+
+        store = test_build.results_store
+        assert store.run_ids() == ["conductivity_005"]
+        pd.testing.assert_frame_equal(store.read("conductivity_005"), toy_results())
+        assert store.metadata("conductivity_005")["parameters"] == property_dict
@@ -0,0 +1,159 @@
+import asyncio
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from eppy.modeleditor import IDF
+from eppy.runner.run_functions import EnergyPlusRunError
+
+import energytool.building
+import energytool.runner
+from energytool.building import Building, SimuOpt
+from energytool.outputs import OutputCategories
+from energytool.runner import (
+    EnergyPlusTimeoutError,
+    RunDirectoryPool,
+    run,
+    run_async,
+)
+from tests.conftest import write_eplus_sql
+
+RESOURCES_PATH = Path(__file__).parent / "resources"
+
+Building.set_idd(RESOURCES_PATH)
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="Fake EnergyPlus is a shell script"
+)
+
+
+def fake_energyplus(tmp_path, monkeypatch, script):
+    exe_path = tmp_path / "energyplus"
+    exe_path.write_text(f"#!/bin/sh\n{script}\n")
+    exe_path.chmod(0o755)
+    monkeypatch.setattr(
+        energytool.runner,
+        "install_paths",
+        lambda *args: (exe_path.as_posix(), tmp_path.as_posix()),
+    )
+
+
+class TestRunner:
+    def test_run(self, tmp_path, monkeypatch):
+        idf = IDF((RESOURCES_PATH / "test.idf").as_posix())
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        idf.saveas((output_dir / "in.idf").as_posix())
+        weather = RESOURCES_PATH / "Paris_2020.epw"
+
+        # EnergyPlus runs in the output directory
+        fake_energyplus(tmp_path, monkeypatch, 'echo "$@" > args.txt')
+        run(idf=idf, weather=weather, output_directory=output_dir, verbose="q")
+        args = (output_dir / "args.txt").read_text()
+        assert f"--output-directory {output_dir}" in args
+        assert args.strip().endswith("in.idf")
+
+        fake_energyplus(tmp_path, monkeypatch, "echo failed >&2; exit 1")
+        with pytest.raises(EnergyPlusRunError, match="failed"):
+            run(idf=idf, weather=weather, output_directory=output_dir, verbose="q")
+
+        # Hung EnergyPlus processes are killed
+        fake_energyplus(tmp_path, monkeypatch, "sleep 30 & sleep 30")
+        start = time.perf_counter()
+        with pytest.raises(EnergyPlusTimeoutError):
+            run(
+                idf=idf,
+                weather=weather,
+                output_directory=output_dir,
+                verbose="q",
+                timeout=0.5,
+            )
+        assert time.perf_counter() - start < 10
+
+    def test_run_async(self, tmp_path, monkeypatch):
+        idf = IDF((RESOURCES_PATH / "test.idf").as_posix())
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        idf.saveas((output_dir / "in.idf").as_posix())
+        weather = RESOURCES_PATH / "Paris_2020.epw"
+
+        fake_energyplus(tmp_path, monkeypatch, 'echo "$@" > args.txt')
+        asyncio.run(
+            run_async(
+                idf=idf, weather=weather, output_directory=output_dir, verbose="q"
+            )
+        )
+        assert (output_dir / "args.txt").exists()
+
+        fake_energyplus(tmp_path, monkeypatch, "echo failed >&2; exit 1")
+        with pytest.raises(EnergyPlusRunError, match="failed"):
+            asyncio.run(
+                run_async(
+                    idf=idf, weather=weather, output_directory=output_dir, verbose="q"
+                )
+            )
+
+        fake_energyplus(tmp_path, monkeypatch, "sleep 30 & sleep 30")
+        start = time.perf_counter()
+        with pytest.raises(EnergyPlusTimeoutError):
+            asyncio.run(
+                run_async(
+                    idf=idf,
+                    weather=weather,
+                    output_directory=output_dir,
+                    verbose="q",
+                    timeout=0.5,
+                )
+            )
+        assert time.perf_counter() - start < 10
+
+    @pytest.mark.parametrize("async_cleanup", [True, False])
+    def test_run_directory_pool(self, tmp_path, async_cleanup):
+        pool = RunDirectoryPool(root=tmp_path, async_cleanup=async_cleanup)
+
+        with pool.directory() as run_dir:
+            (Path(run_dir) / "eplusout.sql").write_text("results")
+            (Path(run_dir) / "sub").mkdir()
+        pool.flush()
+
+        # The emptied directory is recycled
+        with pool.directory() as second_dir:
+            assert second_dir == run_dir
+            assert list(Path(second_dir).iterdir()) == []
+            with pool.directory() as third_dir:
+                assert third_dir != second_dir
+
+        # Pickled pools create their own directories
+        copied = pickle.loads(pickle.dumps(pool))
+        assert copied.path != pool.path
+        copied.close()
+
+        pool.close()
+        assert not pool.path.exists()
+
+    def test_building_run_directories(self, monkeypatch):
+        run_dirs = []
+
+        def fake_run(output_directory, **kwargs):
+            run_dirs.append(output_directory)
+            write_eplus_sql(Path(output_directory) / "eplusout.sql")
+
+        monkeypatch.setattr(energytool.building, "run", fake_run)
+        pool = RunDirectoryPool(use_tmpfs=True, async_cleanup=False)
+        test_build = Building(
+            idf_path=RESOURCES_PATH / "test.idf", run_directories=pool
+        )
+        for _ in range(2):
+            test_build.simulate(
+                simulation_options={
+                    SimuOpt.EPW_FILE.value: (
+                        RESOURCES_PATH / "Paris_2020.epw"
+                    ).as_posix(),
+                    SimuOpt.OUTPUTS.value: OutputCategories.RAW.value,
+                },
+            )
+        assert run_dirs[0] == run_dirs[1]
+        assert Path(run_dirs[0]).parent == pool.path
+        pool.close()
@@ -1,19 +1,45 @@
 import os
+import pickle
 import shutil
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from corrai.base.model import Model
 
 import pandas as pd
+import pytest
 
+from energytool.base.idf_utils import (
+    get_named_objects_field_values,
+    set_named_objects_field_values,
+)
+from energytool.building import Building, SimuOpt
+from energytool.modifier import (
+    set_external_windows,
+    set_opaque_surface_construction,
+    set_system,
+)
+from energytool.results_store import ResultsStore
+from energytool.system import HeaterSimple, SystemCategories
 from energytool.variant import (
+    _inputs_digest,
+    _materialize_variant,
+    _modifier_delta,
+    combination_id,
     simulate_variants,
     VariantKeys,
+    VariantResults,
     get_combined_variants,
     get_modifier_dict,
 )
 
+RESOURCES_PATH = Path(__file__).parent / "resources"
+
+Building.set_idd(RESOURCES_PATH)
+
 
 class VariantModel(Model):
     def __init__(self):
@@ -58,6 +84,75 @@ class VariantModel(Model):
             file.write(f"multiplier={self.multiplier}\n")
 
 
+STUCK_RELEASE = threading.Event()
+
+
+class StuckModel(VariantModel):
+    """Simulations with a multiplier of 2 never complete, until released"""
+
+    def simulate(self, property_dict=None, simulation_options=None, **kwargs):
+        if self.multiplier == 2:
+            STUCK_RELEASE.wait(30)
+        return super().simulate(property_dict, simulation_options, **kwargs)
+
+
+class OptionsModel(VariantModel):
+    """Model not supporting the SimuOpt.TIMEOUT simulation option"""
+
+    def simulate(self, property_dict=None, simulation_options=None, **kwargs):
+        assert SimuOpt.TIMEOUT.value not in simulation_options
+        return super().simulate(property_dict, simulation_options, **kwargs)
+
+
+class DefaultsModel(VariantModel):
+    """Model completing the simulation options with defaults, as Building"""
+
+    def simulate(self, property_dict=None, simulation_options=None, **kwargs):
+        simulation_options.setdefault(SimuOpt.VERBOSE.value, "v")
+        return super().simulate(property_dict, simulation_options, **kwargs)
+
+
+class ConductivityModel(Model):
+    """Model with an idf, simulating the conductivity of its concrete"""
+
+    material = "Cast Concrete (Dense)_.1"
+
+    def __init__(self):
+        self.idf = Building(idf_path=RESOURCES_PATH / "test.idf").idf
+
+    def simulate(self, property_dict=None, simulation_options=None, **kwargs):
+        (conductivity,) = get_named_objects_field_values(
+            self.idf, "Material", "Conductivity", self.material
+        )
+        return pd.DataFrame(
+            {"conductivity": [float(conductivity)]},
+            index=pd.DatetimeIndex([simulation_options["start"]]),
+        )
+
+
+def set_conductivity(model, description):
+    set_named_objects_field_values(
+        model.idf,
+        "Material",
+        "Conductivity",
+        description["conductivity"],
+        ConductivityModel.material,
+    )
+
+
+def scale_conductivity(model, description):
+    (conductivity,) = get_named_objects_field_values(
+        model.idf, "Material", "Conductivity", ConductivityModel.material
+    )
+    set_named_objects_field_values(
+        model.idf,
+        "Material",
+        "Conductivity",
+        float(conductivity) * description["factor"],
+        ConductivityModel.material,
+    )
+
+
 def modifier_1(model, description, multiplier=None):
     model.y1 = description["y1"]
     if multiplier is not None:
@@ -270,3 +365,562 @@ class TestVariant:
             assert os.path.exists(save_path)
             assert os.path.exists(save_path / "Model_1.txt")
             shutil.rmtree(save_path)
+
+    def test_results_path(self, tmp_path):
+        model = VariantModel()
+        simulation_options = {
+            "start": "2009-01-01 00:00:00",
+            "end": "2009-01-01 02:00:00",
+            "timestep": "h",
+        }
+
+        for n_cpu in [1, -1]:
+            res = simulate_variants(
+                model=model,
+                variant_dict=VARIANT_DICT_false,
+                modifier_map=MODIFIER_MAP,
+                simulation_options=simulation_options,
+                n_cpu=n_cpu,
+                results_path=tmp_path / f"results_{n_cpu}.dat",
+            )
+
+            assert isinstance(res, VariantResults)
+            assert res.shape == (8, 3, 1)
+            assert res.values[:, 0, 0].tolist() == [5, 81, 34, 110, 5, 81, 68, 220]
+            pd.testing.assert_frame_equal(
+                res[3],
+                pd.DataFrame(
+                    {"res": [110.0] * 3},
+                    index=pd.date_range(
+                        "2009-01-01 00:00:00", "2009-01-01 02:00:00", freq="h"
+                    ),
+                ),
+            )
+            assert len(list(res)) == 8
+
+        # Variants are applied on working copies
+        assert (model.y1, model.z1, model.multiplier) == (1, 2, 1)
+
+    def test_memoize_modifiers(self):
+        model = Building(idf_path=RESOURCES_PATH / "test.idf")
+        variant_dict = {
+            "Wall_1": {
+                VariantKeys.MODIFIER: "walls",
+                VariantKeys.ARGUMENTS: {
+                    "surface_type": "Wall",
+                    "outside_boundary_condition": "Outdoors",
+                },
+                VariantKeys.DESCRIPTION: {
+                    "wall_1": [
+                        {
+                            "Name": "Laine_15cm",
+                            "Thickness": 0.15,
+                            "Conductivity": 0.032,
+                            "Density": 40,
+                            "Specific_Heat": 1000,
+                        }
+                    ]
+                },
+            },
+            "Window_1": {
+                VariantKeys.MODIFIER: "windows",
+                VariantKeys.ARGUMENTS: {},
+                VariantKeys.DESCRIPTION: {
+                    "Window_1": {
+                        "Name": "Var_1",
+                        "UFactor": 1,
+                        "Solar_Heat_Gain_Coefficient": 0.1,
+                        "Visible_Transmittance": 0.1,
+                    }
+                },
+            },
+            "Window_2": {
+                VariantKeys.MODIFIER: "windows",
+                VariantKeys.ARGUMENTS: {},
+                VariantKeys.DESCRIPTION: {
+                    "Window_2": {
+                        "Name": "Var_2",
+                        "UFactor": 2,
+                        "Solar_Heat_Gain_Coefficient": 0.2,
+                        "Visible_Transmittance": 0.2,
+                    }
+                },
+            },
+        }
+        modifier_map = {
+            "walls": set_opaque_surface_construction,
+            "windows": set_external_windows,
+        }
+        model_bytes = pickle.dumps(model)
+
+        variant_deltas = {
+            variant: _modifier_delta(model_bytes, variant, variant_dict, modifier_map)
+            for variant in variant_dict
+        }
+        assert all(variant_deltas.values())
+        # The base model is not modified
+        assert model.idf.idfstr() == pickle.loads(model_bytes).idf.idfstr()
+
+        for combination in get_combined_variants(variant_dict):
+            direct = _materialize_variant(
+                model_bytes, combination, variant_dict, modifier_map, False
+            )
+            memoized = _materialize_variant(
+                model_bytes,
+                combination,
+                variant_dict,
+                modifier_map,
+                False,
+                variant_deltas,
+            )
+            assert memoized.idf.idfstr() == direct.idf.idfstr()
+
+        # Modifiers changing the model systems are not memoized
+        system_variant = {
+            "Heater": {
+                VariantKeys.MODIFIER: "system",
+                VariantKeys.ARGUMENTS: {},
+                VariantKeys.DESCRIPTION: {
+                    SystemCategories.HEATING: HeaterSimple(name="Heater")
+                },
+            }
+        }
+        assert (
+            _modifier_delta(
+                model_bytes, "Heater", system_variant, {"system": set_system}
+            )
+            is None
+        )
+
+        # Models without idf fall back to their modifiers
+        results = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_false,
+            MODIFIER_MAP,
+            SIMULATION_OPTIONS,
+            n_cpu=1,
+            add_existing=True,
+            memoize_modifiers=True,
+        )
+        expected = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_false,
+            MODIFIER_MAP,
+            SIMULATION_OPTIONS,
+            n_cpu=1,
+            add_existing=True,
+        )
+        for res, exp in zip(results, expected):
+            pd.testing.assert_frame_equal(res, exp)
+
+    def test_memoize_overlapping_fields(self):
+        material = "Cast Concrete (Dense)_.1"
+
+        def scale_conductivity(model, description):
+            (conductivity,) = get_named_objects_field_values(
+                model.idf, "Material", "Conductivity", material
+            )
+            set_named_objects_field_values(
+                model.idf,
+                "Material",
+                "Conductivity",
+                float(conductivity) * description["factor"],
+                material,
+            )
+
+        # Both variants change the same field, from its current value
+        variant_dict = {
+            "Double": {
+                VariantKeys.MODIFIER: "scale",
+                VariantKeys.ARGUMENTS: {},
+                VariantKeys.DESCRIPTION: {"factor": 2},
+            },
+            "Triple": {
+                VariantKeys.MODIFIER: "scale",
+                VariantKeys.ARGUMENTS: {},
+                VariantKeys.DESCRIPTION: {"factor": 3},
+            },
+        }
+        modifier_map = {"scale": scale_conductivity}
+        model = Building(idf_path=RESOURCES_PATH / "test.idf")
+        (base_conductivity,) = get_named_objects_field_values(
+            model.idf, "Material", "Conductivity", material
+        )
+        model_bytes = pickle.dumps(model)
+        variant_deltas = {
+            variant: _modifier_delta(model_bytes, variant, variant_dict, modifier_map)
+            for variant in variant_dict
+        }
+        assert variant_deltas["Double"].overlaps(variant_deltas["Triple"])
+
+        combination = ("Double", "Triple")
+        direct = _materialize_variant(
+            model_bytes, combination, variant_dict, modifier_map, False
+        )
+        memoized = _materialize_variant(
+            model_bytes,
+            combination,
+            variant_dict,
+            modifier_map,
+            False,
+            variant_deltas,
+        )
+        assert memoized.idf.idfstr() == direct.idf.idfstr()
+        assert get_named_objects_field_values(
+            memoized.idf, "Material", "Conductivity", material
+        ) == [pytest.approx(float(base_conductivity) * 6)]
+
+    def test_memoize_combination_tree(self):
+        # The second variant changes the field set by the first one
+        variant_dict = {
+            "Set": {
+                VariantKeys.MODIFIER: "set",
+                VariantKeys.ARGUMENTS: {},
+                VariantKeys.DESCRIPTION: {"conductivity": 0.5},
+            },
+            "Double": {
+                VariantKeys.MODIFIER: "scale",
+                VariantKeys.ARGUMENTS: {},
+                VariantKeys.DESCRIPTION: {"factor": 2},
+            },
+        }
+        modifier_map = {"set": set_conductivity, "scale": scale_conductivity}
+        for memoize_modifiers in [False, True]:
+            for combination_tree in [False, True]:
+                results = simulate_variants(
+                    ConductivityModel(),
+                    variant_dict,
+                    modifier_map,
+                    SIMULATION_OPTIONS,
+                    n_cpu=1,
+                    custom_combinations=[("Set", "Double"), ("Set",)],
+                    memoize_modifiers=memoize_modifiers,
+                    combination_tree=combination_tree,
+                )
+                assert [res.conductivity.iloc[0] for res in results] == [
+                    pytest.approx(1.0),
+                    pytest.approx(0.5),
+                ]
+
+    def test_combination_tree(self, tmp_path):
+        applied = []
+
+        def counting_modifier(model, description, multiplier=None):
+            applied.append(description["y1"])
+            modifier_1(model, description, multiplier)
+
+        modifier_map = {**MODIFIER_MAP, "mod1": counting_modifier}
+        expected = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_false,
+            MODIFIER_MAP,
+            SIMULATION_OPTIONS,
+            n_cpu=1,
+            add_existing=True,
+        )
+
+        results = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_false,
+            modifier_map,
+            SIMULATION_OPTIONS,
+            n_cpu=1,
+            add_existing=True,
+            combination_tree=True,
+        )
+        for res, exp in zip(results, expected):
+            pd.testing.assert_frame_equal(res, exp)
+        # Variant_1 is the first variant of 4 combinations, applied once
+        assert applied == [20]
+
+        # Results are returned in the order of the custom combinations
+        custom_combinations = [
+            ("Variant_2", "Variant_3"),
+            ("Variant_1", "Variant_3"),
+            ("Variant_2",),
+            ("Variant_1", "Variant_3"),
+        ]
+        results = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_true,
+            MODIFIER_MAP,
+            SIMULATION_OPTIONS,
+            n_cpu=1,
+            custom_combinations=custom_combinations,
+            combination_tree=True,
+        )
+        assert [res.iloc[0, 0] for res in results] == [
+            30 * 1 + 40 * 2,
+            (20 * 1 + 40 * 2) * 2,
+            30 * 1 + 2 * 2,
+            (20 * 1 + 40 * 2) * 2,
+        ]
+
+        variant_results = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_true,
+            MODIFIER_MAP,
+            SIMULATION_OPTIONS,
+            n_cpu=1,
+            custom_combinations=custom_combinations,
+            combination_tree=True,
+            results_path=tmp_path / "results.dat",
+        )
+        assert variant_results.values[:, 0, 0].tolist() == [
+            110.0,
+            200.0,
+            34.0,
+            200.0,
+        ]
+
+    def test_results_store(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        store = ResultsStore(tmp_path / "store")
+        combinations = [
+            ("Variant_1", "Variant_3"),
+            ("Variant_2",),
+            ("Variant_2", "Variant_3"),
+        ]
+        kwargs = dict(
+            n_cpu=1,
+            custom_combinations=combinations,
+            results_store=store,
+        )
+        simulated = []
+
+        def counting_modifier(model, description):
+            simulated.append(description["z1"])
+            modifier_2(model, description)
+
+        modifier_map = {**MODIFIER_MAP, "mod2": counting_modifier}
+        expected = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_true,
+            modifier_map,
+            SIMULATION_OPTIONS,
+            **kwargs,
+        )
+        assert len(store) == 3
+        metadata = store.metadata(combination_id(combinations[2]))
+        assert metadata["parameters"]["variants"] == ["Variant_2", "Variant_3"]
+
+        # Resume after a crash: only the missing combination is simulated
+        store.delete(combination_id(combinations[2]))
+        simulated.clear()
+        results = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_true,
+            modifier_map,
+            SIMULATION_OPTIONS,
+            **kwargs,
+        )
+        assert simulated == [40]
+        for res, exp in zip(results, expected):
+            pd.testing.assert_frame_equal(res, exp, check_freq=False)
+
+        variant_results = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_true,
+            modifier_map,
+            SIMULATION_OPTIONS,
+            results_path=tmp_path / "results.dat",
+            **kwargs,
+        )
+        assert simulated == [40]
+        assert variant_results.values[:, 0, 0].tolist() == [
+            exp.iloc[0, 0] for exp in expected
+        ]
+
+    def test_results_store_inputs(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        store = ResultsStore(tmp_path / "store")
+        combinations = [("Variant_1",), ("Variant_2", "Variant_3")]
+        kwargs = dict(n_cpu=1, custom_combinations=combinations, results_store=store)
+        simulated = []
+
+        def counting_modifier(model, description):
+            simulated.append(description["z1"])
+            modifier_2(model, description)
+
+        modifier_map = {**MODIFIER_MAP, "mod2": counting_modifier}
+        simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_true,
+            modifier_map,
+            SIMULATION_OPTIONS,
+            **kwargs,
+        )
+        assert simulated == [40]
+
+        # Same inputs: nothing is simulated
+        simulated.clear()
+        simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_true,
+            modifier_map,
+            SIMULATION_OPTIONS,
+            **kwargs,
+        )
+        assert simulated == []
+
+        # Changed variant arguments: only the changed combination is simulated
+        variant_dict = {
+            **VARIANT_DICT_true,
+            "Variant_3": {
+                **VARIANT_DICT_true["Variant_3"],
+                VariantKeys.DESCRIPTION: {"z1": 50},
+            },
+        }
+        results = simulate_variants(
+            VariantModel(), variant_dict, modifier_map, SIMULATION_OPTIONS, **kwargs
+        )
+        assert simulated == [50]
+        assert [res.iloc[0, 0] for res in results] == [48, 130]
+
+        # Changed simulation options and base model: everything is simulated
+        simulated.clear()
+        simulation_options = {**SIMULATION_OPTIONS, "timestep": "30min"}
+        simulate_variants(
+            VariantModel(), variant_dict, modifier_map, simulation_options, **kwargs
+        )
+        assert simulated == [50]
+        assert len(store.read(combination_id(combinations[0]))) == 1
+
+        simulated.clear()
+        model = VariantModel()
+        model.z1 = 3
+        results = simulate_variants(
+            model, variant_dict, modifier_map, simulation_options, **kwargs
+        )
+        assert simulated == [50]
+        assert [res.iloc[0, 0] for res in results] == [52, 130]
+
+    def test_results_store_options(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        store = ResultsStore(tmp_path / "store")
+        combinations = [("Variant_1", "Variant_3"), ("Variant_2", "Variant_3")]
+        simulated = []
+
+        def counting_modifier(model, description):
+            simulated.append(description["z1"])
+            modifier_2(model, description)
+
+        modifier_map = {**MODIFIER_MAP, "mod2": counting_modifier}
+        simulation_options = dict(SIMULATION_OPTIONS)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for kwargs in [{"n_cpu": 1}, {"executor": executor, "task_timeout": 10}]:
+                simulated.clear()
+                simulate_variants(
+                    DefaultsModel(),
+                    VARIANT_DICT_true,
+                    modifier_map,
+                    simulation_options,
+                    custom_combinations=combinations,
+                    results_store=store,
+                    **kwargs,
+                )
+                assert simulation_options == SIMULATION_OPTIONS
+                # The defaults written by the model are not digested
+                assert simulated == ([40, 40] if "n_cpu" in kwargs else [])
+
+        # Nor the timeout of the simulations
+        digest_args = ("model", ("Variant_3",), VARIANT_DICT_true, MODIFIER_MAP, False)
+        assert _inputs_digest(*digest_args, SIMULATION_OPTIONS, {}) == _inputs_digest(
+            *digest_args,
+            {**SIMULATION_OPTIONS, SimuOpt.TIMEOUT.value: 10, "verbose": "q"},
+            {},
+        )
+
+    def test_executor(self):
+        combinations = [
+            ("Variant_1", "Variant_3"),
+            ("Variant_2",),
+            ("Variant_2", "Variant_3"),
+        ]
+        expected = simulate_variants(
+            VariantModel(),
+            VARIANT_DICT_true,
+            MODIFIER_MAP,
+            SIMULATION_OPTIONS,
+            n_cpu=1,
+            custom_combinations=combinations,
+        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = simulate_variants(
+                VariantModel(),
+                VARIANT_DICT_true,
+                MODIFIER_MAP,
+                SIMULATION_OPTIONS,
+                custom_combinations=combinations,
+                executor=executor,
+                max_in_flight=1,
+                task_timeout=60,
+            )
+        for res, exp in zip(results, expected):
+            pd.testing.assert_frame_equal(res, exp)
+
+    def test_task_timeout(self):
+        # The timeout option is only passed to the models supporting it
+        results = simulate_variants(
+            OptionsModel(),
+            VARIANT_DICT_true,
+            MODIFIER_MAP,
+            SIMULATION_OPTIONS,
+            n_cpu=1,
+            custom_combinations=[("Variant_1",), ("Variant_2",)],
+            task_timeout=60,
+        )
+        assert [res.iloc[0, 0] for res in results] == [48, 34]
+
+        # Stuck tasks do not hang the executor batch
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            start = time.monotonic()
+            try:
+                with pytest.raises(TimeoutError):
+                    simulate_variants(
+                        StuckModel(),
+                        VARIANT_DICT_true,
+                        MODIFIER_MAP,
+                        SIMULATION_OPTIONS,
+                        custom_combinations=[
+                            ("Variant_2",),
+                            ("Variant_1",),
+                            ("Variant_2", "Variant_3"),
+                        ],
+                        executor=executor,
+                        max_in_flight=2,
+                        task_timeout=0.5,
+                    )
+                assert time.monotonic() - start < 5
+            finally:
+                STUCK_RELEASE.set()
+
+    def test_shared_context(self):
+        class RecordingExecutor(ThreadPoolExecutor):
+            def __init__(self):
+                super().__init__(max_workers=2)
+                self.calls = []
+
+            def submit(self, fn, *args, **kwargs):
+                self.calls.append((args, kwargs))
+                return super().submit(fn, *args, **kwargs)
+
+        model = VariantModel()
+        model.payload = "x" * 100_000
+        combinations = [("Variant_1",), ("Variant_2",), ("Variant_1", "Variant_3")]
+        with RecordingExecutor() as executor:
+            results = simulate_variants(
+                model,
+                VARIANT_DICT_true,
+                MODIFIER_MAP,
+                SIMULATION_OPTIONS,
+                custom_combinations=combinations,
+                executor=executor,
+            )
+
+        assert [res.iloc[0, 0] for res in results] == [48, 34, 200]
+        # The model is not sent with each task
+        assert len(executor.calls) == 3
+        for args, kwargs in executor.calls:
+            assert kwargs["model_bytes"] is None
+            assert len(pickle.dumps((args[:2], kwargs))) < 1_000